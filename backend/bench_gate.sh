@@ -0,0 +1,62 @@
+#!/bin/bash
+# Benchmark regression gate: times the base ref and this checkout on the same
+# machine, then fails if any benchmark's median is over the threshold slower.
+# Baselines only mean something on the machine that made them, so the base
+# ref is measured fresh (in a temporary git worktree) instead of committed.
+#
+# Usage: ./bench_gate.sh [base-ref] [suite run options...]
+#   ./bench_gate.sh                  # against the default branch
+#   ./bench_gate.sh master --quick   # skip the slowest benchmarks
+#   ./bench_gate.sh master --level micro --threshold 0.25
+#
+# The default branch is origin's HEAD if known, else main or master,
+# whichever exists locally.
+#
+# Set BENCH_BASELINE to a results file to compare against it instead of
+# measuring a base ref (the base-ref argument is then ignored).
+
+set -euo pipefail
+
+cd "$(dirname "$0")"
+if [ $# -gt 0 ] && [[ "$1" != -* ]]; then
+  BASE_REF="$1"
+  shift
+elif BASE_REF="$(git symbolic-ref --quiet --short refs/remotes/origin/HEAD 2>/dev/null)"; then
+  :
+elif git rev-parse --verify --quiet main >/dev/null; then
+  BASE_REF=main
+else
+  BASE_REF=master
+fi
+OUT_DIR="$(mktemp -d)"
+trap 'git worktree remove --force "$OUT_DIR/base" 2>/dev/null || true; rm -rf "$OUT_DIR"' EXIT
+
+# --threshold and --min-delta-ms only matter for the comparison. Empty arrays
+# are expanded as ${A[@]+"${A[@]}"}: under set -u, bash < 4.4 (macOS) treats
+# "${A[@]}" of an empty array as unbound.
+RUN_ARGS=()
+GATE_ARGS=()
+while [ $# -gt 0 ]; do
+  case "$1" in
+    --threshold|--min-delta-ms) GATE_ARGS+=("$1" "$2"); shift 2 ;;
+    *) RUN_ARGS+=("$1"); shift ;;
+  esac
+done
+
+if [ -n "${BENCH_BASELINE:-}" ]; then
+  BASELINE="$BENCH_BASELINE"
+else
+  echo "Measuring $BASE_REF"
+  git worktree add --detach --quiet "$OUT_DIR/base" "$BASE_REF"
+  BACKEND="$(git rev-parse --show-prefix)"
+  (cd "$OUT_DIR/base/$BACKEND" && python -m benchmarks.suite run ${RUN_ARGS[@]+"${RUN_ARGS[@]}"} \
+    -o "$OUT_DIR/base.json")
+  BASELINE="$OUT_DIR/base.json"
+fi
+
+echo -e "\nMeasuring this checkout"
+python -m benchmarks.suite run ${RUN_ARGS[@]+"${RUN_ARGS[@]}"} -o "$OUT_DIR/current.json"
+
+echo
+python -m benchmarks.suite compare "$BASELINE" "$OUT_DIR/current.json" \
+  ${GATE_ARGS[@]+"${GATE_ARGS[@]}"}
@@ -0,0 +1,100 @@
+"""Benchmark CalculatorTool's expression evaluation.
+
+Compares the previous regex + eval() path with the AST engine, both with a
+cold compiled-expression cache and with a warm one (agents repeat the same
+expressions within a thread), and with the evaluate_many batch API.
+
+Usage:
+    python -m benchmarks.bench_calculator [--expressions 500] [--repeat 20]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from src.tools.expression import ExpressionEngine
+
+
+def generate(count: int, seed: int = 7) -> list[str]:
+    """Random arithmetic expressions like the ones agents send."""
+    rng = random.Random(seed)
+    ops = ["+", "-", "*", "/", "%"]
+    expressions = []
+    for _ in range(count):
+        terms = [str(rng.randint(1, 999)) for _ in range(rng.randint(2, 6))]
+        expression = terms[0]
+        for term in terms[1:]:
+            expression += f" {rng.choice(ops)} {term}"
+        if rng.random() < 0.3:
+            # Unchained, so eval() stays cheap too
+            expression = f"({expression}) ** {rng.randint(2, 3)}"
+        if rng.random() < 0.5:
+            expression = f"({expression}) * {rng.randint(2, 9)}"
+        expressions.append(expression)
+    return expressions
+
+
+def eval_path(expression: str):
+    """The evaluation path before the AST engine."""
+    sanitized = expression.replace(" ", "")
+    if not re.match(r"^[\d+\-*/%().]+$", sanitized):
+        raise ValueError(expression)
+    return eval(sanitized, {"__builtins__": {}}, {})
+
+
+def time_it(fn, repeat: int) -> float:
+    """Return the best wall time in milliseconds over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expressions", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    expressions = generate(args.expressions)
+    warm = ExpressionEngine()
+
+    for expression in expressions:
+        try:
+            expected = eval_path(expression)
+        except ZeroDivisionError:
+            continue
+        assert warm.evaluate(expression) == expected, expression
+
+    def eval_all():
+        for expression in expressions:
+            try:
+                eval_path(expression)
+            except ZeroDivisionError:
+                pass
+
+    def evaluate_all(engine):
+        for expression in expressions:
+            try:
+                engine.evaluate(expression)
+            except ZeroDivisionError:
+                pass
+
+    eval_ms = time_it(eval_all, args.repeat)
+    cold_ms = time_it(lambda: evaluate_all(ExpressionEngine()), args.repeat)
+    warm_ms = time_it(lambda: evaluate_all(warm), args.repeat)
+    batch_ms = time_it(lambda: warm.evaluate_many(expressions), args.repeat)
+
+    n = args.expressions
+    print(f"{n} expressions (best of {args.repeat})")
+    print(f"  regex + eval():     {eval_ms:8.2f} ms  {n / eval_ms * 1000:>10,.0f}/s")
+    print(f"  AST engine, cold:   {cold_ms:8.2f} ms  {n / cold_ms * 1000:>10,.0f}/s")
+    print(f"  AST engine, warm:   {warm_ms:8.2f} ms  {n / warm_ms * 1000:>10,.0f}/s")
+    print(f"  evaluate_many:      {batch_ms:8.2f} ms  {n / batch_ms * 1000:>10,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
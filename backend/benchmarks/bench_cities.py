@@ -0,0 +1,80 @@
+"""Benchmark WeatherMockTool's city index on a large synthetic dataset.
+
+Generates a GeoNames-sized source (300k cities by default) plus the bundled
+cities, then reports index build time, open time and memory, and per-lookup
+latency for exact, alias, prefix, fuzzy and missing queries.
+
+Usage:
+    python -m benchmarks.bench_cities [--cities 300000] [--repeat 2000]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.tools.cities import DEFAULT_SOURCE, CityIndex, build_index
+
+SYLLABLES = ["ba", "ri", "lo", "ton", "vil", "mar", "sen", "ka", "dor", "ste",
+             "burg", "ford", "ham", "na", "pe", "qua", "zu", "wen", "li", "os"]
+
+QUERIES = {
+    "exact": "San Francisco",
+    "alias": "NYC",
+    "prefix": "Philadelp",
+    "fuzzy": "Philadelpia",
+    "miss": "Qqxxjj",
+}
+
+
+def write_source(path: Path, count: int, seed: int = 3):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(DEFAULT_SOURCE.read_text(encoding="utf-8"))
+        for _ in range(count):
+            name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+            if rng.random() < 0.2:
+                name += " " + "".join(rng.choice(SYLLABLES) for _ in range(2))
+            f.write(f"{name.title()}\tXX\t{rng.uniform(-60, 70):.2f}\t"
+                    f"{rng.uniform(-180, 180):.2f}\t{rng.randint(500, 2_000_000)}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source, target = Path(tmp) / "cities.tsv", Path(tmp) / "cities.tsv.idx"
+        write_source(source, args.cities)
+
+        start = time.perf_counter()
+        count = build_index(source, target)
+        build_s = time.perf_counter() - start
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        index = CityIndex(target)
+        open_ms = (time.perf_counter() - start) * 1000
+        open_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"{count:,} cities, index {target.stat().st_size / 1e6:.1f} MB")
+        print(f"  build: {build_s:8.2f} s")
+        print(f"  open:  {open_ms:8.3f} ms, {open_bytes:,} bytes allocated")
+        for kind, query in QUERIES.items():
+            match = index.lookup(query)
+            found = f"{match.city.name} ({match.how})" if match else "no match"
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                index.lookup(query)
+            micros = (time.perf_counter() - start) / args.repeat * 1e6
+            print(f"  {kind:<7} {query!r:<16} {micros:9.1f} us  -> {found}")
+        del index
+
+
+if __name__ == "__main__":
+    main()
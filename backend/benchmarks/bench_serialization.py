@@ -0,0 +1,108 @@
+"""Benchmark list-endpoint serialization on 1000-task pages.
+
+Compares the previous read path (rows -> TaskRecord -> TaskResponse -> JSON)
+with stitching the response bodies serialized at write time, and with the
+`fields=` projection the history sidebar uses.
+
+Usage:
+    python -m benchmarks.bench_serialization [--tasks 1000] [--repeat 20]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+
+from src.api.models import TaskResponse
+from src.persistence import TaskStorage, TaskRecord
+from src.persistence.records import validate_fields
+from src.persistence.storage import ExecutionStepRecord
+
+# What the history sidebar renders
+SIDEBAR_FIELDS = validate_fields(["id", "input_text", "tools_used", "created_at"])
+
+
+def populate(storage: TaskStorage, count: int):
+    """Fill storage with realistic multi-step tasks."""
+    for i in range(count):
+        storage.save_task(
+            TaskRecord(
+                id=None,
+                input_text=f"What is {i} * 7 and the weather in Paris?",
+                output_text=f"{i} * 7 = {i * 7}. Paris is overcast at 55°F. " * 3,
+                tools_used=["CalculatorTool", "WeatherMockTool"],
+                execution_steps=[
+                    ExecutionStepRecord(
+                        step_number=step,
+                        description=f"Step {step} of task {i}: tool result text " * 2,
+                        timestamp=datetime.now().isoformat(),
+                    )
+                    for step in range(1, 7)
+                ],
+                created_at=datetime.now().isoformat(),
+                thread_id=f"thread-{i % 20}",
+            )
+        )
+
+
+def model_path(storage: TaskStorage, limit: int) -> bytes:
+    """The read path before pre-serialization."""
+    tasks = storage.get_all_tasks(limit=limit)
+    models = [TaskResponse(**task.to_dict()) for task in tasks]
+    return json.dumps(jsonable_encoder(models)).encode("utf-8")
+
+
+def stitched_path(storage: TaskStorage, limit: int) -> bytes:
+    """The read path using bodies serialized at write time."""
+    return storage.get_all_tasks_json(limit=limit).encode("utf-8")
+
+
+def projected_path(storage: TaskStorage, limit: int) -> bytes:
+    """The read path with a field projection pushed into SQL."""
+    return storage.get_all_tasks_json(limit=limit, fields=SIDEBAR_FIELDS).encode("utf-8")
+
+
+def time_it(fn, repeat: int) -> float:
+    """Return the best wall time in milliseconds over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = TaskStorage(str(Path(tmp) / "bench.db"))
+        populate(storage, args.tasks)
+
+        assert json.loads(model_path(storage, args.tasks)) == json.loads(
+            stitched_path(storage, args.tasks)
+        )
+
+        model_ms = time_it(lambda: model_path(storage, args.tasks), args.repeat)
+        stitched_ms = time_it(lambda: stitched_path(storage, args.tasks), args.repeat)
+        projected_ms = time_it(lambda: projected_path(storage, args.tasks), args.repeat)
+        full_bytes = len(stitched_path(storage, args.tasks))
+        projected_bytes = len(projected_path(storage, args.tasks))
+
+    print(f"{args.tasks}-task page (best of {args.repeat})")
+    print(f"  dataclass + pydantic path: {model_ms:8.2f} ms")
+    print(f"  pre-serialized path:       {stitched_ms:8.2f} ms")
+    print(f"  speedup:                   {model_ms / stitched_ms:8.1f}x")
+    print(f"  sidebar projection:        {projected_ms:8.2f} ms")
+    print(f"  payload full / projected:  {full_bytes:,} / {projected_bytes:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
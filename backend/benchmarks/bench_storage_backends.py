@@ -0,0 +1,61 @@
+"""Benchmark concurrent write throughput of the storage backends.
+
+Several writer threads, each saving tasks for its own conversation threads,
+hit the single-file SQLite backend, the sharded backend and the in-memory
+backend. Commits on different shard files don't contend for one writer lock.
+
+Usage:
+    python -m benchmarks.bench_storage_backends [--writers 8] [--tasks 200] [--shards 4]
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.persistence import TaskRecord, create_storage
+
+
+def writes_per_second(storage, writers: int, tasks_per_writer: int) -> float:
+    """Save tasks from `writers` threads concurrently; return tasks/second."""
+    def write(writer: int):
+        template = TaskRecord(
+            id=None,
+            input_text="bench",
+            output_text="bench",
+            tools_used=[],
+            execution_steps=[],
+            created_at="",
+            thread_id="",
+        )
+        for i in range(tasks_per_writer):
+            template.created_at = f"2026-01-01T00:00:{i:06d}"
+            template.thread_id = f"writer-{writer}-thread-{i % 5}"
+            storage.save_task(template)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(write, range(writers)))
+    return writers * tasks_per_writer / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per writer")
+    parser.add_argument("--shards", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers x {args.tasks} tasks")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("memory", "sqlite", "sharded"):
+            storage = create_storage(backend, str(Path(tmp) / f"{backend}.db"), args.shards)
+            rate = writes_per_second(storage, args.writers, args.tasks)
+            label = f"{backend} ({args.shards} shards)" if backend == "sharded" else backend
+            print(f"  {label:<20} {rate:10.0f} tasks/s")
+            storage.close()
+
+
+if __name__ == "__main__":
+    main()
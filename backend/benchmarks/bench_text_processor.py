@@ -0,0 +1,97 @@
+"""Benchmark TextProcessorTool on 1 KB to 100 MB inputs.
+
+Compares the previous implementation (operation table rebuilt per call,
+whole-string split for word_count) with the chunked one, for time and peak
+traced memory, and times process_many in-process and with the process pool.
+
+Usage:
+    python -m benchmarks.bench_text_processor [--sizes 1K,1M,10M,100M] [--repeat 5]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from src.tools.text_processor import apply, process_many
+
+OPERATIONS = ["word_count", "char_count", "uppercase", "reverse"]
+
+UNITS = {"K": 1 << 10, "M": 1 << 20}
+
+
+def legacy(text: str, operation: str) -> str:
+    """The implementation before chunked counting."""
+    operations = {
+        "uppercase": lambda t: t.upper(),
+        "lowercase": lambda t: t.lower(),
+        "word_count": lambda t: f"Word count: {len(t.split())}",
+        "char_count": lambda t: f"Character count: {len(t)}",
+        "reverse": lambda t: t[::-1],
+        "title_case": lambda t: t.title(),
+    }
+    return operations[operation.lower().strip()](text)
+
+
+def make_text(size: int) -> str:
+    line = "2024-05-01 12:00:00 INFO worker-3 processed request id=42 in 13ms\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def parse_size(value: str) -> int:
+    return int(value[:-1]) * UNITS[value[-1].upper()] if value[-1].isalpha() else int(value)
+
+
+def time_it(fn, repeat: int) -> float:
+    """Return the best wall time in milliseconds over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def peak_memory(fn) -> int:
+    """Peak bytes allocated while fn runs, beyond what was live before."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1K,1M,10M,100M")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=16, help="texts per process_many batch")
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'operation':<11} {'before ms':>10} {'after ms':>10} "
+          f"{'before peak':>12} {'after peak':>12}")
+    for label in args.sizes.split(","):
+        size = parse_size(label)
+        text = make_text(size)
+        repeat = args.repeat if size <= UNITS["M"] else max(1, args.repeat // 2)
+        for operation in OPERATIONS:
+            assert legacy(text, operation) == apply(operation, text)
+            before_ms = time_it(lambda: legacy(text, operation), repeat)
+            after_ms = time_it(lambda: apply(operation, text), repeat)
+            before_peak = peak_memory(lambda: legacy(text, operation))
+            after_peak = peak_memory(lambda: apply(operation, text))
+            print(f"{label:>6} {operation:<11} {before_ms:10.2f} {after_ms:10.2f} "
+                  f"{before_peak / 1e6:10.1f}MB {after_peak / 1e6:10.1f}MB")
+        del text
+
+    texts = [make_text(UNITS["M"]) for _ in range(args.batch)]
+    process_many(texts[:2], "word_count", pool_threshold=0)  # start the pool
+    local_ms = time_it(lambda: process_many(texts, "word_count", pool_threshold=1 << 62), 3)
+    pooled_ms = time_it(lambda: process_many(texts, "word_count", pool_threshold=0), 3)
+    print(f"\nprocess_many, {args.batch} x 1M word_count (best of 3)")
+    print(f"  in-process:   {local_ms:8.2f} ms")
+    print(f"  process pool: {pooled_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
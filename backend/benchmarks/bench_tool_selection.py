@@ -0,0 +1,142 @@
+"""Benchmark per-request tool selection on a 50-tool catalog.
+
+Registers the three built-in tools plus 47 synthetic ones with realistic
+schemas, then compares binding the whole catalog with binding the
+registry's selection. It reports the prompt size (system prompt plus tool
+schemas, in characters and estimated tokens), the time to select and bind
+tools, and how many tools were loaded.
+
+Usage:
+    python -m benchmarks.bench_tool_selection [--repeat 200]
+"""
+
+import argparse
+import json
+import time
+
+from langchain_core.tools import StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_openai import ChatOpenAI
+
+from src.tools import ToolRegistry, ToolSpec
+from src.tools import registry as builtin_registry
+
+# (tool name, keywords) for the synthetic part of the catalog
+TOPICS = [
+    ("StockQuote", "stock share price ticker"), ("CurrencyConverter", "currency convert usd eur exchange"),
+    ("Timezone", "timezone time zone clock"), ("Translator", "translate translation language"),
+    ("Dictionary", "define definition meaning"), ("Thesaurus", "synonym antonym"),
+    ("UnitConverter", "unit convert miles kilometers pounds"), ("Calendar", "calendar date schedule"),
+    ("Reminder", "remind reminder alarm"), ("Email", "email mail send inbox"),
+    ("SmsSender", "sms text message phone"), ("FlightStatus", "flight airline departure"),
+    ("HotelSearch", "hotel booking room"), ("RestaurantFinder", "restaurant dinner food"),
+    ("RecipeSearch", "recipe cook ingredients"), ("NewsHeadlines", "news headlines"),
+    ("SportsScores", "score game match team"), ("MovieInfo", "movie film cinema"),
+    ("BookSearch", "book author novel"), ("MusicSearch", "song music album artist"),
+    ("Geocoder", "address coordinates latitude longitude"), ("Directions", "directions route drive"),
+    ("TrafficInfo", "traffic congestion"), ("PackageTracker", "package tracking delivery parcel"),
+    ("WikiSummary", "wikipedia summary encyclopedia"), ("WebSearch", "search web google"),
+    ("ImageCaption", "image caption photo"), ("QrCode", "qr code"),
+    ("PasswordGenerator", "password generate secure"), ("HashTool", "hash sha md5 checksum"),
+    ("Base64", "base64 encode decode"), ("JsonFormatter", "json format pretty"),
+    ("RegexTester", "regex regular expression"), ("SqlRunner", "sql query database"),
+    ("CsvStats", "csv statistics column"), ("ChartMaker", "chart plot graph"),
+    ("PdfReader", "pdf document read"), ("Spellcheck", "spell spelling typo"),
+    ("SentimentAnalyzer", "sentiment positive negative"), ("Summarizer", "summarize tldr"),
+    ("KeywordExtractor", "keywords extract topics"), ("IpLookup", "ip address network"),
+    ("DnsLookup", "dns domain nameserver"), ("PortScanner", "port open scan"),
+    ("CryptoPrice", "bitcoin crypto ethereum"), ("Horoscope", "horoscope zodiac"),
+    ("JokeTeller", "joke funny"),
+]
+
+REQUESTS = [
+    "What is 2 + 2?",
+    "What's the weather in Paris?",
+    "Uppercase the text 'hello world'",
+    "Convert 100 USD to EUR and check the BTC crypto price",
+    "Tell me about your day",
+]
+
+
+def _make_tool(name: str, keywords: str) -> StructuredTool:
+    def run(query: str, limit: int = 5, language: str = "en", verbose: bool = False) -> str:
+        return f"{name}: {query}"
+
+    run.__doc__ = f"""Look up {keywords.split()[0]} information.
+
+    Args:
+        query: What to look up, in natural language
+        limit: Maximum number of results to return
+        language: ISO 639-1 code of the response language
+        verbose: Whether to include extra detail in the result
+    """
+    return StructuredTool.from_function(run, name=name, parse_docstring=True)
+
+
+for _topic, _keywords in TOPICS:
+    globals()[f"{_topic}Tool"] = _make_tool(f"{_topic}Tool", _keywords)
+
+
+def build_catalog() -> ToolRegistry:
+    catalog = ToolRegistry()
+    for spec in builtin_registry:
+        catalog.register(spec)
+    for topic, keywords in TOPICS:
+        catalog.register(
+            ToolSpec(
+                name=f"{topic}Tool",
+                module=__name__,
+                summary=f"For {keywords.split()[0]} lookups ({', '.join(keywords.split()[1:])})",
+                keywords=frozenset(keywords.split()),
+            )
+        )
+    return catalog
+
+
+def prompt_chars(catalog: ToolRegistry, specs) -> int:
+    """Characters the model receives for tools: system prompt plus schemas."""
+    schemas = [convert_to_openai_tool(tool) for tool in catalog.tools(specs)]
+    return len(catalog.system_prompt(specs)) + len(json.dumps(schemas))
+
+
+def time_it(fn, repeat: int) -> float:
+    """Return the best wall time in milliseconds over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    catalog = build_catalog()
+    everything = list(catalog)
+    llm = ChatOpenAI(model="gpt-4o-mini", api_key="sk-benchmark")
+
+    full_chars = prompt_chars(catalog, everything)
+    full_bind_ms = time_it(lambda: llm.bind_tools(catalog.tools(everything)), args.repeat)
+    print(f"{len(catalog)}-tool catalog (tokens estimated at 4 characters each)")
+    print(f"  all tools bound: {full_chars:7,} chars ~{full_chars // 4:6,} tokens, "
+          f"bind {full_bind_ms:6.2f} ms")
+
+    fresh = build_catalog()
+    for request in REQUESTS:
+        selected = fresh.select(request)
+        select_us = time_it(lambda: fresh.select(request), args.repeat) * 1000
+        chars = prompt_chars(fresh, selected)
+        bind_ms = time_it(lambda: llm.bind_tools(fresh.tools(selected)), args.repeat)
+        names = ", ".join(spec.name for spec in selected) or "(none)"
+        print(f"\n  {request!r}")
+        print(f"    selected: {names}")
+        print(f"    {chars:7,} chars ~{chars // 4:6,} tokens ({chars / full_chars:6.1%}), "
+              f"select {select_us:6.1f} us, bind {bind_ms:6.2f} ms")
+    print(f"\n  tools loaded by these requests: {len(fresh.loaded())} of {len(fresh)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Macro-benchmarks: the FastAPI app end to end, in-process, with a stubbed model.
+
+Each request goes through the middleware, routes, graph, tool executor and
+storage; only the LLM is replaced, by a stub that answers instantly, so the
+numbers are this service's own overhead. The tool result cache is disabled
+so tool calls really run.
+
+Registered with benchmarks.suite; run with
+    python -m benchmarks.suite run --level macro
+"""
+
+from benchmarks.suite import Context, benchmark
+from tests.stub_model import StubChatModel, answer_message, tool_call_message
+
+
+class LoopingModel(StubChatModel):
+    """A stub model that replays its script forever."""
+
+    def __init__(self, script):
+        super().__init__(script)
+        self.position = 0
+
+    def invoke(self, messages, *args, **kwargs):
+        response = self.script[self.position % len(self.script)]
+        self.position += 1
+        return response
+
+
+def _replace(context: Context, module, name: str, value):
+    """Set a module global for the rest of the run; it is restored afterwards."""
+    context.stack.callback(setattr, module, name, getattr(module, name))
+    setattr(module, name, value)
+
+
+def _client(context: Context):
+    """A TestClient for the app, backed by a fresh database."""
+
+    def build():
+        from fastapi.testclient import TestClient
+
+        from main import app
+        from src.agent import graph
+        from src.api import routes
+        from src.persistence import CachedTaskStorage, TaskStorage
+        from src.tools.cache import ToolResultCache
+
+        storage = CachedTaskStorage(TaskStorage(str(context.tmp / "macro.db")))
+        context.stack.callback(storage.close)
+        _replace(context, routes, "storage", storage)
+        _replace(context, graph, "tool_cache", ToolResultCache(max_entries=0))
+        client = context.stack.enter_context(TestClient(app))
+        return client
+
+    return context.shared("client", build)
+
+
+def _script(context: Context, *messages):
+    """Answer every LLM call from messages, in turn."""
+    from src.agent import graph
+
+    model = LoopingModel(list(messages))
+    _replace(context, graph, "ChatOpenAI", lambda *args, **kwargs: model)
+
+
+@benchmark("app.task.answer", level="macro")
+def task_answer(context: Context):
+    """POST /api/tasks answered without tools."""
+    client = _client(context)
+    _script(context, answer_message("Hello!"))
+    return lambda: client.post("/api/tasks", json={"task": "Say hello"}).raise_for_status()
+
+
+@benchmark("app.task.calculator", level="macro")
+def task_calculator(context: Context):
+    """POST /api/tasks with one CalculatorTool call (worker process)."""
+    client = _client(context)
+    _script(
+        context,
+        tool_call_message("CalculatorTool", {"expression": "6 * 7"}),
+        answer_message("6 * 7 = 42"),
+    )
+    return lambda: client.post("/api/tasks", json={"task": "What is 6 * 7?"}).raise_for_status()
+
+
+@benchmark("app.task.weather", level="macro")
+def task_weather(context: Context):
+    """POST /api/tasks with one WeatherMockTool call (thread)."""
+    client = _client(context)
+    _script(
+        context,
+        tool_call_message("WeatherMockTool", {"city": "Paris"}),
+        answer_message("It is overcast in Paris."),
+    )
+    return lambda: client.post("/api/tasks", json={"task": "Weather in Paris?"}).raise_for_status()
+
+
+@benchmark("app.task.stream", level="macro")
+def task_stream(context: Context):
+    """POST /api/tasks/stream with a tool call, reading the whole event stream."""
+    client = _client(context)
+    _script(
+        context,
+        tool_call_message("WeatherMockTool", {"city": "Paris"}),
+        answer_message("It is overcast in Paris."),
+    )
+
+    def stream():
+        response = client.post("/api/tasks/stream", json={"task": "Weather in Paris?"})
+        assert '"event_type": "complete"' in response.text
+
+    return stream
+
+
+@benchmark("app.history.page", level="macro")
+def history_page(context: Context):
+    """GET /api/tasks, a 100-task page of history."""
+    from benchmarks.bench_serialization import populate
+    from src.api import routes
+
+    client = _client(context)
+    populate(routes.storage, 100)
+    return lambda: client.get("/api/tasks", params={"limit": 100}).raise_for_status()
@@ -0,0 +1,163 @@
+"""Micro-benchmarks: tools, tool selection, task storage and route serialization.
+
+Registered with benchmarks.suite; run with
+    python -m benchmarks.suite run --level micro
+"""
+
+import itertools
+import json
+
+from benchmarks.bench_calculator import generate
+from benchmarks.bench_serialization import populate
+from benchmarks.suite import Context, benchmark
+
+# Database sizes for the storage benchmarks (--quick skips the largest)
+DB_SIZES = (100, 1_000, 10_000)
+PAGE_SIZE = 100
+
+
+# Tools, invoked as the agent would (through LangChain's tool interface)
+
+
+@benchmark("tools.calculator.invoke")
+def calculator_invoke(context: Context):
+    """CalculatorTool on a rotating set of 64 expressions."""
+    from src.tools.calculator import CalculatorTool
+
+    expressions = itertools.cycle(generate(64))
+    return lambda: CalculatorTool.invoke({"expression": next(expressions)})
+
+
+def _text_processor(size: int, operation: str):
+    def setup(context: Context):
+        from src.tools.text_processor import TextProcessorTool
+
+        words = ("lorem", "ipsum", "dolor", "sit", "amet,", "consectetur\n")
+        text = " ".join(words[i % len(words)] for i in range(size // 6 + 1))[:size]
+        return lambda: TextProcessorTool.invoke({"text": text, "operation": operation})
+
+    setup.__doc__ = f"TextProcessorTool {operation} on {size:,} characters"
+    return setup
+
+
+for _size, _label in ((1 << 10, "1kb"), (1 << 20, "1mb")):
+    for _operation in ("word_count", "uppercase"):
+        benchmark(f"tools.text_processor.{_operation}.{_label}")(
+            _text_processor(_size, _operation)
+        )
+
+
+@benchmark("tools.weather.invoke")
+def weather_invoke(context: Context):
+    """WeatherMockTool for a known city (resolution is memoized)."""
+    from src.tools.weather_mock import WeatherMockTool
+
+    return lambda: WeatherMockTool.invoke({"city": "Paris"})
+
+
+@benchmark("tools.weather.lookup.fuzzy")
+def weather_fuzzy_lookup(context: Context):
+    """City index fuzzy lookup of a misspelled city, uncached."""
+    from src.tools.cities import get_index
+
+    index = get_index()
+    return lambda: index.lookup("Sann Franciscoo")
+
+
+@benchmark("tools.registry.select")
+def registry_select(context: Context):
+    """Tool selection for a two-tool request."""
+    from src.tools import registry
+
+    return lambda: registry.select("What is 6 * 7 and the weather in Paris?")
+
+
+# Task storage at different database sizes
+
+
+def _storage(context: Context, size: int):
+    def build():
+        from src.persistence import TaskStorage
+
+        storage = TaskStorage(str(context.tmp / f"storage-{size}.db"))
+        context.stack.callback(storage.close)
+        populate(storage, size)
+        return storage
+
+    return context.shared(f"storage-{size}", build)
+
+
+def _save_task(size: int):
+    def setup(context: Context):
+        storage = _storage(context, size)
+        record = storage.get_all_tasks(limit=1)[0]
+
+        def save():
+            record.id = None
+            storage.save_task(record)
+
+        return save
+
+    setup.__doc__ = f"TaskStorage.save_task into a {size:,}-task database"
+    return setup
+
+
+def _get_all_tasks(size: int):
+    def setup(context: Context):
+        storage = _storage(context, size)
+        return lambda: storage.get_all_tasks(limit=PAGE_SIZE)
+
+    setup.__doc__ = f"TaskStorage.get_all_tasks, {PAGE_SIZE}-task page of {size:,}"
+    return setup
+
+
+def _row_to_record(size: int):
+    def setup(context: Context):
+        storage = _storage(context, size)
+        with storage._get_connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM tasks ORDER BY created_at DESC LIMIT ?", (PAGE_SIZE,)
+            ).fetchall()
+        return lambda: [storage._row_to_record(row) for row in rows]
+
+    setup.__doc__ = f"TaskStorage._row_to_record, {PAGE_SIZE} rows of a {size:,}-task database"
+    return setup
+
+
+for _db_size in DB_SIZES:
+    _slow = _db_size == DB_SIZES[-1]
+    benchmark(f"storage.save_task.{_db_size}", slow=_slow)(_save_task(_db_size))
+    benchmark(f"storage.get_all_tasks.{_db_size}", slow=_slow)(_get_all_tasks(_db_size))
+    benchmark(f"storage.row_to_record.{_db_size}", slow=_slow)(_row_to_record(_db_size))
+
+
+# Route serialization of a history page
+
+
+def _page(context: Context):
+    return _storage(context, DB_SIZES[0]).get_all_tasks(limit=PAGE_SIZE)
+
+
+@benchmark("routes.serialize.models")
+def serialize_models(context: Context):
+    """A history page through TaskResponse models and jsonable_encoder."""
+    from fastapi.encoders import jsonable_encoder
+
+    from src.api.routes import _to_response
+
+    tasks = _page(context)
+    return lambda: json.dumps(jsonable_encoder([_to_response(task) for task in tasks]))
+
+
+@benchmark("routes.serialize.to_json")
+def serialize_to_json(context: Context):
+    """A history page through TaskRecord.to_json (the write-time serialization)."""
+    tasks = _page(context)
+    return lambda: [task.to_json() for task in tasks]
+
+
+@benchmark("routes.serialize.stored_json")
+def serialize_stored_json(context: Context):
+    """A history page stitched from response bodies stored at write time."""
+    storage = _storage(context, DB_SIZES[0])
+    return lambda: storage.get_all_tasks_json(limit=PAGE_SIZE)
@@ -0,0 +1,315 @@
+"""Benchmark suite with JSON baselines and a regression gate.
+
+Benchmarks come in two levels: micro (tools, storage, serialization; see
+benchmarks/micro.py) and macro (the FastAPI app driven in-process with a
+stubbed model; see benchmarks/macro.py). Each is timed in loops long enough
+to measure (at least --min-time seconds), repeated --repeat times; the
+median per-call time is what gets compared.
+
+Usage:
+    # Run everything and save the results as a baseline
+    python -m benchmarks.suite run -o baseline.json
+
+    # Later: run again and fail (exit 1) on anything >15% slower
+    python -m benchmarks.suite run --baseline baseline.json
+
+    # Or compare two saved runs
+    python -m benchmarks.suite compare base.json new.json --threshold 0.15
+
+    # Subsets: --level micro|macro, --filter storage, --quick to skip the slowest
+
+Baselines are machine-specific and not committed; bench_gate.sh measures the
+base ref and the checkout back to back and gates on the comparison.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+LEVELS = ("micro", "macro")
+
+# Relative slowdown in the median that counts as a regression
+DEFAULT_THRESHOLD = 0.15
+# Changes smaller than this many milliseconds are noise, whatever the ratio
+DEFAULT_MIN_DELTA_MS = 0.005
+
+
+@dataclass
+class Context:
+    """Shared state for one suite run.
+
+    Fixtures that several benchmarks need (a populated database, an app
+    client) are built once through shared(); cleanups go on stack.
+    """
+
+    tmp: Path
+    quick: bool = False
+    stack: ExitStack = field(default_factory=ExitStack)
+    _shared: dict = field(default_factory=dict)
+
+    def shared(self, key: str, build: Callable[[], Any]) -> Any:
+        if key not in self._shared:
+            self._shared[key] = build()
+        return self._shared[key]
+
+
+@dataclass
+class Benchmark:
+    """setup(context) prepares inputs and returns the callable to time."""
+
+    name: str
+    level: str
+    setup: Callable[[Context], Callable[[], Any]]
+    description: str = ""
+    slow: bool = False  # skipped by --quick
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, level: str = "micro", description: str = "", slow: bool = False):
+    """Register a setup function as a benchmark (described by its docstring by default)."""
+    if level not in LEVELS:
+        raise ValueError(f"level must be one of {LEVELS}")
+
+    def register(setup: Callable[[Context], Callable[[], Any]]):
+        description_ = description or (setup.__doc__ or "").strip()
+        BENCHMARKS[name] = Benchmark(name, level, setup, description_, slow)
+        return setup
+
+    return register
+
+
+def _loop_time(fn: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(fn: Callable[[], Any], repeat: int = 7, min_time: float = 0.05) -> dict:
+    """Per-call timings of fn, in milliseconds.
+
+    After one warm-up call, the loop count is raised (1, 2, 5, 10, 20, ...)
+    until a loop takes at least min_time seconds; that loop is then timed
+    repeat times.
+    """
+    fn()
+    number, steps = 1, (2, 2.5, 2)
+    step = 0
+    while True:
+        elapsed = _loop_time(fn, number)
+        if elapsed >= min_time:
+            break
+        number = int(number * steps[step % 3])
+        step += 1
+    samples = [elapsed / number] + [_loop_time(fn, number) / number for _ in range(repeat - 1)]
+    samples_ms = [sample * 1000 for sample in samples]
+    return {
+        "median_ms": round(statistics.median(samples_ms), 6),
+        "min_ms": round(min(samples_ms), 6),
+        "max_ms": round(max(samples_ms), 6),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def environment() -> dict:
+    """Where results were produced; baselines only compare well on the same machine."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def select(
+    level: Optional[str] = None, pattern: Optional[str] = None, quick: bool = False
+) -> list[Benchmark]:
+    """Registered benchmarks of a level whose name matches a glob or substring.
+
+    With quick, slow benchmarks are left out.
+    """
+    _load()
+    chosen = []
+    for bench in BENCHMARKS.values():
+        if level and bench.level != level:
+            continue
+        if quick and bench.slow:
+            continue
+        if pattern and pattern not in bench.name and not fnmatch.fnmatch(bench.name, pattern):
+            continue
+        chosen.append(bench)
+    return chosen
+
+
+def run(
+    benchmarks: list[Benchmark],
+    repeat: int = 7,
+    min_time: float = 0.05,
+    quick: bool = False,
+    report: Callable[[str], None] = print,
+) -> dict:
+    """Run benchmarks in order and return a results document."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        context = Context(tmp=Path(tmp), quick=quick)
+        with context.stack:
+            # Keep anything that opens the default task database out of the cwd
+            if "TASK_DB_PATH" not in os.environ:
+                os.environ["TASK_DB_PATH"] = str(Path(tmp) / "tasks.db")
+                context.stack.callback(os.environ.pop, "TASK_DB_PATH", None)
+            for bench in benchmarks:
+                timing = measure(bench.setup(context), repeat=repeat, min_time=min_time)
+                results[bench.name] = {"level": bench.level, **timing}
+                report(f"  {bench.name:<44} {timing['median_ms']:>12.4f} ms")
+    return {
+        "environment": environment(),
+        "settings": {"repeat": repeat, "min_time": min_time, "quick": quick},
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> list[dict]:
+    """Compare median timings, one row per benchmark in either document.
+
+    Status is "regression" if the current median is more than threshold
+    (relative) and min_delta_ms (absolute) slower, "improved" for the
+    mirror case, "ok" otherwise, and "new" or "missing" for benchmarks
+    only one side has.
+    """
+    base_results, current_results = baseline["results"], current["results"]
+    rows = []
+    for name in list(base_results) + [n for n in current_results if n not in base_results]:
+        base = base_results.get(name, {}).get("median_ms")
+        now = current_results.get(name, {}).get("median_ms")
+        row = {"name": name, "baseline_ms": base, "current_ms": now, "change": None}
+        if base is None:
+            row["status"] = "new"
+        elif now is None:
+            row["status"] = "missing"
+        else:
+            row["change"] = round(now / base - 1, 4) if base else 0.0
+            delta = now - base
+            if delta > min_delta_ms and now > base * (1 + threshold):
+                row["status"] = "regression"
+            elif -delta > min_delta_ms and base > now * (1 + threshold):
+                row["status"] = "improved"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def format_comparison(rows: list[dict]) -> str:
+    lines = [f"  {'benchmark':<44} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for row in rows:
+        base = f"{row['baseline_ms']:.4f}" if row["baseline_ms"] is not None else "-"
+        now = f"{row['current_ms']:.4f}" if row["current_ms"] is not None else "-"
+        change = f"{row['change']:+.1%}" if row["change"] is not None else ""
+        flag = "" if row["status"] == "ok" else f"  {row['status'].upper()}"
+        lines.append(f"  {row['name']:<44} {base:>12} {now:>12} {change:>8}{flag}")
+    return "\n".join(lines)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(document: dict, path: str):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+
+
+def _load():
+    """Import the benchmark definitions, which register themselves."""
+    from benchmarks import micro  # noqa: F401
+    from benchmarks import macro  # noqa: F401
+
+
+def _gate(rows: list[dict], threshold: float) -> int:
+    print(format_comparison(rows))
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        names = ", ".join(regressions)
+        print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%}: {names}")
+        return 1
+    print(f"\nNo regressions beyond {threshold:.0%}")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks")
+    run_parser.add_argument("--level", choices=LEVELS)
+    run_parser.add_argument("--filter", help="Glob or substring of benchmark names")
+    run_parser.add_argument("--repeat", type=int, default=7)
+    run_parser.add_argument("--min-time", type=float, default=0.05)
+    run_parser.add_argument("--quick", action="store_true", help="Skip the slowest benchmarks")
+    run_parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    run_parser.add_argument("--baseline", help="Compare against this results file afterwards")
+    run_parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+
+    compare_parser = commands.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+        sub.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        rows = compare(load(args.baseline), load(args.current), args.threshold, args.min_delta_ms)
+        return _gate(rows, args.threshold)
+
+    benchmarks = select(args.level, args.filter, args.quick)
+    if args.list:
+        for bench in benchmarks:
+            print(f"  {bench.level:<6} {bench.name:<44} {bench.description}")
+        return 0
+    if not benchmarks:
+        print("No benchmarks match", file=sys.stderr)
+        return 2
+
+    print(f"{len(benchmarks)} benchmarks (median per call, {args.repeat} repeats)")
+    document = run(benchmarks, args.repeat, args.min_time, args.quick)
+    if args.output:
+        save(document, args.output)
+        print(f"\nResults written to {args.output}")
+    if args.baseline:
+        print()
+        rows = compare(load(args.baseline), document, args.threshold, args.min_delta_ms)
+        return _gate(rows, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    # Run the imported module's main, so benchmarks register where it looks
+    from benchmarks.suite import main as suite_main
+
+    sys.exit(suite_main())
@@ -1,19 +1,37 @@
 """Main FastAPI application entry point."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
+# Load environment variables before the routes read their configuration
+load_dotenv()
+
 from src.api import router
+from src.api.compression import CompressionMiddleware
+from src.api.routes import sweepers, retention_interval
+from src.api.tracing import TracingMiddleware
+from src.tracing import tracer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background maintenance."""
+    for sweeper in sweepers:
+        sweeper.start(interval=retention_interval)
+    yield
+    for sweeper in sweepers:
+        sweeper.stop()
 
-# Load environment variables
-load_dotenv()
 
 # Create FastAPI app
 app = FastAPI(
     title="BMO Chat Agent API",
     description="LangGraph-based agent with streaming and memory for task processing",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -23,8 +41,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Run-Id", "X-Total-Count", "X-Trace-Id"],
 )
 
+# Compress large JSON responses (never SSE streams)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# A span per request (added last, so it is outermost and times everything)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 # Include API routes
 app.include_router(router, prefix="/api")
 
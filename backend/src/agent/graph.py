@@ -2,15 +2,28 @@
 
 from typing import Annotated, TypedDict, Sequence, Literal
 from datetime import datetime
+import asyncio
+import atexit
+import functools
+import json
 import operator
+import os
+import time
 
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 from langgraph.checkpoint.memory import MemorySaver
 
-from src.tools import TextProcessorTool, CalculatorTool, WeatherMockTool
+from src.agent.hedging import Hedger
+from src.agent.prompts import PromptCache
+from src.agent.routing import ModelRouter, validate
+from src.metrics import metrics
+from src.tools import registry as tool_registry
+from src.tools.cache import ToolResultCache
+from src.tools.executor import ToolExecutor
+from src.tracing import tracer
 
 
 class ExecutionStep(TypedDict):
@@ -21,6 +34,14 @@ class ExecutionStep(TypedDict):
     timestamp: str
 
 
+def merge_usage(current: dict, update: dict) -> dict:
+    """Reducer that sums per-node timing and token counters."""
+    merged = dict(current or {})
+    for key, value in (update or {}).items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
+
 class AgentState(TypedDict):
     """State maintained throughout the agent's execution."""
 
@@ -28,10 +49,29 @@ class AgentState(TypedDict):
     execution_steps: Annotated[list[ExecutionStep], operator.add]
     tools_used: list[str]
     final_output: str | None
+    # Summed counters: queue_ms, llm_ms, tool_ms, llm_calls, prompt_tokens, completion_tokens,
+    # cached_tokens, llm_escalations, tool_cache_hits
+    usage: Annotated[dict, merge_usage]
+
 
+# Results of tools whose metadata marks them cacheable, shared across tasks (0 disables)
+tool_cache = ToolResultCache(max_entries=int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "1024")))
+metrics.register("tool_cache", tool_cache.stats)
 
-# Define available tools
-TOOLS = [TextProcessorTool, CalculatorTool, WeatherMockTool]
+# Runs tool calls in worker processes or threads, per each tool's metadata
+tool_executor = ToolExecutor(
+    process_workers=int(os.getenv("TOOL_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+)
+metrics.register("tool_executor", tool_executor.stats)
+atexit.register(tool_executor.shutdown)
+
+# Re-issues LLM calls slower than a latency percentile (off unless LLM_HEDGE_PERCENTILE is set)
+llm_hedger = Hedger.from_env()
+metrics.register("llm_hedging", llm_hedger.stats)
+
+# Cheapest-first model ladder (LLM_MODELS); simple requests start at the bottom
+model_router = ModelRouter.from_env()
+metrics.register("model_routing", model_router.stats)
 
 
 def create_step(step_number: int, description: str) -> ExecutionStep:
@@ -43,41 +83,115 @@ def create_step(step_number: int, description: str) -> ExecutionStep:
     )
 
 
-def agent_node(state: AgentState) -> dict:
-    """The main agent node that decides what to do next."""
-    messages = state["messages"]
-    current_step = len(state.get("execution_steps", [])) + 1
-
-    # Create the LLM with tools bound
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    llm_with_tools = llm.bind_tools(TOOLS)
+def elapsed_ms(start: float) -> float:
+    """Milliseconds since a time.perf_counter() reading."""
+    return round((time.perf_counter() - start) * 1000, 3)
 
-    # Add system prompt for tool selection
-    system_message = """You are a helpful assistant with access to the following tools:
 
-1. TextProcessorTool - For text operations like uppercase, lowercase, word_count, char_count, reverse, title_case
-2. CalculatorTool - For mathematical calculations (e.g., "3 + 5", "10 * 2")
-3. WeatherMockTool - For getting weather information for a city
-
-Analyze the user's request and use the appropriate tool(s) to help them.
-Be concise and direct in your responses."""
-
-    # Prepare messages with system context
-    from langchain_core.messages import SystemMessage
+async def agent_node(state: AgentState, config: RunnableConfig, prompts: PromptCache) -> dict:
+    """The main agent node that decides what to do next."""
+    with tracer.span("agent_node"):
+        return await _agent_step(state, config, prompts)
 
-    full_messages = [SystemMessage(content=system_message)] + list(messages)
 
-    # Invoke the LLM
-    response = llm_with_tools.invoke(full_messages)
+async def _agent_step(state: AgentState, config: RunnableConfig, prompts: PromptCache) -> dict:
+    messages = state["messages"]
+    current_step = len(state.get("execution_steps", [])) + 1
+    usage = {}
+
+    # Time between the request arriving and the graph first running
+    submitted_at = config.get("configurable", {}).get("submitted_at")
+    if submitted_at is not None and not state.get("usage", {}).get("llm_calls"):
+        usage["queue_ms"] = round((time.time() - submitted_at) * 1000, 3)
+
+    # Bind only the tools relevant to this request, plus any already used in
+    # the conversation, and describe just those in the system prompt
+    request = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+    used = {m.name for m in messages if isinstance(m, ToolMessage)}
+    selected = tool_registry.select(request, used)
+    metrics.increment("tool_selection.calls")
+    metrics.increment("tool_selection.tools_bound", len(selected))
+
+    # The tool definitions, system prompt and bound model are built once per
+    # selection and reused byte for byte, so the provider can serve them from
+    # its prompt cache; only the conversation after them varies
+    system_message, tool_schemas = prompts.get(selected)
+    full_messages = [system_message] + list(messages)
 
     # Track execution
     steps = [create_step(current_step, f"Received input: \"{messages[-1].content}\"")]
 
+    # Start simple requests on the cheapest model and move up the ladder
+    # while responses fail validation
+    route = model_router.route(messages, selected)
+    models = model_router.models
+    tracer.current().set_attributes(
+        **{
+            "tools.selected": [spec.name for spec in selected],
+            "route.complexity": route.complexity,
+            "route.reason": route.reason,
+        }
+    )
+    steps.append(
+        create_step(
+            current_step + len(steps),
+            f"Routed to {models[route.start]} ({route.complexity}: {route.reason})",
+        )
+    )
+    for index in range(route.start, len(models)):
+        llm_with_tools = prompts.model(ChatOpenAI, models[index], selected)
+
+        # Invoke the LLM asynchronously so cancelling the run aborts the request
+        # (and its hedge, if one was sent)
+        with tracer.span("llm.call", kind="client", **{"llm.model": models[index]}) as span:
+            start = time.perf_counter()
+            response = await llm_hedger.call(lambda: llm_with_tools.ainvoke(full_messages))
+            call_ms = elapsed_ms(start)
+
+            token_usage = getattr(response, "usage_metadata", None) or {}
+            prompt_tokens = token_usage.get("input_tokens", 0)
+            completion_tokens = token_usage.get("output_tokens", 0)
+            cached_tokens = (token_usage.get("input_token_details") or {}).get("cache_read", 0)
+            problem = validate(response, tool_schemas)
+            span.set_attributes(
+                **{
+                    "llm.prompt_tokens": prompt_tokens,
+                    "llm.cached_tokens": cached_tokens,
+                    "llm.completion_tokens": completion_tokens,
+                    "llm.tool_calls": [call["name"] for call in response.tool_calls],
+                }
+            )
+            if problem is not None:
+                span.set_attribute("llm.validation_error", problem)
+
+        usage["llm_ms"] = usage.get("llm_ms", 0) + call_ms
+        usage["llm_calls"] = usage.get("llm_calls", 0) + 1
+        usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + prompt_tokens
+        usage["completion_tokens"] = usage.get("completion_tokens", 0) + completion_tokens
+        usage["cached_tokens"] = usage.get("cached_tokens", 0) + cached_tokens
+        prompts.record(prompt_tokens, cached_tokens)
+        model_router.record(models[index], call_ms, problem)
+        if problem is None or index == len(models) - 1:
+            steps.append(
+                create_step(
+                    current_step + len(steps), f"{models[index]} responded in {call_ms:g} ms"
+                )
+            )
+            break
+        usage["llm_escalations"] = usage.get("llm_escalations", 0) + 1
+        steps.append(
+            create_step(
+                current_step + len(steps),
+                f"{models[index]} response failed validation ({problem}); "
+                f"escalating to {models[index + 1]}",
+            )
+        )
+
     if response.tool_calls:
         tool_names = [tc["name"] for tc in response.tool_calls]
         steps.append(
             create_step(
-                current_step + 1,
+                current_step + len(steps),
                 f"Selected tool(s): {', '.join(tool_names)}",
             )
         )
@@ -87,11 +201,26 @@ Be concise and direct in your responses."""
         "execution_steps": steps,
         "tools_used": state.get("tools_used", []),
         "final_output": None,
+        "usage": usage,
     }
 
 
-def tool_node_wrapper(state: AgentState) -> dict:
+async def tool_node_wrapper(state: AgentState) -> dict:
     """Wrapper around tool execution to track which tools were used."""
+    with tracer.span("tool_node"):
+        return await _run_tools(state)
+
+
+async def _run_tool(tool_call: dict) -> ToolMessage:
+    """Execute one tool call in its own span."""
+    with tracer.span("tool.call", **{"tool.name": tool_call["name"]}) as span:
+        msg = await tool_executor.run(tool_registry.get(tool_call["name"]), tool_call)
+        if msg.status != "success":
+            span.set_error(json.loads(msg.content)["error"])
+        return msg
+
+
+async def _run_tools(state: AgentState) -> dict:
     messages = state["messages"]
     last_message = messages[-1]
     current_step = len(state.get("execution_steps", [])) + 1
@@ -106,25 +235,60 @@ def tool_node_wrapper(state: AgentState) -> dict:
         if tool_name not in tools_used:
             tools_used.append(tool_name)
 
-    # Execute tools using ToolNode
-    tool_node = ToolNode(TOOLS)
-    result = tool_node.invoke(state)
+    # Answer cacheable calls seen before from the cache; run the rest
+    results: dict[str, ToolMessage] = {}
+    pending = []
+    for tool_call in tool_calls:
+        key = tool_cache.key(tool_registry.get(tool_call["name"]), tool_call["args"])
+        content = tool_cache.get(key) if key else None
+        if content is None:
+            pending.append((tool_call, key))
+        else:
+            results[tool_call["id"]] = ToolMessage(
+                content=content, name=tool_call["name"], tool_call_id=tool_call["id"]
+            )
+    cached_ids = set(results)
+
+    # Execute the rest concurrently, each in its tool's executor
+    start = time.perf_counter()
+    executed = await asyncio.gather(*(_run_tool(tool_call) for tool_call, _ in pending))
+    tool_ms = elapsed_ms(start)
+    for (tool_call, key), msg in zip(pending, executed):
+        results[tool_call["id"]] = msg
+        if msg.status == "success":
+            if key and isinstance(msg.content, str):
+                tool_cache.put(key, tool_registry.get(tool_call["name"]), msg.content)
+        else:
+            metrics.increment(f"tool_calls.errors.{json.loads(msg.content)['error']}")
+    metrics.increment("tool_calls.cached", len(cached_ids))
+    metrics.increment("tool_calls.executed", len(pending))
+    tracer.current().set_attributes(
+        **{"tool_calls.cached": len(cached_ids), "tool_calls.executed": len(pending)}
+    )
+
+    # Keep the order of the model's tool calls
+    tool_messages = [results[tc["id"]] for tc in tool_calls if tc["id"] in results]
 
     # Add execution steps for each tool result
-    for i, msg in enumerate(result.get("messages", [])):
-        if isinstance(msg, ToolMessage):
-            steps.append(
-                create_step(
-                    current_step + i,
-                    f"Tool result from {msg.name}: {msg.content[:100]}{'...' if len(msg.content) > 100 else ''}",
-                )
+    for i, msg in enumerate(tool_messages):
+        source = " (cached)" if msg.tool_call_id in cached_ids else ""
+        steps.append(
+            create_step(
+                current_step + i,
+                f"Tool result from {msg.name}{source}: {msg.content[:100]}{'...' if len(msg.content) > 100 else ''}",
             )
+        )
+
+    usage = {"tool_ms": tool_ms}
+    if cached_ids:
+        usage["tool_cache_hits"] = len(cached_ids)
 
     return {
-        "messages": result.get("messages", []),
+        "messages": tool_messages,
         "execution_steps": steps,
         "tools_used": tools_used,
         "final_output": None,
+        "usage": usage,
     }
 
 
@@ -142,6 +306,11 @@ def should_continue(state: AgentState) -> Literal["tools", "final"]:
 
 def final_node(state: AgentState) -> dict:
     """Final node to prepare the output."""
+    with tracer.span("final_node"):
+        return _finish(state)
+
+
+def _finish(state: AgentState) -> dict:
     messages = state["messages"]
     last_message = messages[-1]
     current_step = len(state.get("execution_steps", [])) + 1
@@ -164,8 +333,12 @@ def create_agent():
     # Build the graph
     workflow = StateGraph(AgentState)
 
+    # Prompt prefixes for this graph's tools, shared by every run
+    prompts = PromptCache(tool_registry)
+    metrics.register("prompt_cache", prompts.stats)
+
     # Add nodes
-    workflow.add_node("agent", agent_node)
+    workflow.add_node("agent", functools.partial(agent_node, prompts=prompts))
     workflow.add_node("tools", tool_node_wrapper)
     workflow.add_node("final", final_node)
 
@@ -219,6 +392,7 @@ async def run_agent(
         "execution_steps": [],
         "tools_used": [],
         "final_output": None,
+        "usage": {},
     }
 
     # Stream the execution
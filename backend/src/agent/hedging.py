@@ -0,0 +1,149 @@
+"""Hedged requests: re-issue a slow call and take whichever answer comes first.
+
+If a call hasn't finished after the chosen percentile of recent call
+latencies (p95 by default), an identical second request is started. The
+first one to succeed wins and the other is cancelled. Hedges are paid for
+out of a budget that earns `budget` of a hedge per call, so they add at most
+that fraction of extra upstream requests over time (plus a small burst).
+
+Until min_samples calls have completed there is no percentile to go on, and
+nothing is hedged.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Hedger:
+    """Runs calls with an optional hedged second attempt.
+
+    With percentile=None, hedging is off and calls run as they are (still
+    counted in stats).
+    """
+
+    def __init__(
+        self,
+        percentile: Optional[float] = 95.0,
+        budget: float = 0.05,
+        burst: float = 5.0,
+        window: int = 256,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.percentile = percentile
+        self.budget = budget
+        self.burst = burst
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.clock = clock
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._credit = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+
+    @classmethod
+    def from_env(cls) -> "Hedger":
+        """Build a hedger from LLM_HEDGE_* environment variables (off unless a percentile is set)."""
+        percentile = os.getenv("LLM_HEDGE_PERCENTILE")
+        return cls(
+            percentile=float(percentile) if percentile else None,
+            budget=float(os.getenv("LLM_HEDGE_BUDGET", "0.05")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.percentile is not None
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if calls shouldn't be hedged yet."""
+        with self._lock:
+            if not self.enabled or len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        # Nearest-rank percentile
+        rank = max(1, math.ceil(self.percentile / 100 * len(ordered)))
+        return max(self.min_delay, ordered[rank - 1])
+
+    def _start_call(self):
+        with self._lock:
+            self.calls += 1
+            self._credit = min(self.burst, self._credit + self.budget)
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._credit < 1:
+                self.budget_exhausted += 1
+                return False
+            self._credit -= 1
+            self.hedged += 1
+            return True
+
+    def _record(self, latency: float, hedge_won: bool):
+        with self._lock:
+            self._latencies.append(latency)
+            if hedge_won:
+                self.hedge_wins += 1
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Await request(), hedging it with a second request() if it is slow.
+
+        If one attempt fails while the other is still running, the other's
+        result is used; if both fail, the first attempt's error is raised.
+        Cancelling the caller cancels both attempts.
+        """
+        self._start_call()
+        delay = self.delay()
+        started = self.clock()
+        attempts = [asyncio.ensure_future(request())]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._spend():
+                    attempts.append(asyncio.ensure_future(request()))
+            winner = await self._first_success(attempts)
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+                elif not attempt.cancelled():
+                    attempt.exception()  # mark a loser's error as retrieved
+        # A hedge win means the first attempt took at least this long; recording
+        # that lower bound keeps the percentile from drifting down as hedges succeed
+        self._record(self.clock() - started, hedge_won=winner is not attempts[0])
+        return winner.result()
+
+    @staticmethod
+    async def _first_success(attempts: list[asyncio.Future]) -> asyncio.Future:
+        pending = set(attempts)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in attempts:
+                if attempt in done and attempt.exception() is None:
+                    return attempt
+        return attempts[0]
+
+    def stats(self) -> dict:
+        delay = self.delay()
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "percentile": self.percentile,
+                "delay_ms": round(delay * 1000, 3) if delay is not None else None,
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "budget_exhausted": self.budget_exhausted,
+                "hedge_rate": round(self.hedged / self.calls, 4) if self.calls else 0.0,
+                "win_rate": round(self.hedge_wins / self.hedged, 4) if self.hedged else 0.0,
+            }
@@ -0,0 +1,99 @@
+"""System prompts and tool definitions, frozen per tool selection.
+
+Providers cache the longest request prefix they have seen recently (OpenAI:
+tool definitions, then messages in order, once the prefix reaches 1024
+tokens). A prefix only matches if it is byte-identical, so the system prompt
+and serialized tool definitions for a selection of tools are built once, in
+registry order, and reused for as long as the graph lives. The chat model
+with those definitions bound is built once per model and selection too, so a
+call only appends what varies between requests (conversation history, the
+new message).
+"""
+
+import threading
+from typing import Callable
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import SystemMessage
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.tools import ToolRegistry, ToolSpec
+
+
+class PromptCache:
+    """Per-selection system prompt and tool schemas, plus prompt-cache hit accounting."""
+
+    def __init__(self, registry: ToolRegistry):
+        self.registry = registry
+        self._schemas: dict[str, dict] = {}
+        self._entries: dict[tuple[str, ...], tuple[SystemMessage, list[dict]]] = {}
+        self._models: dict[tuple, Runnable] = {}
+        self._lock = threading.Lock()
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def _schema(self, name: str) -> dict:
+        """OpenAI tool definition, converted once per tool."""
+        schema = self._schemas.get(name)
+        if schema is None:
+            schema = self._schemas[name] = convert_to_openai_tool(self.registry.get(name))
+        return schema
+
+    def get(self, specs: list[ToolSpec]) -> tuple[SystemMessage, list[dict]]:
+        """The system message and OpenAI tool definitions for a selection.
+
+        The same objects are returned for every call with the same selection;
+        bind the definitions with llm.bind_tools(), which passes them through
+        unchanged.
+        """
+        key = tuple(spec.name for spec in specs)
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = (
+                        SystemMessage(content=self.registry.system_prompt(specs)),
+                        [self._schema(name) for name in key],
+                    )
+                    self._entries[key] = entry
+        return entry
+
+    def model(
+        self, chat_model: Callable[..., BaseChatModel], name: str, specs: list[ToolSpec]
+    ) -> Runnable:
+        """chat_model(model=name, temperature=0) with the selection's tools bound.
+
+        Built once per chat model class, model name and selection.
+        """
+        key = (chat_model, name, tuple(spec.name for spec in specs))
+        model = self._models.get(key)
+        if model is None:
+            _, tool_schemas = self.get(specs)
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = chat_model(model=name, temperature=0)
+                    if tool_schemas:
+                        model = model.bind_tools(tool_schemas)
+                    self._models[key] = model
+        return model
+
+    def record(self, prompt_tokens: int, cached_tokens: int):
+        """Count a response's prompt tokens and how many were served from cache."""
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "selections": len(self._entries),
+                "bound_models": len(self._models),
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "hit_rate": (
+                    round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0
+                ),
+            }
@@ -0,0 +1,141 @@
+"""Cheap-first model routing.
+
+Models are configured cheapest (and fastest) first. Each request is
+classified by local heuristics, with no model call: a short request that
+needs at most one tool is "simple" and starts on the first model; anything
+longer, multi-step or multi-tool is "complex" and starts on the last. A
+response that fails validation (a malformed tool call, a call to a tool that
+wasn't bound, missing arguments, or an empty answer) is retried on the next
+model up, until the strongest model has answered.
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from src.tools import ToolSpec
+
+DEFAULT_MODELS = ("gpt-4o-mini", "gpt-4o")
+
+# Requests longer than this many words are complex
+MAX_SIMPLE_WORDS = 40
+# Tool calls already made this turn, from which the rest of the turn is complex
+MAX_SIMPLE_TOOL_CALLS = 2
+
+_WORD = re.compile(r"[a-z0-9_]+")
+_MULTI_STEP = re.compile(r"\b(then|after that|afterwards|next|finally|and also|followed by)\b")
+_SENTENCE_END = re.compile(r"[.?!]+(\s|$)")
+
+
+@dataclass(frozen=True)
+class Route:
+    """Where a request starts on the model ladder, and why."""
+
+    complexity: str  # "simple" or "complex"
+    reason: str
+    start: int  # index into ModelRouter.models
+
+
+def validate(response: AIMessage, tool_schemas: Iterable[dict]) -> Optional[str]:
+    """What is wrong with a model response, or None if it is usable."""
+    if response.invalid_tool_calls:
+        name = response.invalid_tool_calls[0].get("name") or "unknown tool"
+        return f"malformed tool call to {name}"
+    schemas = {schema["function"]["name"]: schema["function"] for schema in tool_schemas}
+    for call in response.tool_calls:
+        schema = schemas.get(call["name"])
+        if schema is None:
+            return f"call to unavailable tool {call['name']}"
+        missing = [
+            name
+            for name in schema.get("parameters", {}).get("required", [])
+            if name not in call["args"]
+        ]
+        if missing:
+            return f"{call['name']} call missing {', '.join(missing)}"
+    if not response.tool_calls and not str(response.content).strip():
+        return "empty response"
+    return None
+
+
+class ModelRouter:
+    """Chooses the starting model per request and tracks per-model latency."""
+
+    def __init__(self, models: Iterable[str] = DEFAULT_MODELS):
+        self.models = tuple(models)
+        if not self.models:
+            raise ValueError("At least one model must be configured")
+        self._lock = threading.Lock()
+        self._routes = {"simple": 0, "complex": 0}
+        self._escalations = 0
+        self._models: dict[str, dict] = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """Build a router from LLM_MODELS (comma-separated, cheapest first)."""
+        models = os.getenv("LLM_MODELS")
+        if not models:
+            return cls()
+        return cls(model.strip() for model in models.split(",") if model.strip())
+
+    def classify(self, messages: list[BaseMessage], selected: list[ToolSpec]) -> tuple[str, str]:
+        """("simple" or "complex", reason) for the latest request in a conversation."""
+        turn_start = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0
+        )
+        request = str(messages[turn_start].content) if messages else ""
+        lowered = request.lower()
+        words = set(_WORD.findall(lowered))
+
+        word_count = len(lowered.split())
+        if word_count > MAX_SIMPLE_WORDS:
+            return "complex", f"{word_count} words"
+        tools = [spec.name for spec in selected if spec.score(words, lowered)]
+        if len(tools) > 1:
+            return "complex", f"needs {len(tools)} tools"
+        if _MULTI_STEP.search(lowered) or len(_SENTENCE_END.findall(request)) > 2:
+            return "complex", "multi-step request"
+        calls = sum(isinstance(m, ToolMessage) for m in messages[turn_start:])
+        if calls >= MAX_SIMPLE_TOOL_CALLS:
+            return "complex", f"{calls} tool calls so far"
+        return "simple", "short single-tool request" if tools else "short request"
+
+    def route(self, messages: list[BaseMessage], selected: list[ToolSpec]) -> Route:
+        """The model a request should start on."""
+        complexity, reason = self.classify(messages, selected)
+        with self._lock:
+            self._routes[complexity] += 1
+        return Route(complexity, reason, 0 if complexity == "simple" else len(self.models) - 1)
+
+    def record(self, model: str, elapsed_ms: float, problem: Optional[str]):
+        """Count one call to a model, and whether it is being escalated."""
+        with self._lock:
+            stats = self._models.setdefault(
+                model, {"calls": 0, "failed_validation": 0, "total_ms": 0.0}
+            )
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed_ms
+            if problem is not None:
+                stats["failed_validation"] += 1
+                if model != self.models[-1]:
+                    self._escalations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "models": list(self.models),
+                "routes": dict(self._routes),
+                "escalations": self._escalations,
+                "per_model": {
+                    model: {
+                        "calls": stats["calls"],
+                        "failed_validation": stats["failed_validation"],
+                        "avg_ms": round(stats["total_ms"] / stats["calls"], 3),
+                    }
+                    for model, stats in self._models.items()
+                },
+            }
@@ -0,0 +1,154 @@
+"""Negotiated gzip/brotli compression for API responses.
+
+Brotli is used when the optional `brotli` package is installed
+(pip install -e '.[compression]') and the client accepts it; otherwise gzip.
+Server-sent event streams are never compressed, since compressors buffer and
+would hold events back from the client.
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Content types worth compressing; anything else passes through untouched
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/")
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+
+def choose_encoding(accept_encoding: str, available: tuple[str, ...]) -> Optional[str]:
+    """Pick the available encoding with the highest q-value in Accept-Encoding.
+
+    Ties go to the earlier entry in available. Returns None if the client
+    accepts none of them.
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    """Incremental compressor for one response body."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=brotli_quality)
+            self.compress, self.finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self.compress, self.finish = compressor.compress, compressor.flush
+
+
+class CompressionMiddleware:
+    """Compress JSON and text responses of at least minimum_size bytes.
+
+    Streaming bodies (other than SSE) are compressed chunk by chunk. Responses
+    that already carry a Content-Encoding are left alone.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli else ("gzip",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def compressing_send(message: Message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                # First body chunk: decide whether to compress this response
+                headers = MutableHeaders(raw=list(start["headers"]))
+                compressible = self._compressible(headers)
+                if compressible:
+                    headers.add_vary_header("Accept-Encoding")
+                if not compressible or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    start["headers"] = headers.raw
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                data = compressor.compress(body)
+                if more_body:
+                    if "content-length" in headers:
+                        del headers["Content-Length"]
+                else:
+                    data += compressor.finish()
+                    headers["Content-Length"] = str(len(data))
+                start["headers"] = headers.raw
+                await send(start)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
+
+    @staticmethod
+    def _compressible(headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if content_type.startswith(EXCLUDED_CONTENT_TYPES):
+            return False
+        return content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
@@ -29,6 +29,15 @@ class TaskResponse(BaseModel):
     execution_steps: list[ExecutionStepResponse]
     created_at: str
     thread_id: str
+    status: str = "completed"  # "completed", "cancelled" or "error"
+    total_ms: float = 0.0
+    queue_ms: float = 0.0
+    llm_ms: float = 0.0
+    tool_ms: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
 
 
 class TaskStreamEvent(BaseModel):
@@ -1,234 +1,535 @@
 """FastAPI routes for the agent API."""
 
-import json
+import asyncio
+import dataclasses
+import os
+import time
 import uuid
 from datetime import datetime
-from typing import AsyncGenerator
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Header, HTTPException, Request, WebSocket
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from langchain_core.messages import HumanMessage
 
 from src.agent import create_agent
-from src.persistence import TaskStorage, TaskRecord
+from src.agent.graph import create_step
+from src.metrics import metrics
+from src.persistence import (
+    TaskStorage,
+    TaskRecord,
+    ShardedTaskStorage,
+    CachedTaskStorage,
+    RetentionPolicy,
+    RetentionSweeper,
+    create_storage_from_env,
+)
+from src.persistence.records import (
+    METRIC_FIELDS,
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_ERROR,
+    validate_fields,
+)
 from src.persistence.storage import ExecutionStepRecord
+from src.tracing import InMemoryExporter, export_request, tracer
 from .models import TaskRequest, TaskResponse, ExecutionStepResponse
+from .runs import Run, RunRegistry
+from .ws import DEFAULT_CREDIT, FRAMINGS, TaskSocket
 
 router = APIRouter()
 
 # Initialize storage and agent
-storage = TaskStorage()
+# (backend selected by TASK_STORAGE_BACKEND, see .env.example)
+backend = create_storage_from_env()
+storage = CachedTaskStorage(
+    backend, max_entries=int(os.getenv("TASK_CACHE_MAX_ENTRIES", "1024"))
+)
 agent_graph = create_agent()
+_disconnect_grace = os.getenv("RUN_DISCONNECT_GRACE_SECONDS", "10")
+runs = RunRegistry(
+    heartbeat_interval=float(os.getenv("SSE_HEARTBEAT_SECONDS", "15")),
+    finished_ttl=float(os.getenv("RUN_RETENTION_SECONDS", "300")),
+    disconnect_grace=(
+        None if _disconnect_grace == "off" else float(_disconnect_grace)
+    ),
+)
+# How often non-streaming requests check whether the client went away
+DISCONNECT_POLL_SECONDS = 0.1
+
+# Retention is opt-in and runs one sweeper per SQLite database
+retention_policy = RetentionPolicy.from_env()
+if isinstance(backend, ShardedTaskStorage):
+    _databases = backend.shards
+elif isinstance(backend, TaskStorage):
+    _databases = [backend]
+else:
+    _databases = []
+sweepers = (
+    [RetentionSweeper(database, retention_policy) for database in _databases]
+    if retention_policy.enabled
+    else []
+)
+retention_interval = float(os.getenv("TASK_RETENTION_INTERVAL_SECONDS", "3600"))
+
+# Spans go to memory (GET /traces/{trace_id}) or a file, per TRACE_EXPORTER
+metrics.register("tracing", tracer.stats)
+
+
+def _to_response(task: TaskRecord) -> TaskResponse:
+    """Convert a stored task record to its API response model."""
+    return TaskResponse(
+        id=task.id,
+        input_text=task.input_text,
+        output_text=task.output_text,
+        tools_used=task.tools_used,
+        execution_steps=[
+            ExecutionStepResponse(
+                step_number=step.step_number,
+                description=step.description,
+                timestamp=step.timestamp,
+            )
+            for step in task.execution_steps
+        ],
+        created_at=task.created_at,
+        thread_id=task.thread_id,
+        status=task.status,
+        **{field: getattr(task, field) for field in METRIC_FIELDS},
+    )
+
+
+def _metrics(usage: dict, submitted_at: float) -> dict:
+    """TaskRecord metric fields from the graph's usage counters.
+
+    submitted_at is the time.time() at which the request arrived.
+    """
+    return {
+        "total_ms": round((time.time() - submitted_at) * 1000, 3),
+        "queue_ms": usage.get("queue_ms", 0.0),
+        "llm_ms": usage.get("llm_ms", 0.0),
+        "tool_ms": usage.get("tool_ms", 0.0),
+        "llm_calls": usage.get("llm_calls", 0),
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "cached_tokens": usage.get("cached_tokens", 0),
+    }
+
+
+def _archived_task(task_id: int) -> Optional[TaskRecord]:
+    """A task the retention sweepers moved out of live storage, if any."""
+    for sweeper in sweepers:
+        task = sweeper.archive.get_task(task_id)
+        if task is not None:
+            return task
+    return None
+
+
+def _with_archived(body: str, thread_id: str, fields: Optional[tuple[str, ...]]) -> str:
+    """Append a thread's archived tasks to its stitched live JSON array.
+
+    Sweepers only archive a thread's oldest tasks, so they go after the live ones.
+    """
+    archived = [
+        task for sweeper in sweepers for task in sweeper.archive.get_tasks_by_thread(thread_id)
+    ]
+    if not archived:
+        return body
+    archived.sort(key=lambda task: (task.created_at, task.id), reverse=True)
+    bodies = ",".join(task.to_json(fields) for task in archived)
+    return f"{body[:-1]},{bodies}]" if body != "[]" else f"[{bodies}]"
+
+
+def _json_response(body: str) -> Response:
+    """Return a JSON body serialized at write time (see TaskStorage.save_task).
+
+    Bypasses response_model validation; the declared models still document
+    the schema in OpenAPI.
+    """
+    return Response(content=body, media_type="application/json")
+
+
+def _conditional(http_request: Request, build: Callable[[], Any]) -> Response:
+    """Serve build() with the storage content version as a weak ETag.
+
+    Returns 304 without calling build() when If-None-Match already names the
+    current version, so unchanged history costs one counter read instead of
+    a query and serialization. The ETag is weak because the body may be
+    served compressed.
+    """
+    version = storage.content_version()
+    if version is None:
+        return _as_response(build())
+
+    etag = f'W/"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = http_request.headers.get("if-none-match", "")
+    client_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in client_tags or etag.removeprefix("W/") in client_tags:
+        return Response(status_code=304, headers=headers)
+
+    response = _as_response(build())
+    response.headers.update(headers)
+    return response
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """Parse a comma-separated fields parameter into a validated projection."""
+    if fields is None:
+        return None
+    try:
+        return validate_fields(name.strip() for name in fields.split(",") if name.strip())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _as_response(body: Any) -> Response:
+    return body if isinstance(body, Response) else JSONResponse(jsonable_encoder(body))
 
 
 @router.post("/tasks", response_model=TaskResponse)
-async def create_task(request: TaskRequest):
-    """Submit a task for processing (non-streaming)."""
+async def create_task(request: TaskRequest, http_request: Request):
+    """Submit a task for processing (non-streaming).
+
+    The run is cancelled if the client disconnects before it finishes.
+    """
+    submitted_at = time.time()
     # Use a unique thread_id for each task to avoid memory accumulation
     thread_id = request.thread_id or str(uuid.uuid4())
-    task_thread_id = f"{thread_id}-{uuid.uuid4()}"
 
     try:
-        # Run the agent
-        config = {"configurable": {"thread_id": task_thread_id}}
-        initial_state = {
-            "messages": [HumanMessage(content=request.task)],
-            "execution_steps": [],
-            "tools_used": [],
-            "final_output": None,
-        }
-
-        # Collect execution data
-        # stream_mode="values" emits full accumulated state each time,
-        # so we just need to capture the final state
-        all_tools = []
-        final_output = ""
-        final_steps = []
-
-        async for event in agent_graph.astream(initial_state, config, stream_mode="values"):
-            if "execution_steps" in event:
-                final_steps = event["execution_steps"]
-            if "tools_used" in event:
-                all_tools = event["tools_used"]
-            if "final_output" in event and event["final_output"]:
-                final_output = event["final_output"]
-
-        # Save to storage
-        task_record = TaskRecord(
-            id=None,
-            input_text=request.task,
-            output_text=final_output,
-            tools_used=list(set(all_tools)),
-            execution_steps=[
-                ExecutionStepRecord(
-                    step_number=step["step_number"],
-                    description=step["description"],
-                    timestamp=step["timestamp"],
-                )
-                for step in final_steps
-            ],
-            created_at=datetime.now().isoformat(),
-            thread_id=thread_id,
+        task_record = await _until_disconnected(
+            http_request, _run_agent(request.task, thread_id, submitted_at)
         )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        task_id = storage.save_task(task_record)
-        task_record.id = task_id
+    if task_record is None:
+        # Nobody is listening; 499 is the conventional "client closed request"
+        return Response(status_code=499)
+    return _to_response(task_record)
 
-        return TaskResponse(
-            id=task_id,
-            input_text=task_record.input_text,
-            output_text=task_record.output_text,
-            tools_used=task_record.tools_used,
-            execution_steps=[
-                ExecutionStepResponse(
-                    step_number=step.step_number,
-                    description=step.description,
-                    timestamp=step.timestamp,
-                )
-                for step in task_record.execution_steps
-            ],
-            created_at=task_record.created_at,
-            thread_id=task_record.thread_id,
-        )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def _until_disconnected(http_request: Request, work: Awaitable) -> Optional[TaskRecord]:
+    """Await work, cancelling it if the client disconnects first.
+
+    Returns None if the work was cancelled.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if not task.done() and await http_request.is_disconnected():
+                task.cancel()
+                break
+        return await task
+    except asyncio.CancelledError:
+        if task.cancelled():
+            return None
+        raise
+    finally:
+        task.cancel()
 
 
 @router.post("/tasks/stream")
-async def create_task_stream(request: TaskRequest):
-    """Submit a task for processing with streaming response."""
+async def create_task_stream(request: TaskRequest, http_request: Request):
+    """Submit a task for processing with streaming response.
+
+    The agent runs independently of this connection. Every event carries an
+    SSE id; if the connection drops, resume with GET /tasks/stream/{run_id}
+    and a Last-Event-ID header. The run_id is sent in the first event
+    ("run_started") and in the X-Run-Id header.
+    """
+    run = _start_run(request.task, request.thread_id)
+    return _event_stream(http_request, run)
+
+
+@router.websocket("/ws")
+async def task_socket(websocket: WebSocket, framing: str = "json", credit: int = DEFAULT_CREDIT):
+    """Submit, cancel and follow many runs over one WebSocket.
+
+    See src/api/ws.py for the protocol. framing is "json" or "compact";
+    credit is the per-run flow-control window.
+    """
+    if framing not in FRAMINGS:
+        await websocket.close(code=1003, reason=f"framing must be one of {FRAMINGS}")
+        return
+
+    await websocket.accept()
+    await TaskSocket(
+        websocket, runs, _start_run, compact=framing == "compact", credit=credit
+    ).serve()
+
+
+def _start_run(task: str, thread_id: Optional[str] = None) -> Run:
+    """Start a streaming run in the background."""
+    submitted_at = time.time()
     # Use a unique thread_id for each task to avoid memory accumulation
-    thread_id = request.thread_id or str(uuid.uuid4())
-    task_thread_id = f"{thread_id}-{uuid.uuid4()}"
+    thread_id = thread_id or str(uuid.uuid4())
+    return runs.start(thread_id, lambda run: _execute_run(run, task, thread_id, submitted_at))
 
-    async def generate_events() -> AsyncGenerator[str, None]:
-        try:
-            config = {"configurable": {"thread_id": task_thread_id}}
-            initial_state = {
-                "messages": [HumanMessage(content=request.task)],
-                "execution_steps": [],
-                "tools_used": [],
-                "final_output": None,
-            }
 
-            # Track what we've already streamed to avoid duplicates
-            # stream_mode="values" emits full accumulated state each time
-            seen_step_count = 0
-            seen_tools = set()
-            final_output = ""
-            final_steps = []
-
-            async for event in agent_graph.astream(
-                initial_state, config, stream_mode="values"
-            ):
-                # Stream only NEW execution steps
-                if "execution_steps" in event:
-                    steps = event["execution_steps"]
-                    final_steps = steps
-                    # Only emit steps we haven't seen yet
-                    for step in steps[seen_step_count:]:
-                        yield f"data: {json.dumps({'event_type': 'step', 'data': step})}\n\n"
-                    seen_step_count = len(steps)
-
-                # Stream only NEW tools used
-                if "tools_used" in event and event["tools_used"]:
-                    for tool in event["tools_used"]:
-                        if tool not in seen_tools:
-                            seen_tools.add(tool)
-                            yield f"data: {json.dumps({'event_type': 'tool_used', 'data': {'tool': tool}})}\n\n"
-
-                # Stream final output (only once)
-                if "final_output" in event and event["final_output"] and not final_output:
-                    final_output = event["final_output"]
-                    yield f"data: {json.dumps({'event_type': 'final_output', 'data': {'output': final_output}})}\n\n"
-
-            # Save to storage
-            task_record = TaskRecord(
-                id=None,
-                input_text=request.task,
-                output_text=final_output,
-                tools_used=list(seen_tools),
-                execution_steps=[
-                    ExecutionStepRecord(
-                        step_number=step["step_number"],
-                        description=step["description"],
-                        timestamp=step["timestamp"],
-                    )
-                    for step in final_steps
-                ],
-                created_at=datetime.now().isoformat(),
-                thread_id=thread_id,
-            )
+@router.get("/tasks/stream/{run_id}")
+async def resume_task_stream(
+    run_id: str, http_request: Request, last_event_id: Optional[str] = Header(default=None)
+):
+    """Reattach to a run, replaying events after Last-Event-ID before following it live."""
+    run = runs.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
 
-            task_id = storage.save_task(task_record)
+    try:
+        after = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Last-Event-ID must be an integer")
 
-            # Send completion event with task ID
-            yield f"data: {json.dumps({'event_type': 'complete', 'data': {'task_id': task_id}})}\n\n"
+    return _event_stream(http_request, run, after)
 
-        except Exception as e:
-            yield f"data: {json.dumps({'event_type': 'error', 'data': {'error': str(e)}})}\n\n"
 
+def _event_stream(http_request: Request, run: Run, last_event_id: int = 0) -> StreamingResponse:
+    """SSE response following a run from after last_event_id."""
     return StreamingResponse(
-        generate_events(),
+        _until_client_leaves(http_request, runs.subscribe(run, last_event_id)),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            "X-Run-Id": run.run_id,
         },
     )
 
 
-@router.get("/tasks", response_model=list[TaskResponse])
-async def get_tasks(limit: int = 100, offset: int = 0):
-    """Get task history with pagination."""
-    tasks = storage.get_all_tasks(limit=limit, offset=offset)
-
-    return [
-        TaskResponse(
-            id=task.id,
-            input_text=task.input_text,
-            output_text=task.output_text,
-            tools_used=task.tools_used,
+async def _until_client_leaves(
+    http_request: Request, messages: AsyncIterator[str]
+) -> AsyncIterator[str]:
+    """Pass messages through, closing them as soon as the client disconnects.
+
+    Without this the server only notices a disconnect on its next write,
+    which for an idle run can be a whole heartbeat interval later.
+    """
+
+    async def wait_for_disconnect():
+        while (await http_request.receive())["type"] != "http.disconnect":
+            pass
+
+    disconnected = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        while True:
+            message = asyncio.ensure_future(messages.__anext__())
+            await asyncio.wait({message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if not message.done():
+                message.cancel()
+                await asyncio.wait({message})
+                return
+            if message.exception() is not None:
+                if isinstance(message.exception(), StopAsyncIteration):
+                    return
+                raise message.exception()
+            yield message.result()
+    finally:
+        disconnected.cancel()
+        await messages.aclose()
+
+
+async def _execute_run(run: Run, task: str, thread_id: str, submitted_at: float):
+    """Run the agent for a streaming task, publishing events to the run's log."""
+    span = tracer.current()
+    await run.publish(
+        "run_started",
+        {"run_id": run.run_id, "thread_id": thread_id, "trace_id": span.trace_id if span else None},
+    )
+
+    try:
+        await _run_agent(task, thread_id, submitted_at, publish=run.publish)
+    except Exception as e:
+        # Failed runs publish their own error event; this covers failing to save
+        if not run.done:
+            await run.publish("error", {"error": str(e)})
+
+
+async def _run_agent(
+    task: str,
+    thread_id: str,
+    submitted_at: float,
+    publish: Optional[Callable[[str, dict], Awaitable]] = None,
+) -> TaskRecord:
+    """Run the agent on a task and save the result.
+
+    If given, publish(event_type, data) receives step, tool_used and
+    final_output events as they happen, then one terminal event: complete,
+    cancelled or error.
+
+    Cancelling the calling asyncio task stops the graph along with any
+    in-flight model request; the partial run is saved with status
+    "cancelled" before CancelledError propagates. Failed runs are saved with
+    status "error" and the exception is re-raised.
+    """
+
+    async def emit(event_type: str, data: dict):
+        if publish:
+            await publish(event_type, data)
+
+    task_thread_id = f"{thread_id}-{uuid.uuid4()}"
+    config = {"configurable": {"thread_id": task_thread_id, "submitted_at": submitted_at}}
+    initial_state = {
+        "messages": [HumanMessage(content=task)],
+        "execution_steps": [],
+        "tools_used": [],
+        "final_output": None,
+        "usage": {},
+    }
+
+    # stream_mode="values" emits the full accumulated state each time, so
+    # only emit what's new and keep the latest state for saving
+    steps = []
+    tools_used = []
+    final_output = ""
+    usage = {}
+
+    def save(status: str, note: Optional[str] = None) -> TaskRecord:
+        all_steps = list(steps)
+        if note:
+            all_steps.append(create_step(len(all_steps) + 1, note))
+        record = TaskRecord(
+            id=None,
+            input_text=task,
+            output_text=final_output,
+            tools_used=list(tools_used),
             execution_steps=[
-                ExecutionStepResponse(
-                    step_number=step.step_number,
-                    description=step.description,
-                    timestamp=step.timestamp,
+                ExecutionStepRecord(
+                    step_number=step["step_number"],
+                    description=step["description"],
+                    timestamp=step["timestamp"],
                 )
-                for step in task.execution_steps
+                for step in all_steps
             ],
-            created_at=task.created_at,
-            thread_id=task.thread_id,
+            created_at=datetime.now().isoformat(),
+            thread_id=thread_id,
+            status=status,
+            **_metrics(usage, submitted_at),
         )
-        for task in tasks
-    ]
+        with tracer.span("storage.save_task", **{"task.status": status}) as span:
+            record.id = storage.save_task(record)
+            span.set_attribute("task.id", record.id)
+        return record
+
+    with tracer.span("agent.run", **{"thread.id": thread_id, "task.chars": len(task)}) as span:
+        try:
+            async for event in agent_graph.astream(initial_state, config, stream_mode="values"):
+                if "usage" in event:
+                    usage = event["usage"]
+
+                # Emit only NEW execution steps
+                if "execution_steps" in event:
+                    for step in event["execution_steps"][len(steps):]:
+                        await emit("step", step)
+                    steps = event["execution_steps"]
+
+                # Emit only NEW tools used
+                for tool in event.get("tools_used") or []:
+                    if tool not in tools_used:
+                        tools_used.append(tool)
+                        await emit("tool_used", {"tool": tool})
+
+                # Emit final output (only once)
+                if event.get("final_output") and not final_output:
+                    final_output = event["final_output"]
+                    await emit("final_output", {"output": final_output})
+        except asyncio.CancelledError:
+            record = save(STATUS_CANCELLED, "Run cancelled")
+            await emit("cancelled", {"task_id": record.id})
+            raise
+        except Exception as e:
+            record = save(STATUS_ERROR, f"Run failed: {e}")
+            await emit("error", {"error": str(e), "task_id": record.id})
+            raise
+
+        record = save(STATUS_COMPLETED)
+        span.set_attributes(
+            **{
+                "task.id": record.id,
+                "llm.calls": record.llm_calls,
+                "llm.prompt_tokens": record.prompt_tokens,
+                "llm.completion_tokens": record.completion_tokens,
+            }
+        )
+        await emit("complete", {"task_id": record.id})
+        return record
+
+
+@router.delete("/runs/{run_id}")
+async def cancel_run(run_id: str):
+    """Cancel a running task.
+
+    The partial run is saved with status "cancelled" and subscribers receive
+    a "cancelled" event.
+    """
+    run = runs.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if not run.cancel():
+        raise HTTPException(status_code=409, detail="Run already finished")
+    return {"message": "Run cancelled"}
+
+
+@router.get("/tasks", response_model=list[TaskResponse])
+async def get_tasks(
+    http_request: Request,
+    limit: int = 100,
+    offset: int = 0,
+    fields: Optional[str] = None,
+    include_total: bool = False,
+):
+    """Get task history with pagination.
+
+    `fields` is a comma-separated list of TaskResponse fields to return
+    (e.g. id,input_text,created_at); by default every field is returned.
+    With include_total, the total number of tasks is sent in X-Total-Count.
+    """
+    projection = _parse_fields(fields)
+
+    def build():
+        response = _json_response(
+            storage.get_all_tasks_json(limit=limit, offset=offset, fields=projection)
+        )
+        if include_total:
+            response.headers["X-Total-Count"] = str(storage.count_tasks())
+        return response
+
+    return _conditional(http_request, build)
+
+
+@router.get("/tasks/top", response_model=list[TaskResponse])
+async def get_top_tasks(http_request: Request, by: str = "total_ms", limit: int = 10):
+    """Get the slowest or most expensive tasks.
+
+    `by` is one of total_ms, queue_ms, llm_ms, tool_ms, llm_calls, total_tokens.
+    """
+
+    def build():
+        try:
+            tasks = storage.get_top_tasks(metric=by, limit=min(limit, 100))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return [_to_response(task) for task in tasks]
+
+    return _conditional(http_request, build)
 
 
 @router.get("/tasks/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: int):
-    """Get a specific task by ID."""
-    task = storage.get_task(task_id)
+async def get_task(task_id: int, http_request: Request):
+    """Get a specific task by ID, from the retention archive if it was swept."""
 
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    def build():
+        body = storage.get_task_json(task_id)
+        if not body:
+            archived = _archived_task(task_id)
+            if archived is None:
+                raise HTTPException(status_code=404, detail="Task not found")
+            body = archived.to_json()
+        return _json_response(body)
 
-    return TaskResponse(
-        id=task.id,
-        input_text=task.input_text,
-        output_text=task.output_text,
-        tools_used=task.tools_used,
-        execution_steps=[
-            ExecutionStepResponse(
-                step_number=step.step_number,
-                description=step.description,
-                timestamp=step.timestamp,
-            )
-            for step in task.execution_steps
-        ],
-        created_at=task.created_at,
-        thread_id=task.thread_id,
-    )
+    return _conditional(http_request, build)
 
 
 @router.delete("/tasks/{task_id}")
@@ -240,26 +541,66 @@ async def delete_task(task_id: int):
 
 
 @router.get("/tasks/thread/{thread_id}", response_model=list[TaskResponse])
-async def get_tasks_by_thread(thread_id: str):
-    """Get all tasks for a specific thread/conversation."""
-    tasks = storage.get_tasks_by_thread(thread_id)
-
-    return [
-        TaskResponse(
-            id=task.id,
-            input_text=task.input_text,
-            output_text=task.output_text,
-            tools_used=task.tools_used,
-            execution_steps=[
-                ExecutionStepResponse(
-                    step_number=step.step_number,
-                    description=step.description,
-                    timestamp=step.timestamp,
-                )
-                for step in task.execution_steps
+async def get_tasks_by_thread(
+    thread_id: str, http_request: Request, fields: Optional[str] = None
+):
+    """Get all tasks for a specific thread/conversation, optionally projected to fields.
+
+    Archived tasks of the thread follow the live ones.
+    """
+    projection = _parse_fields(fields)
+
+    def build():
+        body = storage.get_tasks_by_thread_json(thread_id, projection)
+        return _json_response(_with_archived(body, thread_id, projection))
+
+    return _conditional(http_request, build)
+
+
+@router.get("/stats")
+async def get_stats(
+    http_request: Request, hours: int = 24, days: int = 30, top_threads: int = 10
+):
+    """Get usage statistics (tasks per hour/day, tool usage, error rates)."""
+    return _conditional(
+        http_request,
+        lambda: storage.get_stats(hours=hours, days=days, top_threads=top_threads),
+    )
+
+
+@router.get("/storage")
+async def get_storage_stats():
+    """Get database/archive size, cache hit ratio and the last retention sweep."""
+    return {
+        "database": storage.get_db_stats() if _databases else None,
+        "archive": [sweeper.archive.get_stats() for sweeper in sweepers],
+        "cache": storage.get_cache_stats(),
+        "retention": {
+            "enabled": bool(sweepers),
+            "policy": dataclasses.asdict(retention_policy),
+            "last_sweeps": [
+                sweeper.last_report.to_dict() for sweeper in sweepers if sweeper.last_report
             ],
-            created_at=task.created_at,
-            thread_id=task.thread_id,
-        )
-        for task in tasks
-    ]
+        },
+    }
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Get process-wide counters, such as tool calls answered from the tool cache."""
+    return metrics.snapshot()
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Get a trace's finished spans as an OTLP/JSON export request.
+
+    Only available with the in-memory exporter (TRACE_EXPORTER=memory, the
+    default); spans are kept until newer ones push them out.
+    """
+    if not isinstance(tracer.exporter, InMemoryExporter):
+        raise HTTPException(status_code=404, detail="Traces are not kept in memory")
+    spans = tracer.exporter.spans(trace_id.lower())
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return export_request(spans)
@@ -0,0 +1,251 @@
+"""Agent runs decoupled from the HTTP connections that watch them.
+
+Each run executes in its own asyncio task and appends events to a bounded,
+in-memory log. Any number of SSE connections can subscribe to a run, replay
+the events they missed (by SSE event id) and then follow it live.
+
+A run whose last subscriber disconnects is cancelled once disconnect_grace
+seconds pass without anyone reattaching, so abandoned runs stop spending
+tokens. Runs can also be cancelled explicitly with Run.cancel().
+
+Events carry the W3C traceparent of the span that was open when they were
+published, so a client can find the part of the trace behind each event.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from functools import cached_property
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from src.tracing import Tracer
+
+
+@dataclass
+class RunEvent:
+    """A single event in a run's log.
+
+    The data is encoded once and shared by every subscriber and framing.
+    """
+
+    id: int
+    event_type: str
+    data: dict
+    traceparent: Optional[str] = None
+
+    @cached_property
+    def data_json(self) -> str:
+        return json.dumps(self.data)
+
+    def to_sse(self) -> str:
+        """Format as an SSE message carrying its id."""
+        payload = f'{{"event_type": {json.dumps(self.event_type)}, "data": {self.data_json}'
+        if self.traceparent:
+            payload += f', "traceparent": "{self.traceparent}"'
+        payload += "}"
+        return f"id: {self.id}\ndata: {payload}\n\n"
+
+
+# Event types that end a run's stream
+TERMINAL_EVENTS = {"complete", "cancelled", "error"}
+
+
+class Run:
+    """Event log and state for one agent run."""
+
+    def __init__(
+        self,
+        run_id: str,
+        thread_id: str,
+        max_events: int = 1000,
+        disconnect_grace: Optional[float] = None,
+    ):
+        self.run_id = run_id
+        self.thread_id = thread_id
+        self.events: deque[RunEvent] = deque(maxlen=max_events)
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        # None disables cancelling on disconnect
+        self.disconnect_grace = disconnect_grace
+        self.subscribers = 0
+        self._next_id = 1
+        self._changed = asyncio.Condition()
+        self._orphan_timer: Optional[asyncio.TimerHandle] = None
+
+    async def publish(self, event_type: str, data: dict) -> RunEvent:
+        """Append an event to the log and wake subscribers."""
+        span = Tracer.current()
+        event = RunEvent(
+            id=self._next_id,
+            event_type=event_type,
+            data=data,
+            traceparent=span.traceparent if span else None,
+        )
+        self._next_id += 1
+        async with self._changed:
+            self.events.append(event)
+            if event_type in TERMINAL_EVENTS:
+                self._finish()
+            self._changed.notify_all()
+        return event
+
+    async def close(self):
+        """Mark the run finished without publishing an event."""
+        async with self._changed:
+            self._finish()
+            self._changed.notify_all()
+
+    def _finish(self):
+        if not self.done:
+            self.done = True
+            self.finished_at = time.monotonic()
+        self._cancel_orphan_timer()
+
+    def cancel(self) -> bool:
+        """Cancel the run's task, and with it any in-flight model request.
+
+        Returns False if the run has already finished.
+        """
+        if self.done or not self.task or self.task.done():
+            return False
+        self.task.cancel()
+        return True
+
+    def _attach(self):
+        self.subscribers += 1
+        self._cancel_orphan_timer()
+
+    def _detach(self):
+        self.subscribers -= 1
+        if self.subscribers or self.done or self.disconnect_grace is None:
+            return
+        if self.disconnect_grace <= 0:
+            self.cancel()
+        else:
+            self._orphan_timer = asyncio.get_running_loop().call_later(
+                self.disconnect_grace, self.cancel
+            )
+
+    def _cancel_orphan_timer(self):
+        if self._orphan_timer:
+            self._orphan_timer.cancel()
+            self._orphan_timer = None
+
+    async def follow(
+        self, last_event_id: int = 0, heartbeat_interval: Optional[float] = None
+    ) -> AsyncIterator[Optional[RunEvent]]:
+        """Yield events after last_event_id, then follow the run live.
+
+        If the requested position has already been evicted from the bounded
+        log, replay starts at the oldest event still held. With a
+        heartbeat_interval, None is yielded after that many idle seconds.
+
+        Closing the iterator (e.g. when the client disconnects) detaches the
+        subscriber; see disconnect_grace.
+        """
+        position = last_event_id
+        self._attach()
+        try:
+            while True:
+                async with self._changed:
+                    pending = [event for event in self.events if event.id > position]
+                    if not pending:
+                        if self.done:
+                            return
+                        try:
+                            await asyncio.wait_for(self._changed.wait(), heartbeat_interval)
+                        except asyncio.TimeoutError:
+                            pending = None
+
+                if pending is None:
+                    yield None
+                    continue
+                for event in pending:
+                    position = event.id
+                    yield event
+        finally:
+            self._detach()
+
+    async def subscribe(
+        self, last_event_id: int = 0, heartbeat_interval: float = 15.0
+    ) -> AsyncIterator[str]:
+        """Follow the run as SSE messages; see follow().
+
+        SSE comment lines are sent every heartbeat_interval seconds while
+        idle so proxies keep the connection open.
+        """
+        events = self.follow(last_event_id, heartbeat_interval)
+        try:
+            async for event in events:
+                yield event.to_sse() if event else ": heartbeat\n\n"
+        finally:
+            await events.aclose()
+
+
+class RunRegistry:
+    """Keeps runs addressable by id while running and for a while after.
+
+    Finished runs are dropped after finished_ttl seconds, and the oldest
+    finished runs are dropped first if more than max_runs are held. Runs left
+    without subscribers are cancelled after disconnect_grace seconds (None
+    keeps them running).
+    """
+
+    def __init__(
+        self,
+        max_runs: int = 1000,
+        max_events_per_run: int = 1000,
+        finished_ttl: float = 300.0,
+        heartbeat_interval: float = 15.0,
+        disconnect_grace: Optional[float] = 10.0,
+    ):
+        self.max_runs = max_runs
+        self.max_events_per_run = max_events_per_run
+        self.finished_ttl = finished_ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.disconnect_grace = disconnect_grace
+        self._runs: dict[str, Run] = {}
+
+    def start(self, thread_id: str, work: Callable[[Run], Awaitable[None]]) -> Run:
+        """Create a run and execute work(run) in a background task."""
+        self._evict()
+        run = Run(
+            str(uuid.uuid4()),
+            thread_id,
+            max_events=self.max_events_per_run,
+            disconnect_grace=self.disconnect_grace,
+        )
+        self._runs[run.run_id] = run
+
+        async def execute():
+            try:
+                await work(run)
+            finally:
+                await run.close()
+
+        run.task = asyncio.create_task(execute())
+        return run
+
+    def get(self, run_id: str) -> Optional[Run]:
+        """Get a run by id, if still held."""
+        return self._runs.get(run_id)
+
+    def subscribe(self, run: Run, last_event_id: int = 0) -> AsyncIterator[str]:
+        """Subscribe to a run with the registry's heartbeat interval."""
+        return run.subscribe(last_event_id, heartbeat_interval=self.heartbeat_interval)
+
+    def _evict(self):
+        now = time.monotonic()
+        for run_id, run in list(self._runs.items()):
+            if run.done and now - run.finished_at > self.finished_ttl:
+                del self._runs[run_id]
+
+        finished = sorted(
+            (run for run in self._runs.values() if run.done), key=lambda run: run.finished_at
+        )
+        while len(self._runs) >= self.max_runs and finished:
+            del self._runs[finished.pop(0).run_id]
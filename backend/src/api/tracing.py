@@ -0,0 +1,43 @@
+"""A server span around every HTTP and WebSocket request.
+
+An incoming traceparent header continues the caller's trace. Responses carry
+the trace id in X-Trace-Id, so a slow request can be looked up afterwards
+with GET /api/traces/{trace_id}.
+"""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.tracing import Tracer, parse_traceparent
+
+
+class TracingMiddleware:
+    """Open a server span for each request, named after its method and path."""
+
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket") or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "WS")
+        headers = Headers(scope=scope)
+        with self.tracer.span(
+            f"{method} {scope['path']}",
+            kind="server",
+            parent=parse_traceparent(headers.get("traceparent")),
+            **{"http.method": method, "http.target": scope["path"]},
+        ) as span:
+
+            async def send_with_trace(message: Message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_error(f"HTTP {message['status']}")
+                    MutableHeaders(scope=message)["X-Trace-Id"] = span.trace_id
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
@@ -0,0 +1,187 @@
+"""WebSocket protocol multiplexing many agent runs over one connection.
+
+Clients send JSON objects with an "op":
+
+    {"op": "submit", "task": "...", "thread_id": "...", "ref": "a1"}
+    {"op": "subscribe", "run_id": "...", "last_event_id": 0}
+    {"op": "unsubscribe", "run_id": "..."}
+    {"op": "cancel", "run_id": "..."}
+    {"op": "credit", "run_id": "...", "n": 32}
+
+"submit" starts a run and subscribes to it; the reply
+{"op": "submitted", "ref": "a1", "run_id": "..."} is sent before any of the
+run's events. Errors are reported as {"op": "error", "ref": ..., "error": ...}
+without closing the socket.
+
+Run events are tagged with their run id. By default they are objects:
+
+    {"op": "event", "run_id": "...", "id": 3, "event_type": "step", "data": {...},
+     "traceparent": "00-..."}
+
+With ?framing=compact they are arrays instead:
+
+    ["<run_id>", 3, "step", {...}]
+
+Flow control is per run: a subscription may send `credit` events (from the
+?credit= query parameter, or "credit" on subscribe/submit) before the client
+grants more with a "credit" op. Runs that are not granted credit simply
+wait; their events stay in the run's log.
+"""
+
+import asyncio
+import json
+from typing import Callable, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .runs import Run, RunEvent, RunRegistry
+
+# Events a subscription may send before the client grants more
+DEFAULT_CREDIT = 64
+
+FRAMINGS = ("json", "compact")
+
+
+class Subscription:
+    """One run followed over a socket, with its flow-control window."""
+
+    def __init__(self, run: Run, credit: int, compact: bool):
+        self.run = run
+        self.credit = credit
+        self.granted = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.compact = compact
+        # Encoded once; each frame only adds the event's id, type and data
+        self._run_id = json.dumps(run.run_id)
+
+    def grant(self, n: int):
+        self.credit += n
+        if self.credit > 0:
+            self.granted.set()
+
+    async def take(self):
+        """Wait until the client has granted credit, then use one."""
+        while self.credit <= 0:
+            self.granted.clear()
+            await self.granted.wait()
+        self.credit -= 1
+
+    def frame(self, event: RunEvent) -> str:
+        event_type = json.dumps(event.event_type)
+        if self.compact:
+            return f"[{self._run_id},{event.id},{event_type},{event.data_json}]"
+        trace = f',"traceparent":"{event.traceparent}"' if event.traceparent else ""
+        return (
+            f'{{"op":"event","run_id":{self._run_id},"id":{event.id},'
+            f'"event_type":{event_type},"data":{event.data_json}{trace}}}'
+        )
+
+
+class TaskSocket:
+    """Serves the multiplexing protocol on one accepted WebSocket.
+
+    start_run(task, thread_id) starts a run in the registry and returns it.
+    Closing the socket unsubscribes from every run, so runs nobody else is
+    following are cancelled after the registry's disconnect grace.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        runs: RunRegistry,
+        start_run: Callable[[str, Optional[str]], Run],
+        compact: bool = False,
+        credit: int = DEFAULT_CREDIT,
+    ):
+        self.websocket = websocket
+        self.runs = runs
+        self.start_run = start_run
+        self.compact = compact
+        self.credit = credit
+        self.subscriptions: dict[str, Subscription] = {}
+        self._send_lock = asyncio.Lock()
+
+    async def serve(self):
+        """Handle messages on an accepted socket until the client disconnects."""
+        try:
+            while True:
+                try:
+                    message = await self.websocket.receive_json()
+                except (ValueError, KeyError):
+                    await self.send({"op": "error", "error": "Messages must be JSON objects"})
+                    continue
+                await self.handle(message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for run_id in list(self.subscriptions):
+                await self.unsubscribe(run_id)
+
+    async def handle(self, message: dict):
+        """Dispatch one client message."""
+        ref = message.get("ref") if isinstance(message, dict) else None
+        try:
+            op = message["op"]
+            if op == "submit":
+                run = self.start_run(message["task"], message.get("thread_id"))
+                await self.send({"op": "submitted", "ref": ref, "run_id": run.run_id})
+                self.subscribe(run, 0, message.get("credit", self.credit))
+            elif op == "subscribe":
+                run = self.runs.get(message["run_id"])
+                if not run:
+                    raise LookupError("Run not found")
+                await self.unsubscribe(run.run_id)
+                self.subscribe(
+                    run, message.get("last_event_id", 0), message.get("credit", self.credit)
+                )
+            elif op == "unsubscribe":
+                await self.unsubscribe(message["run_id"])
+            elif op == "cancel":
+                run = self.runs.get(message["run_id"])
+                if not run:
+                    raise LookupError("Run not found")
+                if not run.cancel():
+                    raise LookupError("Run already finished")
+            elif op == "credit":
+                subscription = self.subscriptions.get(message["run_id"])
+                if subscription:
+                    subscription.grant(int(message["n"]))
+            else:
+                raise LookupError(f"Unknown op: {op}")
+        except (KeyError, TypeError, ValueError) as e:
+            await self.send({"op": "error", "ref": ref, "error": f"Invalid message: {e}"})
+        except LookupError as e:
+            await self.send({"op": "error", "ref": ref, "error": str(e)})
+
+    def subscribe(self, run: Run, last_event_id: int, credit: int):
+        subscription = Subscription(run, int(credit), self.compact)
+        subscription.task = asyncio.create_task(self._pump(subscription, int(last_event_id)))
+        self.subscriptions[run.run_id] = subscription
+
+    async def unsubscribe(self, run_id: str):
+        subscription = self.subscriptions.pop(run_id, None)
+        if subscription and subscription.task:
+            subscription.task.cancel()
+            await asyncio.wait({subscription.task})
+
+    async def _pump(self, subscription: Subscription, last_event_id: int):
+        """Forward a run's events to the socket as credit allows."""
+        events = subscription.run.follow(last_event_id)
+        try:
+            async for event in events:
+                await subscription.take()
+                await self.send_text(subscription.frame(event))
+        except (WebSocketDisconnect, RuntimeError):
+            # The socket closed under us; serve() cleans up
+            pass
+        finally:
+            await events.aclose()
+            if self.subscriptions.get(subscription.run.run_id) is subscription:
+                del self.subscriptions[subscription.run.run_id]
+
+    async def send(self, message: dict):
+        await self.send_text(json.dumps(message))
+
+    async def send_text(self, text: str):
+        async with self._send_lock:
+            await self.websocket.send_text(text)
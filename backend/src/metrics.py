@@ -0,0 +1,43 @@
+"""Process-wide counters exported by GET /api/metrics."""
+
+import threading
+from typing import Callable
+
+
+class Metrics:
+    """Thread-safe named counters plus registered stats sources.
+
+    Counters are dotted names such as "tool_cache.hits". Components that
+    already keep their own statistics register a callable instead, and its
+    result is included under that name in every snapshot.
+    """
+
+    def __init__(self):
+        self._counters: dict[str, float] = {}
+        self._sources: dict[str, Callable[[], dict]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1):
+        """Add value to a counter, creating it at zero if needed."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def register(self, name: str, source: Callable[[], dict]):
+        """Include source() under name in snapshots."""
+        with self._lock:
+            self._sources[name] = source
+
+    def snapshot(self) -> dict:
+        """Get all counters and the current value of every source."""
+        with self._lock:
+            counters = dict(sorted(self._counters.items()))
+            sources = dict(self._sources)
+        return {"counters": counters, **{name: source() for name, source in sources.items()}}
+
+    def reset(self):
+        """Zero all counters. Registered sources are kept."""
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = Metrics()
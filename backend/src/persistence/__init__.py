@@ -1,3 +1,24 @@
-from .storage import TaskStorage, TaskRecord
+from .records import TaskRecord, ExecutionStepRecord
+from .base import TaskStorageBackend
+from .storage import TaskStorage
+from .memory import InMemoryTaskStorage
+from .sharded import ShardedTaskStorage
+from .factory import create_storage, create_storage_from_env
+from .cache import CachedTaskStorage
+from .retention import RetentionPolicy, RetentionSweeper, TaskArchive, SweepReport
 
-__all__ = ["TaskStorage", "TaskRecord"]
+__all__ = [
+    "TaskStorage",
+    "TaskRecord",
+    "ExecutionStepRecord",
+    "TaskStorageBackend",
+    "InMemoryTaskStorage",
+    "ShardedTaskStorage",
+    "create_storage",
+    "create_storage_from_env",
+    "CachedTaskStorage",
+    "RetentionPolicy",
+    "RetentionSweeper",
+    "TaskArchive",
+    "SweepReport",
+]
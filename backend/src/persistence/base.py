@@ -0,0 +1,98 @@
+"""Interface shared by all task storage backends."""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Hashable, Optional
+
+from .records import TaskRecord
+
+
+class TaskStorageBackend(ABC):
+    """Abstract task history store.
+
+    Backends implement the record-level methods; the JSON body methods and
+    export have default implementations built on top of them that backends
+    may override with something faster.
+    """
+
+    @abstractmethod
+    def save_task(self, record: TaskRecord) -> int:
+        """Save a task record and return its ID."""
+
+    @abstractmethod
+    def get_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Get a specific task by ID."""
+
+    @abstractmethod
+    def get_all_tasks(self, limit: int = 100, offset: int = 0) -> list[TaskRecord]:
+        """Get all tasks, newest first, with pagination."""
+
+    @abstractmethod
+    def get_tasks_by_thread(self, thread_id: str) -> list[TaskRecord]:
+        """Get all tasks for a specific thread, newest first."""
+
+    @abstractmethod
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task by ID."""
+
+    @abstractmethod
+    def clear_all(self):
+        """Clear all tasks."""
+
+    @abstractmethod
+    def get_top_tasks(self, metric: str = "total_ms", limit: int = 10) -> list[TaskRecord]:
+        """Get the tasks with the highest value of a metric in TOP_TASK_METRICS."""
+
+    @abstractmethod
+    def count_tasks(self) -> int:
+        """Number of stored tasks, without scanning them."""
+
+    @abstractmethod
+    def get_stats(self, hours: int = 24, days: int = 30, top_threads: int = 10) -> dict:
+        """Get usage statistics in the shape of rollups.read_stats()."""
+
+    def data_version(self) -> Optional[Hashable]:
+        """Token that changes whenever another process commits a write.
+
+        Returns None when the backend cannot be written by other processes.
+        """
+        return None
+
+    def content_version(self) -> Optional[str]:
+        """Token that changes whenever stored tasks change, from any process.
+
+        Used as the ETag of read responses; None disables conditional
+        requests.
+        """
+        return None
+
+    def close(self):
+        """Release any resources held by the backend."""
+
+    def get_task_json(self, task_id: int) -> Optional[str]:
+        """Get a specific task as its JSON response body."""
+        task = self.get_task(task_id)
+        return task.to_json() if task else None
+
+    def get_all_tasks_json(
+        self, limit: int = 100, offset: int = 0, fields: Optional[tuple[str, ...]] = None
+    ) -> str:
+        """Get a page of tasks as a JSON array.
+
+        fields, from records.validate_fields(), limits each task to those keys.
+        """
+        tasks = self.get_all_tasks(limit, offset)
+        return "[" + ",".join(t.to_json(fields) for t in tasks) + "]"
+
+    def get_tasks_by_thread_json(
+        self, thread_id: str, fields: Optional[tuple[str, ...]] = None
+    ) -> str:
+        """Get all tasks for a thread as a JSON array, optionally projected."""
+        tasks = self.get_tasks_by_thread(thread_id)
+        return "[" + ",".join(t.to_json(fields) for t in tasks) + "]"
+
+    def export_to_json(self, filepath: str):
+        """Export all tasks to a JSON file."""
+        tasks = self.get_all_tasks(limit=10000)
+        with open(filepath, "w") as f:
+            json.dump([task.to_dict() for task in tasks], f, indent=2)
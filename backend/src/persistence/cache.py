@@ -0,0 +1,226 @@
+"""Read-through cache in front of TaskStorage lookups."""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from .base import TaskStorageBackend
+from .records import TaskRecord
+
+
+def estimate_size(value: Any) -> int:
+    """Roughly estimate the memory held by a cached value in bytes."""
+    if isinstance(value, TaskRecord):
+        return (
+            sys.getsizeof(value)
+            + sys.getsizeof(value.input_text)
+            + sys.getsizeof(value.output_text)
+            + sys.getsizeof(value.created_at)
+            + sys.getsizeof(value.thread_id)
+            + sum(sys.getsizeof(tool) for tool in value.tools_used)
+            + sum(
+                sys.getsizeof(step) + sys.getsizeof(step.description) + sys.getsizeof(step.timestamp)
+                for step in value.execution_steps
+            )
+        )
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count, with hit/miss accounting."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries if full."""
+        if self.max_entries <= 0:
+            return
+        size = estimate_size(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries:
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Get hit ratio and memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "approx_bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class CachedTaskStorage:
+    """TaskStorage wrapper that caches task lookups and list pages.
+
+    Writes made through this wrapper clear the cache directly. Writes made by
+    any other connection (other worker processes, the retention sweeper) are
+    detected through the backend's data_version(), which for SQLite is
+    PRAGMA data_version and changes whenever another connection commits.
+
+    Cached records are shared between callers and must be treated as
+    read-only. Any method not overridden here is passed through uncached,
+    including count_tasks() and content_version(), which the backends
+    already answer from a counter and shouldn't count as cache hits.
+    """
+
+    def __init__(
+        self, storage: TaskStorageBackend, max_entries: int = 1024, max_cached_offset: int = 200
+    ):
+        self.storage = storage
+        self.cache = LRUCache(max_entries)
+        self.max_cached_offset = max_cached_offset
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        self._data_version = self._read_data_version()
+
+    def __getattr__(self, name: str):
+        return getattr(self.storage, name)
+
+    def _read_data_version(self) -> Optional[Hashable]:
+        return self.storage.data_version()
+
+    def _invalidate(self):
+        with self._generation_lock:
+            self._generation += 1
+        self.cache.clear()
+
+    def _invalidate_after_write(self):
+        """Clear the cache after a write made through this wrapper.
+
+        The whole cache is dropped rather than just the affected keys: syncing
+        data_version past our own commit would otherwise also swallow any
+        external commit that landed just before it.
+        """
+        self._data_version = self._read_data_version()
+        self._invalidate()
+
+    def _check_external_writes(self):
+        """Drop everything if another connection has committed a write."""
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self._invalidate()
+
+    def _read_through(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        self._check_external_writes()
+        missing = object()
+        value = self.cache.get(key, missing)
+        if value is not missing:
+            return value
+
+        generation = self._generation
+        value = load()
+        # Don't store a value a concurrent write may already have made stale.
+        # Writers bump the generation under the lock before clearing, so a
+        # put made under it either fails the check or is cleared afterwards.
+        with self._generation_lock:
+            if generation == self._generation:
+                self.cache.put(key, value)
+        return value
+
+    def get_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Get a specific task by ID."""
+        return self._read_through(("task", task_id), lambda: self.storage.get_task(task_id))
+
+    def get_all_tasks(self, limit: int = 100, offset: int = 0) -> list[TaskRecord]:
+        """Get all tasks with pagination; only the first pages are cached."""
+        if offset > self.max_cached_offset:
+            return self.storage.get_all_tasks(limit=limit, offset=offset)
+        return self._read_through(
+            ("all", limit, offset),
+            lambda: self.storage.get_all_tasks(limit=limit, offset=offset),
+        )
+
+    def get_tasks_by_thread(self, thread_id: str) -> list[TaskRecord]:
+        """Get all tasks for a specific thread."""
+        return self._read_through(
+            ("thread", thread_id), lambda: self.storage.get_tasks_by_thread(thread_id)
+        )
+
+    def get_task_json(self, task_id: int) -> Optional[str]:
+        """Get a specific task as its pre-serialized JSON response body."""
+        return self._read_through(
+            ("task_json", task_id), lambda: self.storage.get_task_json(task_id)
+        )
+
+    def get_all_tasks_json(
+        self, limit: int = 100, offset: int = 0, fields: Optional[tuple[str, ...]] = None
+    ) -> str:
+        """Get a page of tasks as a JSON array; only the first pages are cached."""
+        if offset > self.max_cached_offset:
+            return self.storage.get_all_tasks_json(limit=limit, offset=offset, fields=fields)
+        return self._read_through(
+            ("all_json", limit, offset, fields),
+            lambda: self.storage.get_all_tasks_json(limit=limit, offset=offset, fields=fields),
+        )
+
+    def get_tasks_by_thread_json(
+        self, thread_id: str, fields: Optional[tuple[str, ...]] = None
+    ) -> str:
+        """Get all tasks for a thread as a JSON array."""
+        return self._read_through(
+            ("thread_json", thread_id, fields),
+            lambda: self.storage.get_tasks_by_thread_json(thread_id, fields),
+        )
+
+    def save_task(self, record: TaskRecord) -> int:
+        """Save a task record and invalidate the cache."""
+        task_id = self.storage.save_task(record)
+        self._invalidate_after_write()
+        return task_id
+
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task by ID and invalidate the cache."""
+        deleted = self.storage.delete_task(task_id)
+        if deleted:
+            self._invalidate_after_write()
+        return deleted
+
+    def clear_all(self):
+        """Clear all tasks and the cache."""
+        self.storage.clear_all()
+        self._invalidate_after_write()
+
+    def get_cache_stats(self) -> dict:
+        """Get hit ratio and memory use of the cache."""
+        return self.cache.stats()
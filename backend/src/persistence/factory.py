@@ -0,0 +1,30 @@
+"""Build the configured task storage backend."""
+
+import os
+
+from .base import TaskStorageBackend
+from .memory import InMemoryTaskStorage
+from .sharded import ShardedTaskStorage
+from .storage import TaskStorage
+
+
+def create_storage(
+    backend: str = "sqlite", db_path: str = "tasks.db", shard_count: int = 4
+) -> TaskStorageBackend:
+    """Create a storage backend by name: "sqlite", "sharded" or "memory"."""
+    if backend == "sqlite":
+        return TaskStorage(db_path)
+    if backend == "sharded":
+        return ShardedTaskStorage.from_base_path(db_path, shard_count)
+    if backend == "memory":
+        return InMemoryTaskStorage()
+    raise ValueError(f"Unknown storage backend '{backend}'. Use sqlite, sharded or memory.")
+
+
+def create_storage_from_env() -> TaskStorageBackend:
+    """Create the storage backend configured by TASK_STORAGE_* variables."""
+    return create_storage(
+        backend=os.getenv("TASK_STORAGE_BACKEND", "sqlite"),
+        db_path=os.getenv("TASK_DB_PATH", "tasks.db"),
+        shard_count=int(os.getenv("TASK_DB_SHARDS", "4")),
+    )
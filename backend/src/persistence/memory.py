@@ -0,0 +1,77 @@
+"""In-memory task storage for tests and benchmarks."""
+
+import threading
+import uuid
+from dataclasses import replace
+from typing import Optional
+
+from .base import TaskStorageBackend
+from .records import TOP_TASK_METRICS, TaskRecord
+from .rollups import compute_stats
+
+
+class InMemoryTaskStorage(TaskStorageBackend):
+    """Process-local task storage backed by a dict. Nothing is persisted."""
+
+    def __init__(self):
+        self._tasks: dict[int, TaskRecord] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._epoch = uuid.uuid4().hex[:12]
+        self._version = 0
+
+    def save_task(self, record: TaskRecord) -> int:
+        """Save a copy of the record and return its ID."""
+        with self._lock:
+            task_id = self._next_id
+            self._next_id += 1
+            self._tasks[task_id] = replace(record, id=task_id)
+            self._version += 1
+            return task_id
+
+    def get_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Get a specific task by ID."""
+        return self._tasks.get(task_id)
+
+    def get_all_tasks(self, limit: int = 100, offset: int = 0) -> list[TaskRecord]:
+        """Get all tasks, newest first, with pagination."""
+        return self._newest_first(self._tasks.values())[offset : offset + limit]
+
+    def get_tasks_by_thread(self, thread_id: str) -> list[TaskRecord]:
+        """Get all tasks for a specific thread, newest first."""
+        return self._newest_first(t for t in self._tasks.values() if t.thread_id == thread_id)
+
+    def get_top_tasks(self, metric: str = "total_ms", limit: int = 10) -> list[TaskRecord]:
+        """Get the tasks with the highest value of a latency or usage metric."""
+        if metric not in TOP_TASK_METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Use one of: {', '.join(TOP_TASK_METRICS)}")
+        return sorted(self._tasks.values(), key=lambda t: getattr(t, metric), reverse=True)[:limit]
+
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task by ID."""
+        with self._lock:
+            deleted = self._tasks.pop(task_id, None) is not None
+            self._version += deleted
+            return deleted
+
+    def clear_all(self):
+        """Clear all tasks."""
+        with self._lock:
+            self._tasks.clear()
+            self._version += 1
+
+    def count_tasks(self) -> int:
+        """Number of stored tasks."""
+        return len(self._tasks)
+
+    def content_version(self) -> Optional[str]:
+        """Counter bumped by every write."""
+        return f"{self._epoch}.{self._version}"
+
+    def get_stats(self, hours: int = 24, days: int = 30, top_threads: int = 10) -> dict:
+        """Get usage statistics by scanning all tasks."""
+        return compute_stats(list(self._tasks.values()), hours, days, top_threads)
+
+    @staticmethod
+    def _newest_first(tasks) -> list[TaskRecord]:
+        return sorted(tasks, key=lambda t: (t.created_at, t.id), reverse=True)
@@ -0,0 +1,144 @@
+"""Records describing stored tasks."""
+
+import json
+from dataclasses import dataclass, asdict
+from typing import Iterable, Optional
+
+
+# Values of TaskRecord.status
+STATUS_COMPLETED = "completed"
+STATUS_CANCELLED = "cancelled"
+STATUS_ERROR = "error"
+
+# Per-task latency and usage counters, stored as indexed columns
+METRIC_FIELDS = (
+    "total_ms",
+    "queue_ms",
+    "llm_ms",
+    "tool_ms",
+    "llm_calls",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+)
+
+
+# Fields of the TaskResponse body, in order; each is a column of the tasks table
+RESPONSE_FIELDS = (
+    "id",
+    "input_text",
+    "output_text",
+    "tools_used",
+    "execution_steps",
+    "created_at",
+    "thread_id",
+    "status",
+    *METRIC_FIELDS,
+)
+
+# Response fields stored as JSON text rather than plain values
+JSON_FIELDS = ("tools_used", "execution_steps")
+
+
+def validate_fields(fields: Iterable[str]) -> tuple[str, ...]:
+    """Check a field projection and return it in response order.
+
+    Raises ValueError naming any field that isn't in RESPONSE_FIELDS.
+    """
+    requested = set(fields)
+    unknown = requested.difference(RESPONSE_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s) {', '.join(sorted(unknown))}. "
+            f"Use any of: {', '.join(RESPONSE_FIELDS)}"
+        )
+    return tuple(field for field in RESPONSE_FIELDS if field in requested)
+
+
+# Orderings accepted by get_top_tasks, mapped to their SQL expression
+TOP_TASK_METRICS = {
+    "total_ms": "total_ms",
+    "queue_ms": "queue_ms",
+    "llm_ms": "llm_ms",
+    "tool_ms": "tool_ms",
+    "llm_calls": "llm_calls",
+    "total_tokens": "(prompt_tokens + completion_tokens)",
+}
+
+
+@dataclass
+class ExecutionStepRecord:
+    """Record of a single execution step."""
+
+    step_number: int
+    description: str
+    timestamp: str
+
+
+@dataclass
+class TaskRecord:
+    """Record of a completed task."""
+
+    id: Optional[int]
+    input_text: str
+    output_text: str
+    tools_used: list[str]
+    execution_steps: list[ExecutionStepRecord]
+    created_at: str
+    thread_id: str
+    status: str = STATUS_COMPLETED
+    # Latency breakdown in milliseconds and LLM usage, see METRIC_FIELDS
+    total_ms: float = 0.0
+    queue_ms: float = 0.0
+    llm_ms: float = 0.0
+    tool_ms: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Prompt tokens the provider served from its prompt cache
+    cached_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt plus completion tokens."""
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "input_text": self.input_text,
+            "output_text": self.output_text,
+            "tools_used": self.tools_used,
+            "execution_steps": [asdict(step) for step in self.execution_steps],
+            "created_at": self.created_at,
+            "thread_id": self.thread_id,
+            "status": self.status,
+            **{field: getattr(self, field) for field in METRIC_FIELDS},
+        }
+
+    def to_json(self, fields: Optional[tuple[str, ...]] = None) -> str:
+        """Serialize to the canonical TaskResponse JSON body.
+
+        With fields (see validate_fields), only those keys are included.
+        """
+        data = self.to_dict()
+        if fields is not None:
+            data = {field: data[field] for field in fields}
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TaskRecord":
+        """Build a record from the output of to_dict()."""
+        return cls(
+            id=data["id"],
+            input_text=data["input_text"],
+            output_text=data["output_text"],
+            tools_used=data["tools_used"],
+            execution_steps=[ExecutionStepRecord(**step) for step in data["execution_steps"]],
+            created_at=data["created_at"],
+            thread_id=data["thread_id"],
+            # Records archived before status and metrics were tracked have none
+            status=data.get("status", STATUS_COMPLETED),
+            **{field: data[field] for field in METRIC_FIELDS if field in data},
+        )
@@ -0,0 +1,387 @@
+"""Retention policies, archival and space reclamation for task history."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .storage import TaskStorage, TaskRecord
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionPolicy:
+    """Limits that decide when a task is moved out of the live database.
+
+    Any limit left as None is not enforced.
+    """
+
+    max_age_days: Optional[float] = None
+    max_tasks_per_thread: Optional[int] = None
+    max_db_bytes: Optional[int] = None  # pages of the tasks table and its indexes
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is configured."""
+        return any(
+            limit is not None
+            for limit in (self.max_age_days, self.max_tasks_per_thread, self.max_db_bytes)
+        )
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """Build a policy from TASK_RETENTION_* environment variables."""
+        max_age = os.getenv("TASK_RETENTION_MAX_AGE_DAYS")
+        per_thread = os.getenv("TASK_RETENTION_MAX_PER_THREAD")
+        max_mb = os.getenv("TASK_RETENTION_MAX_DB_MB")
+        return cls(
+            max_age_days=float(max_age) if max_age else None,
+            max_tasks_per_thread=int(per_thread) if per_thread else None,
+            max_db_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else None,
+        )
+
+
+@dataclass
+class SweepReport:
+    """Summary of a single retention sweep."""
+
+    started_at: str
+    duration_ms: float
+    archived_tasks: int
+    segments_written: int
+    pages_reclaimed: int
+    db_size_before: int
+    db_size_after: int
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+
+class TaskArchive:
+    """Compressed, append-only archive of tasks removed from the live database.
+
+    Tasks are stored in zlib-compressed JSON segments, one segment per sweep
+    batch, with a small index so single tasks and threads can still be looked
+    up. Readers open the archive read-only.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self._init_db()
+
+    @contextmanager
+    def _get_connection(self, read_only: bool = False):
+        """Context manager for archive connections."""
+        if read_only:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        else:
+            conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Initialize the archive schema."""
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS segments (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    archived_at TEXT NOT NULL,
+                    row_count INTEGER NOT NULL,
+                    payload BLOB NOT NULL
+                )
+            """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS archived_tasks (
+                    task_id INTEGER PRIMARY KEY,
+                    segment_id INTEGER NOT NULL,
+                    thread_id TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_archived_thread ON archived_tasks (thread_id)"
+            )
+
+    def write_segment(self, records: list[TaskRecord]) -> int:
+        """Append a compressed segment holding the given records."""
+        payload = zlib.compress(
+            json.dumps([record.to_dict() for record in records]).encode("utf-8")
+        )
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO segments (archived_at, row_count, payload) VALUES (?, ?, ?)",
+                (datetime.now().isoformat(), len(records), payload),
+            )
+            segment_id = cursor.lastrowid
+            # INSERT OR REPLACE keeps a re-archived task (after an interrupted
+            # sweep) pointing at its newest copy
+            conn.executemany(
+                "INSERT OR REPLACE INTO archived_tasks (task_id, segment_id, thread_id, created_at) VALUES (?, ?, ?, ?)",
+                [(r.id, segment_id, r.thread_id, r.created_at) for r in records],
+            )
+            return segment_id
+
+    def get_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Get an archived task by its original ID."""
+        with self._get_connection(read_only=True) as conn:
+            row = conn.execute(
+                "SELECT segment_id FROM archived_tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            if not row:
+                return None
+            for record in self._read_segment(conn, row["segment_id"]):
+                if record.id == task_id:
+                    return record
+        return None
+
+    def get_tasks_by_thread(self, thread_id: str) -> list[TaskRecord]:
+        """Get all archived tasks for a thread, newest first."""
+        with self._get_connection(read_only=True) as conn:
+            rows = conn.execute(
+                "SELECT task_id, segment_id FROM archived_tasks WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchall()
+            wanted: dict[int, set[int]] = {}
+            for row in rows:
+                wanted.setdefault(row["segment_id"], set()).add(row["task_id"])
+
+            records = [
+                record
+                for segment_id, task_ids in wanted.items()
+                for record in self._read_segment(conn, segment_id)
+                if record.id in task_ids
+            ]
+        return sorted(records, key=lambda r: (r.created_at, r.id), reverse=True)
+
+    def iter_tasks(self) -> Iterator[TaskRecord]:
+        """Iterate over every archived task, one segment at a time."""
+        with self._get_connection(read_only=True) as conn:
+            segment_ids = [
+                row["id"] for row in conn.execute("SELECT id FROM segments ORDER BY id")
+            ]
+            for segment_id in segment_ids:
+                for record in self._read_segment(conn, segment_id):
+                    # Skip stale copies superseded by a later segment
+                    current = conn.execute(
+                        "SELECT segment_id FROM archived_tasks WHERE task_id = ?",
+                        (record.id,),
+                    ).fetchone()
+                    if current and current["segment_id"] == segment_id:
+                        yield record
+
+    def get_stats(self) -> dict:
+        """Get size information for the archive."""
+        with self._get_connection(read_only=True) as conn:
+            segments, payload_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM segments"
+            ).fetchone()
+            task_count = conn.execute("SELECT COUNT(*) FROM archived_tasks").fetchone()[0]
+        return {
+            "segments": segments,
+            "task_count": task_count,
+            "compressed_bytes": payload_bytes,
+            "size_bytes": self.db_path.stat().st_size,
+        }
+
+    def _read_segment(self, conn: sqlite3.Connection, segment_id: int) -> list[TaskRecord]:
+        """Decompress a segment into TaskRecords."""
+        row = conn.execute(
+            "SELECT payload FROM segments WHERE id = ?", (segment_id,)
+        ).fetchone()
+        if not row:
+            return []
+        return [
+            TaskRecord.from_dict(data)
+            for data in json.loads(zlib.decompress(row["payload"]))
+        ]
+
+
+class RetentionSweeper:
+    """Moves expired tasks from live storage into a TaskArchive.
+
+    Work is done in small batches, each in its own short transaction with a
+    pause in between, so request handlers writing to the live database are
+    never blocked for long. After archiving, free pages are reclaimed with
+    incremental vacuum.
+    """
+
+    def __init__(
+        self,
+        storage: TaskStorage,
+        policy: RetentionPolicy,
+        archive: Optional[TaskArchive] = None,
+        batch_size: int = 200,
+        batch_pause: float = 0.05,
+        vacuum_pages: int = 500,
+    ):
+        self.storage = storage
+        self.policy = policy
+        self.archive = archive or TaskArchive(
+            str(storage.db_path.with_suffix(".archive.db"))
+        )
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.vacuum_pages = vacuum_pages
+        self.last_report: Optional[SweepReport] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def sweep(self) -> SweepReport:
+        """Run one full retention pass and return its report."""
+        with self._lock:
+            started_at = datetime.now().isoformat()
+            start = time.perf_counter()
+            size_before = self.storage.get_db_stats()["size_bytes"]
+
+            archived = 0
+            segments = 0
+            for selector in (self._expired_by_age, self._expired_by_thread, self._expired_by_size):
+                while not self._stop.is_set():
+                    moved = self._archive_batch(selector)
+                    if not moved:
+                        break
+                    archived += moved
+                    segments += 1
+                    time.sleep(self.batch_pause)
+
+            pages_reclaimed = 0
+            while not self._stop.is_set():
+                reclaimed = self.storage.incremental_vacuum(self.vacuum_pages)
+                if not reclaimed:
+                    break
+                pages_reclaimed += reclaimed
+                time.sleep(self.batch_pause)
+
+            self.last_report = SweepReport(
+                started_at=started_at,
+                duration_ms=round((time.perf_counter() - start) * 1000, 2),
+                archived_tasks=archived,
+                segments_written=segments,
+                pages_reclaimed=pages_reclaimed,
+                db_size_before=size_before,
+                db_size_after=self.storage.get_db_stats()["size_bytes"],
+            )
+            return self.last_report
+
+    def start(self, interval: float = 3600.0):
+        """Start sweeping in a background thread every `interval` seconds."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                # A failed sweep (e.g. "database is locked") must not end
+                # retention; the next interval tries again
+                try:
+                    self.sweep()
+                except Exception:
+                    logger.exception("Retention sweep of %s failed", self.storage.db_path)
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name="retention-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread, finishing the current batch first."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _archive_batch(self, selector) -> int:
+        """Archive one batch of tasks chosen by selector; return how many moved."""
+        with self.storage._get_connection() as conn:
+            ids = selector(conn)
+            if not ids:
+                return 0
+            placeholders = ",".join("?" * len(ids))
+            rows = conn.execute(
+                f"SELECT * FROM tasks WHERE id IN ({placeholders})", ids
+            ).fetchall()
+            # Written before the delete commits: an interrupted sweep can leave
+            # a duplicate in the archive, never a lost task
+            self.archive.write_segment([self.storage._row_to_record(row) for row in rows])
+            conn.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", ids)
+        return len(ids)
+
+    @staticmethod
+    def _tasks_bytes(conn: sqlite3.Connection) -> int:
+        """Bytes of pages held by the tasks table and its indexes.
+
+        Rollups, counters and free pages don't count: archiving tasks can't
+        shrink them, so a limit below their size would otherwise archive
+        every task on every sweep. Without the dbstat table (SQLite built
+        without SQLITE_ENABLE_DBSTAT_VTAB), the used part of the whole file
+        is measured instead.
+        """
+        try:
+            return conn.execute(
+                """
+                SELECT COALESCE(SUM(pgsize), 0) FROM dbstat
+                WHERE aggregate = TRUE
+                    AND name IN (SELECT name FROM sqlite_master WHERE tbl_name = 'tasks')
+            """
+            ).fetchone()[0]
+        except sqlite3.OperationalError:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            return page_size * (page_count - freelist_count)
+
+    def _expired_by_age(self, conn: sqlite3.Connection) -> list[int]:
+        if self.policy.max_age_days is None:
+            return []
+        cutoff = (datetime.now() - timedelta(days=self.policy.max_age_days)).isoformat()
+        rows = conn.execute(
+            "SELECT id FROM tasks WHERE created_at < ? ORDER BY created_at LIMIT ?",
+            (cutoff, self.batch_size),
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def _expired_by_thread(self, conn: sqlite3.Connection) -> list[int]:
+        if self.policy.max_tasks_per_thread is None:
+            return []
+        rows = conn.execute(
+            """
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY thread_id ORDER BY created_at DESC, id DESC
+                ) AS position
+                FROM tasks
+            )
+            WHERE position > ?
+            LIMIT ?
+        """,
+            (self.policy.max_tasks_per_thread, self.batch_size),
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def _expired_by_size(self, conn: sqlite3.Connection) -> list[int]:
+        if self.policy.max_db_bytes is None:
+            return []
+        if self._tasks_bytes(conn) <= self.policy.max_db_bytes:
+            return []
+        rows = conn.execute(
+            "SELECT id FROM tasks ORDER BY created_at LIMIT ?", (self.batch_size,)
+        ).fetchall()
+        return [row["id"] for row in rows]
@@ -0,0 +1,343 @@
+"""Incrementally maintained usage rollups for task history.
+
+Rollup rows are updated in the same transaction as every save_task and
+delete_task, so reading statistics never touches the tasks table. Tasks moved
+to the archive by the retention sweeper keep counting towards the rollups;
+only explicit deletes remove them.
+
+Rebuild the rollups from scratch (e.g. after upgrading an existing database)
+with:
+
+    python -m src.persistence.rollups rebuild --db tasks.db
+"""
+
+import argparse
+import sqlite3
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from .records import STATUS_COMPLETED, STATUS_ERROR
+
+if TYPE_CHECKING:
+    from .records import TaskRecord
+
+# Granularities kept in stats_time; "total" has a single bucket for all time
+HOUR = "hour"
+DAY = "day"
+TOTAL = "total"
+
+MAX_HOURS = 24 * 14
+MAX_DAYS = 366
+MAX_THREADS = 100
+
+
+def init_rollup_tables(conn: sqlite3.Connection):
+    """Create the rollup tables if they don't exist."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stats_time (
+            granularity TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            task_count INTEGER NOT NULL DEFAULT 0,
+            step_count INTEGER NOT NULL DEFAULT 0,
+            error_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, bucket)
+        )
+    """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stats_tools (
+            tool TEXT PRIMARY KEY,
+            use_count INTEGER NOT NULL DEFAULT 0
+        )
+    """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stats_threads (
+            thread_id TEXT PRIMARY KEY,
+            task_count INTEGER NOT NULL DEFAULT 0,
+            step_count INTEGER NOT NULL DEFAULT 0,
+            error_count INTEGER NOT NULL DEFAULT 0
+        )
+    """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_stats_threads_count ON stats_threads (task_count)"
+    )
+
+
+def is_error(record: "TaskRecord") -> bool:
+    """Whether a task counts as an error in the rollups.
+
+    Failed runs count, as do completed runs that produced no output.
+    Cancelled runs don't.
+    """
+    if record.status == STATUS_ERROR:
+        return True
+    return record.status == STATUS_COMPLETED and not record.output_text.strip()
+
+
+def time_buckets(created_at: str) -> list[tuple[str, str]]:
+    """Get the (granularity, bucket) pairs an ISO timestamp falls into."""
+    return [
+        (HOUR, f"{created_at[:13]}:00"),
+        (DAY, created_at[:10]),
+        (TOTAL, ""),
+    ]
+
+
+def apply_rollups(conn: sqlite3.Connection, record: "TaskRecord", sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) a task's contribution to the rollups."""
+    steps = len(record.execution_steps) * sign
+    errors = int(is_error(record)) * sign
+    buckets = time_buckets(record.created_at)
+    tools = set(record.tools_used)
+
+    conn.executemany(
+        """
+        INSERT INTO stats_time (granularity, bucket, task_count, step_count, error_count)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (granularity, bucket) DO UPDATE SET
+            task_count = task_count + excluded.task_count,
+            step_count = step_count + excluded.step_count,
+            error_count = error_count + excluded.error_count
+    """,
+        [
+            (granularity, bucket, sign, steps, errors)
+            for granularity, bucket in buckets
+        ],
+    )
+    conn.executemany(
+        """
+        INSERT INTO stats_tools (tool, use_count) VALUES (?, ?)
+        ON CONFLICT (tool) DO UPDATE SET use_count = use_count + excluded.use_count
+    """,
+        [(tool, sign) for tool in tools],
+    )
+    conn.execute(
+        """
+        INSERT INTO stats_threads (thread_id, task_count, step_count, error_count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (thread_id) DO UPDATE SET
+            task_count = task_count + excluded.task_count,
+            step_count = step_count + excluded.step_count,
+            error_count = error_count + excluded.error_count
+    """,
+        (record.thread_id, sign, steps, errors),
+    )
+
+    if sign < 0:
+        # Only the rows just decremented can have reached zero; keyed deletes
+        # keep this a few primary-key lookups per task
+        conn.execute(
+            "DELETE FROM stats_threads WHERE thread_id = ? AND task_count <= 0",
+            (record.thread_id,),
+        )
+        conn.executemany(
+            "DELETE FROM stats_tools WHERE tool = ? AND use_count <= 0",
+            [(tool,) for tool in tools],
+        )
+        conn.executemany(
+            "DELETE FROM stats_time WHERE granularity = ? AND bucket = ? AND task_count <= 0",
+            buckets,
+        )
+
+
+def clear_rollups(conn: sqlite3.Connection):
+    """Reset all rollups to empty."""
+    conn.execute("DELETE FROM stats_time")
+    conn.execute("DELETE FROM stats_tools")
+    conn.execute("DELETE FROM stats_threads")
+
+
+def summarize(row) -> dict:
+    """Turn a counter row (or dict) into counts, averages and rates."""
+    task_count = row["task_count"]
+    return {
+        "task_count": task_count,
+        "step_count": row["step_count"],
+        "avg_steps": round(row["step_count"] / task_count, 2) if task_count else 0.0,
+        "error_count": row["error_count"],
+        "error_rate": round(row["error_count"] / task_count, 4) if task_count else 0.0,
+    }
+
+
+def read_stats(
+    conn: sqlite3.Connection, hours: int = 24, days: int = 30, top_threads: int = 10
+) -> dict:
+    """Read dashboard statistics from the rollup tables only.
+
+    Every query is a bounded primary-key or index range scan, so the cost does
+    not depend on how many tasks are stored.
+    """
+    hours = max(0, min(hours, MAX_HOURS))
+    days = max(0, min(days, MAX_DAYS))
+    top_threads = max(0, min(top_threads, MAX_THREADS))
+
+    total = conn.execute(
+        "SELECT * FROM stats_time WHERE granularity = ? AND bucket = ''", (TOTAL,)
+    ).fetchone()
+
+    def series(granularity: str, limit: int) -> list[dict]:
+        rows = conn.execute(
+            "SELECT * FROM stats_time WHERE granularity = ? ORDER BY bucket DESC LIMIT ?",
+            (granularity, limit),
+        ).fetchall()
+        return [{"bucket": row["bucket"], **summarize(row)} for row in reversed(rows)]
+
+    tools = conn.execute(
+        "SELECT tool, use_count FROM stats_tools ORDER BY use_count DESC, tool"
+    ).fetchall()
+    threads = conn.execute(
+        "SELECT * FROM stats_threads ORDER BY task_count DESC LIMIT ?", (top_threads,)
+    ).fetchall()
+
+    return {
+        "totals": summarize(total) if total else summarize(
+            {"task_count": 0, "step_count": 0, "error_count": 0}
+        ),
+        "hourly": series(HOUR, hours),
+        "daily": series(DAY, days),
+        "tools": [{"tool": row["tool"], "use_count": row["use_count"]} for row in tools],
+        "top_threads": [{"thread_id": row["thread_id"], **summarize(row)} for row in threads],
+    }
+
+
+def _empty_counter() -> dict:
+    return {"task_count": 0, "step_count": 0, "error_count": 0}
+
+
+def _add_counter(target: dict, source: dict):
+    for key in ("task_count", "step_count", "error_count"):
+        target[key] += source[key]
+
+
+def _format_stats(
+    time_counters: dict[tuple[str, str], dict],
+    tool_counts: dict[str, int],
+    thread_counters: dict[str, dict],
+    hours: int,
+    days: int,
+    top_threads: int,
+) -> dict:
+    """Shape in-memory counters exactly like read_stats() does."""
+    hours = max(0, min(hours, MAX_HOURS))
+    days = max(0, min(days, MAX_DAYS))
+    top_threads = max(0, min(top_threads, MAX_THREADS))
+
+    def series(granularity: str, limit: int) -> list[dict]:
+        buckets = sorted(b for g, b in time_counters if g == granularity)
+        return [
+            {"bucket": bucket, **summarize(time_counters[(granularity, bucket)])}
+            for bucket in (buckets[-limit:] if limit else [])
+        ]
+
+    threads = sorted(thread_counters.items(), key=lambda item: -item[1]["task_count"])
+    return {
+        "totals": summarize(time_counters.get((TOTAL, ""), _empty_counter())),
+        "hourly": series(HOUR, hours),
+        "daily": series(DAY, days),
+        "tools": [
+            {"tool": tool, "use_count": count}
+            for tool, count in sorted(tool_counts.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        "top_threads": [
+            {"thread_id": thread_id, **summarize(counter)}
+            for thread_id, counter in threads[:top_threads]
+        ],
+    }
+
+
+def compute_stats(
+    records: Iterable["TaskRecord"], hours: int = 24, days: int = 30, top_threads: int = 10
+) -> dict:
+    """Compute read_stats()-shaped statistics by scanning records.
+
+    Used by backends without rollup tables; cost is linear in the records.
+    """
+    time_counters: dict[tuple[str, str], dict] = {}
+    tool_counts: dict[str, int] = {}
+    thread_counters: dict[str, dict] = {}
+
+    for record in records:
+        counter = {
+            "task_count": 1,
+            "step_count": len(record.execution_steps),
+            "error_count": int(is_error(record)),
+        }
+        for key in time_buckets(record.created_at):
+            _add_counter(time_counters.setdefault(key, _empty_counter()), counter)
+        _add_counter(thread_counters.setdefault(record.thread_id, _empty_counter()), counter)
+        for tool in set(record.tools_used):
+            tool_counts[tool] = tool_counts.get(tool, 0) + 1
+
+    return _format_stats(time_counters, tool_counts, thread_counters, hours, days, top_threads)
+
+
+def merge_stats(
+    all_stats: Iterable[dict], hours: int = 24, days: int = 30, top_threads: int = 10
+) -> dict:
+    """Merge read_stats() results from disjoint stores (e.g. shards)."""
+    time_counters: dict[tuple[str, str], dict] = {}
+    tool_counts: dict[str, int] = {}
+    thread_counters: dict[str, dict] = {}
+
+    for stats in all_stats:
+        _add_counter(time_counters.setdefault((TOTAL, ""), _empty_counter()), stats["totals"])
+        for granularity, key in ((HOUR, "hourly"), (DAY, "daily")):
+            for row in stats[key]:
+                counter = time_counters.setdefault((granularity, row["bucket"]), _empty_counter())
+                _add_counter(counter, row)
+        for row in stats["tools"]:
+            tool_counts[row["tool"]] = tool_counts.get(row["tool"], 0) + row["use_count"]
+        for row in stats["top_threads"]:
+            _add_counter(thread_counters.setdefault(row["thread_id"], _empty_counter()), row)
+
+    return _format_stats(time_counters, tool_counts, thread_counters, hours, days, top_threads)
+
+
+def rebuild_rollups(storage, archived: Optional[Iterable["TaskRecord"]] = None) -> int:
+    """Recompute all rollups from the tasks table (and optionally the archive).
+
+    Returns the number of tasks counted.
+    """
+    counted = 0
+    with storage._get_connection() as conn:
+        clear_rollups(conn)
+        for row in conn.execute("SELECT * FROM tasks"):
+            apply_rollups(conn, storage._row_to_record(row))
+            counted += 1
+        for record in archived or ():
+            apply_rollups(conn, record)
+            counted += 1
+    return counted
+
+
+def main(argv: Optional[list[str]] = None):
+    """Command line entry point for rollup maintenance."""
+    from pathlib import Path
+
+    from .storage import TaskStorage
+    from .retention import TaskArchive
+
+    parser = argparse.ArgumentParser(description="Maintain task usage rollups")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild = subparsers.add_parser("rebuild", help="Recompute rollups from stored tasks")
+    rebuild.add_argument("--db", default="tasks.db", help="Path to the task database")
+    rebuild.add_argument(
+        "--archive",
+        help="Also count tasks in this archive (defaults to <db>.archive.db if present)",
+    )
+    args = parser.parse_args(argv)
+
+    storage = TaskStorage(args.db)
+    archive_path = Path(args.archive) if args.archive else storage.db_path.with_suffix(".archive.db")
+    archived = TaskArchive(str(archive_path)).iter_tasks() if archive_path.exists() else None
+
+    counted = rebuild_rollups(storage, archived)
+    print(f"Rebuilt rollups from {counted} tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Task storage sharded by thread across several SQLite files."""
+
+import hashlib
+import heapq
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Hashable, Optional
+
+from .base import TaskStorageBackend
+from .records import TaskRecord
+from .rollups import merge_stats
+from .storage import TaskStorage
+
+
+class ShardedTaskStorage(TaskStorageBackend):
+    """Routes tasks to one of N SQLite databases by a hash of their thread_id.
+
+    Each shard has its own SQLite writer lock, so write throughput grows with
+    the number of shards. All tasks of a thread live on the same shard; task
+    IDs are allocated so that `task_id % N` names the shard that owns them.
+    Global listings and statistics scatter to every shard and merge results.
+    """
+
+    def __init__(self, db_paths: list[str]):
+        if not db_paths:
+            raise ValueError("ShardedTaskStorage needs at least one database path")
+        self.shards = [
+            TaskStorage(path, id_stride=len(db_paths), id_offset=index)
+            for index, path in enumerate(db_paths)
+        ]
+        self._pool = ThreadPoolExecutor(
+            max_workers=len(self.shards), thread_name_prefix="storage-shard"
+        )
+
+    @classmethod
+    def from_base_path(cls, db_path: str, shard_count: int) -> "ShardedTaskStorage":
+        """Create shards named like tasks.0.db, tasks.1.db, ... next to db_path."""
+        base = Path(db_path)
+        return cls([str(base.with_suffix(f".{i}{base.suffix}")) for i in range(shard_count)])
+
+    def shard_for_thread(self, thread_id: str) -> TaskStorage:
+        """Get the shard that owns a thread."""
+        return self.shards[zlib.crc32(thread_id.encode("utf-8")) % len(self.shards)]
+
+    def shard_for_task(self, task_id: int) -> TaskStorage:
+        """Get the shard that owns a task ID."""
+        return self.shards[task_id % len(self.shards)]
+
+    def _scatter(self, fn) -> list:
+        """Call fn(shard) on every shard concurrently."""
+        return list(self._pool.map(fn, self.shards))
+
+    def save_task(self, record: TaskRecord) -> int:
+        """Save a task record on its thread's shard and return its ID."""
+        return self.shard_for_thread(record.thread_id).save_task(record)
+
+    def get_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Get a specific task by ID."""
+        return self.shard_for_task(task_id).get_task(task_id)
+
+    def get_task_json(self, task_id: int) -> Optional[str]:
+        """Get a specific task as its pre-serialized JSON response body."""
+        return self.shard_for_task(task_id).get_task_json(task_id)
+
+    def get_all_tasks(self, limit: int = 100, offset: int = 0) -> list[TaskRecord]:
+        """Get all tasks, newest first, merged across shards."""
+        per_shard = self._scatter(lambda shard: shard.get_all_tasks(limit=offset + limit))
+        # id breaks timestamp ties, as in each shard's ORDER BY, so pages are stable
+        merged = heapq.merge(*per_shard, key=lambda t: (t.created_at, t.id), reverse=True)
+        return list(islice(merged, offset, offset + limit))
+
+    def get_task_bodies(
+        self, limit: int = 100, offset: int = 0, fields: Optional[tuple[str, ...]] = None
+    ) -> list[tuple[str, int, str]]:
+        """Get (created_at, id, response JSON) triples, newest first, merged across shards."""
+        per_shard = self._scatter(
+            lambda shard: shard.get_task_bodies(limit=offset + limit, fields=fields)
+        )
+        merged = heapq.merge(*per_shard, key=lambda row: row[:2], reverse=True)
+        return list(islice(merged, offset, offset + limit))
+
+    def get_all_tasks_json(
+        self, limit: int = 100, offset: int = 0, fields: Optional[tuple[str, ...]] = None
+    ) -> str:
+        """Get a page of tasks as a JSON array, merged across shards."""
+        bodies = self.get_task_bodies(limit=limit, offset=offset, fields=fields)
+        return "[" + ",".join(body for *_, body in bodies) + "]"
+
+    def get_tasks_by_thread(self, thread_id: str) -> list[TaskRecord]:
+        """Get all tasks for a specific thread."""
+        return self.shard_for_thread(thread_id).get_tasks_by_thread(thread_id)
+
+    def get_tasks_by_thread_json(
+        self, thread_id: str, fields: Optional[tuple[str, ...]] = None
+    ) -> str:
+        """Get all tasks for a thread as a JSON array."""
+        return self.shard_for_thread(thread_id).get_tasks_by_thread_json(thread_id, fields)
+
+    def count_tasks(self) -> int:
+        """Number of tasks across all shards."""
+        return sum(self._scatter(lambda shard: shard.count_tasks()))
+
+    def get_top_tasks(self, metric: str = "total_ms", limit: int = 10) -> list[TaskRecord]:
+        """Get the tasks with the highest value of a metric across all shards."""
+        per_shard = self._scatter(lambda shard: shard.get_top_tasks(metric=metric, limit=limit))
+        merged = heapq.merge(*per_shard, key=lambda t: getattr(t, metric), reverse=True)
+        return list(islice(merged, limit))
+
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task by ID."""
+        return self.shard_for_task(task_id).delete_task(task_id)
+
+    def clear_all(self):
+        """Clear all tasks on every shard."""
+        self._scatter(lambda shard: shard.clear_all())
+
+    def get_stats(self, hours: int = 24, days: int = 30, top_threads: int = 10) -> dict:
+        """Get usage statistics merged from every shard's rollups."""
+        # Threads are disjoint across shards, so each shard's top N contains
+        # every thread that can make the global top N
+        per_shard = self._scatter(
+            lambda shard: shard.get_stats(hours=hours, days=days, top_threads=top_threads)
+        )
+        return merge_stats(per_shard, hours=hours, days=days, top_threads=top_threads)
+
+    def get_db_stats(self) -> dict:
+        """Get summed size information plus a per-shard breakdown."""
+        per_shard = self._scatter(lambda shard: shard.get_db_stats())
+        totals = {
+            key: sum(stats[key] for stats in per_shard)
+            for key in ("size_bytes", "used_bytes", "free_pages", "task_count")
+        }
+        return {**totals, "shards": per_shard}
+
+    def data_version(self) -> Optional[Hashable]:
+        """Combined data_version of every shard."""
+        return tuple(shard.data_version() for shard in self.shards)
+
+    def content_version(self) -> Optional[str]:
+        """Digest of every shard's content version."""
+        versions = ",".join(shard.content_version() for shard in self.shards)
+        return hashlib.blake2b(versions.encode(), digest_size=8).hexdigest()
+
+    def close(self):
+        """Close every shard and the scatter pool."""
+        for shard in self.shards:
+            shard.close()
+        self._pool.shutdown(wait=False)
@@ -2,52 +2,55 @@
 
 import json
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
-from dataclasses import dataclass, asdict
+from typing import Hashable, Optional
+from dataclasses import asdict, replace
 from contextlib import contextmanager
 
+from .base import TaskStorageBackend
+from .records import (
+    JSON_FIELDS,
+    METRIC_FIELDS,
+    TOP_TASK_METRICS,
+    ExecutionStepRecord,
+    TaskRecord,
+    validate_fields,
+)
+from .rollups import init_rollup_tables, apply_rollups, clear_rollups, read_stats
 
-@dataclass
-class ExecutionStepRecord:
-    """Record of a single execution step."""
 
-    step_number: int
-    description: str
-    timestamp: str
+# Columns added after the original schema, with their definitions. Existing
+# databases get them on startup and their stored response bodies regenerated.
+_ADDED_COLUMNS = {
+    "response_json": "TEXT",
+    "status": "TEXT NOT NULL DEFAULT 'completed'",
+    "total_ms": "REAL NOT NULL DEFAULT 0",
+    "queue_ms": "REAL NOT NULL DEFAULT 0",
+    "llm_ms": "REAL NOT NULL DEFAULT 0",
+    "tool_ms": "REAL NOT NULL DEFAULT 0",
+    "llm_calls": "INTEGER NOT NULL DEFAULT 0",
+    "prompt_tokens": "INTEGER NOT NULL DEFAULT 0",
+    "completion_tokens": "INTEGER NOT NULL DEFAULT 0",
+    "cached_tokens": "INTEGER NOT NULL DEFAULT 0",
+}
 
 
-@dataclass
-class TaskRecord:
-    """Record of a completed task."""
+class TaskStorage(TaskStorageBackend):
+    """SQLite-based storage for task history.
 
-    id: Optional[int]
-    input_text: str
-    output_text: str
-    tools_used: list[str]
-    execution_steps: list[ExecutionStepRecord]
-    created_at: str
-    thread_id: str
+    When several databases share one ID space (see ShardedTaskStorage), each
+    is given an id_stride equal to the number of databases and a distinct
+    id_offset, and only allocates IDs congruent to id_offset.
+    """
 
-    def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
-        return {
-            "id": self.id,
-            "input_text": self.input_text,
-            "output_text": self.output_text,
-            "tools_used": self.tools_used,
-            "execution_steps": [asdict(step) for step in self.execution_steps],
-            "created_at": self.created_at,
-            "thread_id": self.thread_id,
-        }
-
-
-class TaskStorage:
-    """SQLite-based storage for task history."""
-
-    def __init__(self, db_path: str = "tasks.db"):
+    def __init__(self, db_path: str = "tasks.db", id_stride: int = 1, id_offset: int = 0):
         self.db_path = Path(db_path)
+        self.id_stride = id_stride
+        self.id_offset = id_offset
+        self._watch_conn: Optional[sqlite3.Connection] = None
+        self._watch_lock = threading.Lock()
         self._init_db()
 
     @contextmanager
@@ -64,6 +67,13 @@ class TaskStorage:
     def _init_db(self):
         """Initialize the database schema."""
         with self._get_connection() as conn:
+            # Incremental auto-vacuum lets the retention sweeper hand free
+            # pages back to the filesystem without a blocking full VACUUM.
+            # The setting only sticks before the first table is created, so
+            # databases created by older versions are converted once.
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS tasks (
@@ -77,25 +87,113 @@ class TaskStorage:
                 )
             """
             )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(tasks)")}
+            missing = [name for name in _ADDED_COLUMNS if name not in columns]
+            for name in missing:
+                conn.execute(f"ALTER TABLE tasks ADD COLUMN {name} {_ADDED_COLUMNS[name]}")
+            if missing:
+                self._backfill_response_json(conn)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tasks_thread_id ON tasks (thread_id, created_at)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)")
+            for name, expression in TOP_TASK_METRICS.items():
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_tasks_{name} ON tasks ({expression})"
+                )
+            init_rollup_tables(conn)
+            self._init_version_counter(conn)
+
+    @staticmethod
+    def _init_version_counter(conn: sqlite3.Connection):
+        """Count tasks and every change to them, whichever connection writes.
+
+        The epoch is random per database file, so a recreated database never
+        reuses an old (epoch, version) pair.
+        """
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS storage_version (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                epoch TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                task_count INTEGER NOT NULL DEFAULT 0
+            )
+        """
+        )
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(storage_version)")}
+        if "task_count" not in columns:
+            conn.execute(
+                "ALTER TABLE storage_version ADD COLUMN task_count INTEGER NOT NULL DEFAULT 0"
+            )
+            conn.execute("UPDATE storage_version SET task_count = (SELECT COUNT(*) FROM tasks)")
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO storage_version
+            VALUES (0, lower(hex(randomblob(6))), 0, (SELECT COUNT(*) FROM tasks))
+        """
+        )
+        # Recreated on every start so trigger bodies follow code changes
+        for event, count_change in (("INSERT", "+ 1"), ("UPDATE", ""), ("DELETE", "- 1")):
+            conn.execute(f"DROP TRIGGER IF EXISTS tasks_version_{event.lower()}")
+            conn.execute(
+                f"""
+                CREATE TRIGGER tasks_version_{event.lower()}
+                AFTER {event} ON tasks
+                BEGIN
+                    UPDATE storage_version
+                    SET version = version + 1, task_count = task_count {count_change}
+                    WHERE id = 0;
+                END
+            """
+            )
 
     def save_task(self, record: TaskRecord) -> int:
         """Save a task record and return its ID."""
         with self._get_connection() as conn:
+            task_id = None
+            if self.id_stride > 1:
+                # Take the write lock before reading the high-water mark so
+                # concurrent writers can't allocate the same ID. AUTOINCREMENT
+                # keeps the largest ID ever inserted in sqlite_sequence, so
+                # unlike MAX(id) it doesn't go back down when the newest task
+                # is deleted or archived.
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'tasks'"
+                ).fetchone()
+                last_id = row[0] if row else 0
+                task_id = last_id + 1
+                task_id += (self.id_offset - task_id) % self.id_stride
+
             cursor = conn.execute(
-                """
-                INSERT INTO tasks (input_text, output_text, tools_used, execution_steps, created_at, thread_id)
-                VALUES (?, ?, ?, ?, ?, ?)
+                f"""
+                INSERT INTO tasks (id, input_text, output_text, tools_used, execution_steps, created_at, thread_id, status, {", ".join(METRIC_FIELDS)})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, {", ".join("?" * len(METRIC_FIELDS))})
             """,
                 (
+                    task_id,
                     record.input_text,
                     record.output_text,
                     json.dumps(record.tools_used),
                     json.dumps([asdict(step) for step in record.execution_steps]),
                     record.created_at,
                     record.thread_id,
+                    record.status,
+                    *(getattr(record, field) for field in METRIC_FIELDS),
                 ),
             )
-            return cursor.lastrowid
+            task_id = cursor.lastrowid
+            # Serialize the response body once here so reads can return it as is
+            conn.execute(
+                "UPDATE tasks SET response_json = ? WHERE id = ?",
+                (replace(record, id=task_id).to_json(), task_id),
+            )
+            apply_rollups(conn, record)
+            return task_id
 
     def get_task(self, task_id: int) -> Optional[TaskRecord]:
         """Get a specific task by ID."""
@@ -112,7 +210,7 @@ class TaskStorage:
         """Get all tasks with pagination."""
         with self._get_connection() as conn:
             rows = conn.execute(
-                "SELECT * FROM tasks ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                "SELECT * FROM tasks ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
                 (limit, offset),
             ).fetchall()
 
@@ -122,28 +220,179 @@ class TaskStorage:
         """Get all tasks for a specific thread."""
         with self._get_connection() as conn:
             rows = conn.execute(
-                "SELECT * FROM tasks WHERE thread_id = ? ORDER BY created_at DESC",
+                "SELECT * FROM tasks WHERE thread_id = ? ORDER BY created_at DESC, id DESC",
                 (thread_id,),
             ).fetchall()
 
             return [self._row_to_record(row) for row in rows]
 
+    def get_top_tasks(self, metric: str = "total_ms", limit: int = 10) -> list[TaskRecord]:
+        """Get the tasks with the highest value of a latency or usage metric."""
+        if metric not in TOP_TASK_METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Use one of: {', '.join(TOP_TASK_METRICS)}")
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM tasks ORDER BY {TOP_TASK_METRICS[metric]} DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+            return [self._row_to_record(row) for row in rows]
+
+    def get_task_json(self, task_id: int) -> Optional[str]:
+        """Get a specific task as its pre-serialized JSON response body."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT response_json FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+
+            return row["response_json"] if row else None
+
+    def get_all_tasks_json(
+        self, limit: int = 100, offset: int = 0, fields: Optional[tuple[str, ...]] = None
+    ) -> str:
+        """Get a page of tasks as a JSON array, stitched from stored bodies.
+
+        With fields, only those columns are read and SQLite builds each body.
+        """
+        bodies = self.get_task_bodies(limit=limit, offset=offset, fields=fields)
+        return "[" + ",".join(body for *_, body in bodies) + "]"
+
+    def get_task_bodies(
+        self, limit: int = 100, offset: int = 0, fields: Optional[tuple[str, ...]] = None
+    ) -> list[tuple[str, int, str]]:
+        """Get (created_at, id, response JSON) triples, newest first, with pagination."""
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT created_at, id, {self._body_sql(fields)} AS body FROM tasks "
+                "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+
+            return [(row["created_at"], row["id"], row["body"]) for row in rows]
+
+    def get_tasks_by_thread_json(
+        self, thread_id: str, fields: Optional[tuple[str, ...]] = None
+    ) -> str:
+        """Get all tasks for a thread as a JSON array, stitched from stored bodies."""
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT {self._body_sql(fields)} AS response_json FROM tasks "
+                "WHERE thread_id = ? ORDER BY created_at DESC, id DESC",
+                (thread_id,),
+            ).fetchall()
+
+            return self._stitch(rows)
+
+    @staticmethod
+    def _body_sql(fields: Optional[tuple[str, ...]]) -> str:
+        """SQL expression for a task's JSON body, projected to fields if given.
+
+        Fields are checked against RESPONSE_FIELDS before going into the SQL.
+        """
+        if fields is None:
+            return "response_json"
+        fields = validate_fields(fields)
+        pairs = ", ".join(
+            f"'{field}', json({field})" if field in JSON_FIELDS else f"'{field}', {field}"
+            for field in fields
+        )
+        return f"json_object({pairs})"
+
+    def count_tasks(self) -> int:
+        """Number of stored tasks, from the trigger-maintained counter."""
+        return self._watch("SELECT task_count FROM storage_version")[0]
+
     def delete_task(self, task_id: int) -> bool:
         """Delete a task by ID."""
         with self._get_connection() as conn:
-            cursor = conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-            return cursor.rowcount > 0
+            row = conn.execute(
+                "SELECT * FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+            if not row:
+                return False
+
+            conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            apply_rollups(conn, self._row_to_record(row), sign=-1)
+            return True
 
     def clear_all(self):
         """Clear all tasks (useful for testing)."""
         with self._get_connection() as conn:
             conn.execute("DELETE FROM tasks")
+            clear_rollups(conn)
+
+    def get_stats(self, hours: int = 24, days: int = 30, top_threads: int = 10) -> dict:
+        """Get usage statistics from the incrementally maintained rollups."""
+        with self._get_connection() as conn:
+            return read_stats(conn, hours=hours, days=days, top_threads=top_threads)
+
+    def get_db_stats(self) -> dict:
+        """Get on-disk size information for the database file."""
+        with self._get_connection() as conn:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            task_count = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+        return {
+            "size_bytes": page_size * page_count,
+            "used_bytes": page_size * (page_count - freelist_count),
+            "free_pages": freelist_count,
+            "page_size": page_size,
+            "task_count": task_count,
+        }
+
+    def incremental_vacuum(self, max_pages: int = 1000) -> int:
+        """Return up to max_pages free pages to the filesystem.
 
-    def export_to_json(self, filepath: str):
-        """Export all tasks to a JSON file."""
-        tasks = self.get_all_tasks(limit=10000)
-        with open(filepath, "w") as f:
-            json.dump([task.to_dict() for task in tasks], f, indent=2)
+        Returns the number of pages reclaimed.
+        """
+        with self._get_connection() as conn:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # The pragma steps once per reclaimed page; drain it fully
+            conn.execute(f"PRAGMA incremental_vacuum({int(max_pages)})").fetchall()
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return before - after
+
+    def data_version(self) -> Optional[Hashable]:
+        """SQLite's PRAGMA data_version, read on a dedicated long-lived connection.
+
+        The value changes whenever any other connection, in this process or
+        another, commits a write to the database.
+        """
+        return self._watch("PRAGMA data_version")[0]
+
+    def content_version(self) -> Optional[str]:
+        """The storage_version counter, maintained by triggers on the tasks table."""
+        epoch, version = self._watch("SELECT epoch, version FROM storage_version")
+        return f"{epoch}.{version}"
+
+    def _watch(self, query: str) -> tuple:
+        """Run a single-row query on the long-lived watch connection."""
+        with self._watch_lock:
+            if self._watch_conn is None:
+                self._watch_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._watch_conn.execute(query).fetchone()
+
+    def close(self):
+        """Close the long-lived watch connection, if open."""
+        with self._watch_lock:
+            if self._watch_conn is not None:
+                self._watch_conn.close()
+                self._watch_conn = None
+
+    @staticmethod
+    def _stitch(rows: list[sqlite3.Row]) -> str:
+        """Join pre-serialized task bodies into a JSON array."""
+        return "[" + ",".join(row["response_json"] for row in rows) + "]"
+
+    def _backfill_response_json(self, conn: sqlite3.Connection):
+        """Regenerate stored response bodies, e.g. after a schema change."""
+        rows = conn.execute("SELECT * FROM tasks").fetchall()
+        conn.executemany(
+            "UPDATE tasks SET response_json = ? WHERE id = ?",
+            [(self._row_to_record(row).to_json(), row["id"]) for row in rows],
+        )
 
     def _row_to_record(self, row: sqlite3.Row) -> TaskRecord:
         """Convert a database row to a TaskRecord."""
@@ -156,4 +405,6 @@ class TaskStorage:
             execution_steps=[ExecutionStepRecord(**step) for step in steps_data],
             created_at=row["created_at"],
             thread_id=row["thread_id"],
+            status=row["status"],
+            **{field: row[field] for field in METRIC_FIELDS},
         )
@@ -1,5 +1,53 @@
-from .text_processor import TextProcessorTool
-from .calculator import CalculatorTool
-from .weather_mock import WeatherMockTool
+"""Agent tools, registered in `registry` and imported on first use.
 
-__all__ = ["TextProcessorTool", "CalculatorTool", "WeatherMockTool"]
+`from src.tools import CalculatorTool` still works: module attributes are
+looked up in the registry, which imports the defining module then.
+"""
+
+from .registry import ToolRegistry, ToolSpec
+
+registry = ToolRegistry()
+
+registry.register(
+    ToolSpec(
+        name="TextProcessorTool",
+        module="src.tools.text_processor",
+        summary="For text operations like uppercase, lowercase, word_count, char_count, reverse, title_case",
+        keywords=frozenset(
+            {"text", "uppercase", "upper", "lowercase", "lower", "words", "word", "count",
+             "characters", "chars", "reverse", "title", "case", "capitalize", "letters"}
+        ),
+    )
+)
+registry.register(
+    ToolSpec(
+        name="CalculatorTool",
+        module="src.tools.calculator",
+        summary='For mathematical calculations (e.g., "3 + 5", "10 * 2")',
+        keywords=frozenset(
+            {"calculate", "calculator", "compute", "math", "plus", "minus", "times", "divided",
+             "multiply", "sum", "product", "square", "power", "percent", "sqrt"}
+        ),
+        pattern=r"\d\s*(?:[-+*/%^]|\*\*)\s*[\d(]",
+    )
+)
+registry.register(
+    ToolSpec(
+        name="WeatherMockTool",
+        module="src.tools.weather_mock",
+        summary="For getting weather information for a city",
+        keywords=frozenset(
+            {"weather", "temperature", "forecast", "rain", "raining", "sunny", "cold", "hot",
+             "humidity", "humid", "wind", "windy", "snow", "climate", "degrees"}
+        ),
+    )
+)
+
+__all__ = ["registry", "ToolRegistry", "ToolSpec", "TextProcessorTool", "CalculatorTool", "WeatherMockTool"]
+
+
+def __getattr__(name: str):
+    tool = registry.get(name)
+    if tool is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return tool
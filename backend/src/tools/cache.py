@@ -0,0 +1,102 @@
+"""Memoization of pure tool calls across tasks.
+
+Tools opt in through their LangChain metadata:
+
+    CalculatorTool.metadata = {"cacheable": True}
+    WeatherMockTool.metadata = {"cacheable": True, "cache_ttl": 600}
+
+cache_ttl is in seconds; without one, entries live until evicted. Keys are
+the tool name plus its arguments as sorted-key JSON, hashed so the cache
+doesn't hold on to large arguments. Calls whose string arguments or result
+are longer than max_chars are not cached at all.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from langchain_core.tools import BaseTool
+
+
+class ToolResultCache:
+    """Thread-safe LRU cache of tool results with per-tool TTLs."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_chars: int = 64 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.clock = clock
+        # key -> (result, expires_at or None)
+        self._data: OrderedDict[str, tuple[str, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, tool: Optional[BaseTool], args: dict) -> Optional[str]:
+        """Cache key for a call, or None if the call shouldn't be cached."""
+        if self.max_entries <= 0 or tool is None:
+            return None
+        if not (tool.metadata or {}).get("cacheable"):
+            return None
+        if sum(len(value) for value in args.values() if isinstance(value, str)) > self.max_chars:
+            return None
+        canonical = json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(
+            f"{tool.name}\0{canonical}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached result and mark it as recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+                del self._data[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, tool: BaseTool, result: str):
+        """Store a result for the tool's TTL, evicting the least recently used if full."""
+        if len(result) > self.max_chars:
+            return
+        ttl = (tool.metadata or {}).get("cache_ttl")
+        expires_at = self.clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (result, expires_at)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Get hit ratio and occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
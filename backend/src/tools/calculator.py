@@ -1,8 +1,9 @@
 """Calculator tool for basic arithmetic operations."""
 
-import re
 from langchain_core.tools import tool
 
+from .expression import ExpressionError, LimitExceeded, default_engine, format_number
+
 
 @tool
 def CalculatorTool(expression: str) -> str:
@@ -15,34 +16,29 @@ def CalculatorTool(expression: str) -> str:
     Returns:
         The result of the calculation as a string
     """
-    # Sanitize the expression - only allow safe characters
-    sanitized = expression.replace(" ", "")
-
-    # Check for valid characters only (numbers, operators, parentheses, decimal point)
-    if not re.match(r"^[\d+\-*/%().]+$", sanitized):
-        return f"Invalid expression: '{expression}'. Only numbers and basic operators (+, -, *, /, %, **) are allowed."
-
     # Prevent empty expressions
-    if not sanitized:
+    if not expression.strip():
         return "Empty expression provided"
 
+    # Parsed and evaluated by a restricted AST engine with size limits
     try:
-        # Use eval with restricted globals for safety
-        # Only allow basic math operations
-        result = eval(sanitized, {"__builtins__": {}}, {})
-
-        # Format the result nicely
-        if isinstance(result, float):
-            # Remove unnecessary decimal places
-            if result == int(result):
-                result = int(result)
-            else:
-                result = round(result, 10)
-
-        return f"{expression} = {result}"
+        result = default_engine.evaluate(expression)
+        return f"{expression} = {format_number(result)}"
     except ZeroDivisionError:
         return "Error: Division by zero"
-    except SyntaxError:
-        return f"Invalid expression syntax: '{expression}'"
+    except LimitExceeded as e:
+        return f"Expression too large: '{expression}' ({e})"
+    except ExpressionError as e:
+        return f"Invalid expression: '{expression}'. {str(e).capitalize()}."
     except Exception as e:
         return f"Calculation error: {str(e)}"
+
+
+# Pure: the same expression always evaluates to the same result. CPU-bound, so it
+# runs in a worker process where a runaway evaluation can be stopped.
+CalculatorTool.metadata = {
+    "cacheable": True,
+    "executor": "process",
+    "timeout": 2,
+    "memory_limit_mb": 256,
+}
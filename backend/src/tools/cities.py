@@ -0,0 +1,356 @@
+"""Memory-mapped city index used by WeatherMockTool.
+
+A city source is a TSV file, either in the bundled format (name, country,
+latitude, longitude, population; lines starting with '#' are comments) or a
+GeoNames dump such as cities500.txt with a few hundred thousand entries. On
+first use the source is compiled into an index file next to it
+(<source>.idx, rebuilt whenever the source is newer) and memory-mapped, so
+opening the index reads a few pages no matter how large the dataset is.
+
+Index layout, in native byte order since the index is a local cache of the
+source rather than an interchange format:
+
+    header    MAGIC, record count and section offsets
+    records   "key\\tname\\tcountry\\tlatitude\\tlongitude\\tpopulation\\n",
+              sorted by key and then by descending population
+    offsets   uint32[count + 1], where each record starts in `records`
+    trigrams  uint32[TRIGRAM_SLOTS + 1], where each trigram's postings start
+    postings  uint32 record numbers, grouped by trigram
+
+Keys are names folded to lowercase ASCII letters, digits and single spaces.
+Exact and prefix lookups bisect the sorted keys. Fuzzy lookups count shared
+trigrams over the query's rarest posting lists, then rank the best
+candidates by edit similarity.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import unicodedata
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+DEFAULT_SOURCE = Path(__file__).parent / "data" / "cities.tsv"
+
+MAGIC = b"BMOCITY1"
+_HEADER = struct.Struct("=8sIIIII")
+
+_ALPHABET = " 0123456789abcdefghijklmnopqrstuvwxyz"
+_CODES = {char: code for code, char in enumerate(_ALPHABET)}
+TRIGRAM_SLOTS = len(_ALPHABET) ** 3
+
+# Shortest query that may resolve to the most populous city it prefixes
+MIN_PREFIX_LENGTH = 4
+# Prefixes matching more keys than this are too ambiguous to resolve
+PREFIX_SCAN_LIMIT = 64
+# Posting lists counted per fuzzy query (the rarest ones), and candidates
+# ranked by edit similarity
+FUZZY_TRIGRAMS = 6
+FUZZY_CANDIDATES = 16
+FUZZY_MIN_SCORE = 0.8
+
+# Nicknames and abbreviations, as normalized keys
+ALIASES = {
+    "nyc": "new york",
+    "ny": "new york",
+    "big apple": "new york",
+    "la": "los angeles",
+    "sf": "san francisco",
+    "san fran": "san francisco",
+    "frisco": "san francisco",
+    "dc": "washington",
+    "washington dc": "washington",
+    "philly": "philadelphia",
+    "vegas": "las vegas",
+    "nola": "new orleans",
+    "saint louis": "st louis",
+    "cdmx": "mexico city",
+    "rio": "rio de janeiro",
+    "bombay": "mumbai",
+    "calcutta": "kolkata",
+    "madras": "chennai",
+    "peking": "beijing",
+    "saigon": "ho chi minh city",
+    "hcmc": "ho chi minh city",
+    "kiev": "kyiv",
+    "st petersburg": "saint petersburg",
+    "kl": "kuala lumpur",
+    "hk": "hong kong",
+}
+
+
+def normalize(name: str) -> str:
+    """Fold a city name to its lookup key, e.g. "São Paulo" -> "sao paulo"."""
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    return " ".join("".join(char if char.isalnum() else " " for char in folded).split())
+
+
+def trigrams(key: str) -> set[int]:
+    """Trigram slot numbers of a normalized key, padded with spaces."""
+    codes = [_CODES[char] for char in f" {key} "]
+    size = len(_ALPHABET)
+    return {
+        (codes[i] * size + codes[i + 1]) * size + codes[i + 2] for i in range(len(codes) - 2)
+    }
+
+
+@dataclass(frozen=True)
+class City:
+    """One entry of the city dataset."""
+
+    key: str
+    name: str
+    country: str
+    latitude: float
+    longitude: float
+    population: int
+
+
+@dataclass(frozen=True)
+class Match:
+    """A lookup result and how the query reached it.
+
+    how is "exact", "alias", "prefix" or "fuzzy".
+    """
+
+    city: City
+    how: str
+
+
+def read_source(path: Union[str, Path]) -> Iterator[tuple[str, str, float, float, int]]:
+    """Yield (name, country, latitude, longitude, population) from a source TSV."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) >= 15:
+                # GeoNames: asciiname, latitude, longitude, country code, population
+                yield cols[1], cols[8], float(cols[4]), float(cols[5]), int(cols[14] or 0)
+            else:
+                name, country, latitude, longitude, population = cols[:5]
+                yield name, country, float(latitude), float(longitude), int(population)
+
+
+def build_index(source: Union[str, Path], target: Union[str, Path]) -> int:
+    """Compile a source TSV into an index file and return its record count."""
+    rows = sorted(
+        (key, -population, name, country, latitude, longitude)
+        for name, country, latitude, longitude, population in read_source(source)
+        if (key := normalize(name))
+    )
+
+    records = bytearray()
+    offsets = array("I")
+    postings_by_trigram: dict[int, list[int]] = {}
+    for number, (key, neg_population, name, country, latitude, longitude) in enumerate(rows):
+        offsets.append(len(records))
+        records += (
+            f"{key}\t{name}\t{country}\t{latitude}\t{longitude}\t{-neg_population}\n"
+        ).encode("utf-8")
+        for trigram in trigrams(key):
+            postings_by_trigram.setdefault(trigram, []).append(number)
+    offsets.append(len(records))
+    records += b"\0" * (-len(records) % 4)  # keep the uint32 sections aligned
+
+    trigram_starts = array("I", [0]) * (TRIGRAM_SLOTS + 1)
+    postings = array("I")
+    for trigram in range(TRIGRAM_SLOTS):
+        trigram_starts[trigram] = len(postings)
+        postings.extend(postings_by_trigram.get(trigram, ()))
+    trigram_starts[TRIGRAM_SLOTS] = len(postings)
+
+    records_at = _HEADER.size
+    offsets_at = records_at + len(records)
+    trigrams_at = offsets_at + len(offsets) * offsets.itemsize
+    postings_at = trigrams_at + len(trigram_starts) * trigram_starts.itemsize
+
+    # Written beside the target and renamed, so readers never see half an index
+    target = Path(target)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                _HEADER.pack(MAGIC, len(rows), records_at, offsets_at, trigrams_at, postings_at)
+            )
+            f.write(records)
+            offsets.tofile(f)
+            trigram_starts.tofile(f)
+            postings.tofile(f)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return len(rows)
+
+
+class _Keys:
+    """Sequence view of an index's sorted keys, for bisect."""
+
+    def __init__(self, index: "CityIndex"):
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, number: int) -> bytes:
+        return self._index._key(number)
+
+
+class CityIndex:
+    """Read-only lookups over a memory-mapped index file."""
+
+    def __init__(self, path: Union[str, Path]):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, records_at, offsets_at, trigrams_at, postings_at = _HEADER.unpack_from(
+            self._mm
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a city index")
+        view = memoryview(self._mm)
+        self._count = count
+        self._records_at = records_at
+        self._offsets = view[offsets_at:trigrams_at].cast("I")
+        self._trigrams = view[trigrams_at:postings_at].cast("I")
+        self._postings = view[postings_at:].cast("I")
+        self._keys = _Keys(self)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key(self, number: int) -> bytes:
+        start = self._records_at + self._offsets[number]
+        return self._mm[start:self._mm.find(b"\t", start)]
+
+    def record(self, number: int) -> City:
+        """Decode one record."""
+        start = self._records_at + self._offsets[number]
+        end = self._records_at + self._offsets[number + 1] - 1
+        key, name, country, latitude, longitude, population = (
+            self._mm[start:end].decode("utf-8").split("\t")
+        )
+        return City(key, name, country, float(latitude), float(longitude), int(population))
+
+    def exact(self, key: str) -> Optional[City]:
+        """The most populous city with exactly this key."""
+        target = key.encode("ascii")
+        number = bisect_left(self._keys, target)
+        if number < self._count and self._key(number) == target:
+            return self.record(number)
+        return None
+
+    def prefix(self, key: str) -> Optional[City]:
+        """The most populous city whose key starts with key.
+
+        Returns None when more than PREFIX_SCAN_LIMIT keys match.
+        """
+        target = key.encode("ascii")
+        lo = bisect_left(self._keys, target)
+        # Keys are ASCII, so every key with this prefix sorts below prefix + 0x7f
+        hi = bisect_left(self._keys, target + b"\x7f", lo)
+        if not lo < hi <= lo + PREFIX_SCAN_LIMIT:
+            return None
+        return max((self.record(number) for number in range(lo, hi)), key=lambda c: c.population)
+
+    def fuzzy(self, key: str, min_score: float = FUZZY_MIN_SCORE) -> Optional[City]:
+        """The city whose key is most similar to key, if similar enough."""
+        postings = [
+            self._postings[self._trigrams[trigram]:self._trigrams[trigram + 1]]
+            for trigram in trigrams(key)
+        ]
+        counts: Counter = Counter()
+        for posting in sorted(filter(len, postings), key=len)[:FUZZY_TRIGRAMS]:
+            counts.update(posting)
+
+        best, best_score = None, min_score
+        for number, _ in counts.most_common(FUZZY_CANDIDATES):
+            score = SequenceMatcher(None, key, self._key(number).decode("ascii")).ratio()
+            if score > best_score or (score == best_score and best is None):
+                best, best_score = number, score
+        return self.record(best) if best is not None else None
+
+    def lookup(self, query: str) -> Optional[Match]:
+        """Resolve a user-supplied city name: alias, exact, prefix, then fuzzy."""
+        key = normalize(query)
+        if not key:
+            return None
+        target = ALIASES.get(key, key)
+        city = self.exact(target)
+        if city:
+            return Match(city, "alias" if target != key else "exact")
+        if len(target) >= MIN_PREFIX_LENGTH:
+            city = self.prefix(target)
+            if city:
+                return Match(city, "prefix")
+        city = self.fuzzy(target)
+        return Match(city, "fuzzy") if city else None
+
+
+def open_index(source: Union[str, Path] = DEFAULT_SOURCE) -> CityIndex:
+    """Open the index for a source TSV, building it first if it is missing or stale.
+
+    The index goes next to the source, or in the temp directory if that
+    isn't writable.
+    """
+    source = Path(source)
+    candidates = [
+        source.with_name(source.name + ".idx"),
+        Path(tempfile.gettempdir())
+        / f"cities-{zlib.crc32(str(source.resolve()).encode()):08x}.idx",
+    ]
+    for target in candidates:
+        if target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+            return CityIndex(target)
+    for target in candidates:
+        try:
+            build_index(source, target)
+        except OSError:
+            continue
+        return CityIndex(target)
+    raise OSError(f"Could not write a city index for {source}")
+
+
+_index: Optional[CityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> CityIndex:
+    """The shared index for WEATHER_CITIES_PATH (or the bundled dataset), opened on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = open_index(os.getenv("WEATHER_CITIES_PATH") or DEFAULT_SOURCE)
+    return _index
+
+
+def main(argv: Optional[list[str]] = None):
+    """Command line entry point to prebuild a city index."""
+    parser = argparse.ArgumentParser(description="Build the WeatherMockTool city index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Compile a city TSV into <source>.idx")
+    build.add_argument(
+        "source",
+        nargs="?",
+        default=str(DEFAULT_SOURCE),
+        help="Bundled-format TSV or a GeoNames dump such as cities500.txt",
+    )
+    args = parser.parse_args(argv)
+
+    target = Path(args.source + ".idx")
+    count = build_index(args.source, target)
+    print(f"Indexed {count} cities into {target} ({target.stat().st_size:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
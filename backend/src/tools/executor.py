@@ -0,0 +1,266 @@
+"""Isolated execution of tool calls with per-tool timeouts and memory limits.
+
+Tools declare how they run in their LangChain metadata:
+
+    CalculatorTool.metadata = {"executor": "process", "timeout": 2, "memory_limit_mb": 256}
+    WeatherMockTool.metadata = {"executor": "thread", "timeout": 5}
+
+"process" tools (CPU-bound) run in a pool of warm worker processes, one call
+per worker at a time. A worker that overruns its call's timeout, or runs out
+of its memory allowance, is killed and replaced in the background. "thread"
+tools (I/O-bound, the default) run in a thread pool; a thread can't be
+killed, so a timed-out call is abandoned and left to finish on its own.
+
+Every failure comes back as a ToolMessage with status "error" and a JSON
+body the model can read, e.g.
+
+    {"error": "timeout", "tool": "CalculatorTool", "message": "..."}
+
+Workers find tools by importing the module that defines them, so a process
+tool must be a module-level attribute named after the tool.
+"""
+
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import BaseTool
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+DEFAULT_TIMEOUT = 10.0
+# How long a call waits for a free worker before giving up
+ACQUIRE_TIMEOUT = 30.0
+
+
+def tool_error(tool_name: str, error: str, message: str, call_id: str) -> ToolMessage:
+    """A structured error result for a tool call."""
+    return ToolMessage(
+        content=json.dumps({"error": error, "tool": tool_name, "message": message}),
+        name=tool_name,
+        tool_call_id=call_id,
+        status="error",
+    )
+
+
+def _limit_memory(limit_mb: Optional[int]):
+    """Cap this process's address space at its current size plus limit_mb."""
+    if resource is None or not limit_mb:
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return
+    hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+    soft = current + limit_mb * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _unlimit_memory():
+    if resource is not None:
+        hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+        resource.setrlimit(resource.RLIMIT_AS, (hard, hard))
+
+
+def _worker_main(conn):
+    """Worker process loop: receive (module, name, args, memory_limit_mb), reply."""
+    # Import LangChain and the tool registry up front, so the first call
+    # doesn't pay for it
+    importlib.import_module("src.tools")
+    conn.send("ready")
+    while True:
+        try:
+            module, name, args, memory_limit_mb = conn.recv()
+        except EOFError:
+            return
+        try:
+            tool = getattr(importlib.import_module(module), name)
+            _limit_memory(memory_limit_mb)
+            try:
+                reply = ("ok", tool.invoke(args))
+            finally:
+                _unlimit_memory()
+        except MemoryError:
+            reply = ("memory_limit", f"exceeded its {memory_limit_mb} MB memory limit")
+        except Exception as e:
+            reply = ("exception", f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except (TypeError, ValueError) as e:
+            conn.send(("exception", f"result could not be sent back: {e}"))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ProcessPool:
+    """Warm worker processes that can be killed and replaced one at a time.
+
+    Calls block their calling thread; ToolExecutor runs them on its threads.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._workers: set[_Worker] = set()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self.replaced = 0
+
+    def start(self):
+        """Start the workers in the background, if not already started."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for _ in range(self.size):
+            self._spawn_in_background()
+
+    def _spawn_in_background(self):
+        threading.Thread(target=self._spawn, name="tool-worker-spawn", daemon=True).start()
+
+    def _spawn(self):
+        worker = _Worker(self._context)
+        try:
+            ready = worker.conn.recv() == "ready"
+        except (EOFError, OSError):
+            ready = False
+        with self._lock:
+            if not ready or self._closed:
+                worker.kill()
+                return
+            self._workers.add(worker)
+        self._idle.put(worker)
+
+    def _replace(self, worker: _Worker):
+        with self._lock:
+            self._workers.discard(worker)
+            self.replaced += 1
+        worker.kill()
+        if not self._closed:
+            self._spawn_in_background()
+
+    def call(self, tool: BaseTool, args: dict, timeout: float, memory_limit_mb: Optional[int]):
+        """Run a tool in a worker; returns ("ok", content) or (error kind, message)."""
+        self.start()
+        try:
+            worker = self._idle.get(timeout=ACQUIRE_TIMEOUT)
+        except queue.Empty:
+            return "unavailable", "no tool worker became available"
+
+        try:
+            worker.conn.send((tool.func.__module__, tool.name, args, memory_limit_mb))
+            if not worker.conn.poll(timeout):
+                self._replace(worker)
+                return "timeout", f"did not finish within {timeout:g}s and was stopped"
+            kind, payload = worker.conn.recv()
+        except (EOFError, OSError):
+            self._replace(worker)
+            return "crashed", "its worker process exited unexpectedly"
+        except BaseException:
+            self._replace(worker)
+            raise
+
+        if kind == "memory_limit":
+            # The heap may be fragmented or half-built objects leaked; start afresh
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+        return kind, payload
+
+    def shutdown(self):
+        """Kill all workers."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.kill()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": self.size, "alive": len(self._workers), "replaced": self.replaced}
+
+
+class ToolExecutor:
+    """Runs tool calls according to each tool's executor, timeout and memory limit.
+
+    With process_workers=0, process tools run on threads like the rest
+    (timeouts still apply, memory limits don't).
+    """
+
+    def __init__(self, process_workers: int = 2, thread_workers: int = 32):
+        self._threads = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="tool-call")
+        self.processes = ProcessPool(process_workers) if process_workers > 0 else None
+
+    async def run(self, tool: Optional[BaseTool], tool_call: dict) -> ToolMessage:
+        """Execute one tool call from a model response."""
+        name, call_id = tool_call["name"], tool_call["id"]
+        if tool is None:
+            return tool_error(name, "unknown_tool", f"{name} is not a valid tool", call_id)
+
+        metadata = tool.metadata or {}
+        timeout = float(metadata.get("timeout", DEFAULT_TIMEOUT))
+        loop = asyncio.get_running_loop()
+
+        if metadata.get("executor") == "process" and self.processes is not None:
+            kind, payload = await loop.run_in_executor(
+                self._threads,
+                self.processes.call,
+                tool,
+                tool_call["args"],
+                timeout,
+                metadata.get("memory_limit_mb"),
+            )
+        else:
+            kind, payload = await self._run_on_thread(tool, tool_call["args"], timeout)
+
+        if kind == "ok":
+            return ToolMessage(content=payload, name=name, tool_call_id=call_id)
+        return tool_error(name, kind, payload, call_id)
+
+    async def _run_on_thread(self, tool: BaseTool, args: dict, timeout: float) -> tuple[str, str]:
+        if tool.func is None:
+            call = tool.ainvoke(args)
+        else:
+            call = asyncio.wrap_future(self._threads.submit(tool.invoke, args))
+        try:
+            return "ok", await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            return "timeout", f"did not finish within {timeout:g}s"
+        except Exception as e:
+            return "exception", f"{type(e).__name__}: {e}"
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self.processes is not None:
+            self.processes.shutdown()
+        self._threads.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {"processes": self.processes.stats() if self.processes else None}
@@ -0,0 +1,235 @@
+"""Safe arithmetic expression engine used by CalculatorTool.
+
+Expressions are parsed with the ast module and compiled into a small stack
+program. Only numeric literals, + - * / // % ** and unary +/- are accepted,
+and every evaluation is bounded by Limits: input length, parenthesis depth,
+number of operations and the size of integer operands and results. Checks on
+** and * run before the operation, so inputs like 9**9**9**9 are rejected
+without being computed.
+
+Compiled expressions are kept in an LRU cache keyed by the expression with
+whitespace removed. Expressions are pure, so a compiled expression also
+remembers its result (or error) after the first evaluation.
+"""
+
+import ast
+import math
+import operator
+import warnings
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable, Optional, Union
+
+Number = Union[int, float]
+
+
+class ExpressionError(ValueError):
+    """The expression is malformed or uses something other than arithmetic."""
+
+
+class LimitExceeded(ExpressionError):
+    """Evaluating the expression would exceed one of the engine's Limits."""
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Resource limits applied to every expression."""
+
+    max_length: int = 1000
+    max_depth: int = 32
+    max_steps: int = 500
+    max_int_bits: int = 4096
+
+
+def _guarded_mul(a: Number, b: Number, limits: Limits) -> Number:
+    if type(a) is int and type(b) is int and a.bit_length() + b.bit_length() > limits.max_int_bits:
+        raise LimitExceeded(f"result exceeds {limits.max_int_bits} bits")
+    return a * b
+
+
+def _guarded_pow(a: Number, b: Number, limits: Limits) -> Number:
+    if type(a) is int and type(b) is int and b > 0 and abs(a) > 1:
+        # |a| ** b has about bit_length(a) * b bits
+        if (a.bit_length() - 1) * b >= limits.max_int_bits:
+            raise LimitExceeded(f"result exceeds {limits.max_int_bits} bits")
+    return a ** b
+
+
+def _plain(fn: Callable[[Number, Number], Number]):
+    return lambda a, b, limits: fn(a, b)
+
+
+_BINARY_OPS = {
+    ast.Add: _plain(operator.add),
+    ast.Sub: _plain(operator.sub),
+    ast.Mult: _guarded_mul,
+    ast.Div: _plain(operator.truediv),
+    ast.FloorDiv: _plain(operator.floordiv),
+    ast.Mod: _plain(operator.mod),
+    ast.Pow: _guarded_pow,
+}
+
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# Stack program opcodes
+_CONST, _UNARY, _BINARY = range(3)
+
+
+class CompiledExpression:
+    """A validated expression as a stack program."""
+
+    def __init__(self, program: tuple, limits: Limits):
+        self.program = program
+        self.limits = limits
+        self._outcome: Optional[Union[Number, Exception]] = None
+
+    def evaluate(self) -> Number:
+        """Run the program, remembering the result or error for next time."""
+        if self._outcome is None:
+            try:
+                self._outcome = self._run()
+            except (ArithmeticError, ExpressionError) as e:
+                self._outcome = e
+        if isinstance(self._outcome, Exception):
+            # Drop the traceback so re-raising doesn't keep growing it
+            raise self._outcome.with_traceback(None)
+        return self._outcome
+
+    def _run(self) -> Number:
+        limits = self.limits
+        max_bits = limits.max_int_bits
+        stack: list[Number] = []
+        for opcode, arg in self.program:
+            if opcode == _CONST:
+                stack.append(arg)
+                continue
+            try:
+                if opcode == _UNARY:
+                    result = arg(stack.pop())
+                else:
+                    right = stack.pop()
+                    result = arg(stack.pop(), right, limits)
+            except OverflowError:
+                raise LimitExceeded("result out of range")
+            if type(result) is int:
+                if result.bit_length() > max_bits:
+                    raise LimitExceeded(f"result exceeds {max_bits} bits")
+            elif type(result) is float:
+                if not math.isfinite(result):
+                    raise LimitExceeded("result out of range")
+            else:
+                raise ExpressionError("result is not a real number")
+            stack.append(result)
+        return stack[0]
+
+
+class ExpressionEngine:
+    """Compiles and evaluates arithmetic expressions within Limits."""
+
+    def __init__(self, limits: Limits = Limits(), cache_size: int = 1024):
+        self.limits = limits
+        self._compile_cached = lru_cache(maxsize=cache_size)(self._compile)
+
+    def compile(self, expression: str) -> CompiledExpression:
+        """Parse and validate an expression, reusing cached compilations."""
+        # Whitespace is dropped, as the eval-based tool did, so "6*7" and
+        # "6 * 7" share one entry
+        return self._compile_cached("".join(expression.split()))
+
+    def evaluate(self, expression: str) -> Number:
+        """Evaluate one expression.
+
+        Raises ExpressionError (or LimitExceeded) for rejected input and
+        ZeroDivisionError for division by zero.
+        """
+        return self.compile(expression).evaluate()
+
+    def evaluate_many(self, expressions: Iterable[str]) -> list[Union[Number, Exception]]:
+        """Evaluate many expressions in one call.
+
+        Each position holds the result or the exception that expression
+        raised, so one bad expression doesn't fail the batch.
+        """
+        results: list[Union[Number, Exception]] = []
+        for expression in expressions:
+            try:
+                results.append(self.compile(expression).evaluate())
+            except (ArithmeticError, ExpressionError) as e:
+                results.append(e)
+        return results
+
+    def cache_info(self):
+        """Hit/miss statistics of the compiled-expression cache."""
+        return self._compile_cached.cache_info()
+
+    def _compile(self, source: str) -> CompiledExpression:
+        limits = self.limits
+        if not source:
+            raise ExpressionError("empty expression")
+        if len(source) > limits.max_length:
+            raise LimitExceeded(f"expression longer than {limits.max_length} characters")
+        self._check_depth(source)
+
+        try:
+            with warnings.catch_warnings():
+                # e.g. "invalid decimal literal" for input we reject anyway
+                warnings.simplefilter("ignore", SyntaxWarning)
+                tree = ast.parse(source, mode="eval")
+        except (SyntaxError, ValueError, MemoryError, RecursionError):
+            raise ExpressionError("invalid syntax")
+
+        # Iterative post-order walk, so long operator chains can't hit the
+        # recursion limit
+        program = []
+        pending: list[tuple[ast.AST, bool]] = [(tree.body, False)]
+        while pending:
+            node, children_done = pending.pop()
+            if isinstance(node, ast.Constant):
+                if type(node.value) not in (int, float):
+                    raise ExpressionError("only numbers are allowed")
+                if type(node.value) is int and node.value.bit_length() > limits.max_int_bits:
+                    raise LimitExceeded(f"number exceeds {limits.max_int_bits} bits")
+                program.append((_CONST, node.value))
+            elif isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+                if children_done:
+                    program.append((_BINARY, _BINARY_OPS[type(node.op)]))
+                else:
+                    pending += [(node, True), (node.right, False), (node.left, False)]
+            elif isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+                if children_done:
+                    program.append((_UNARY, _UNARY_OPS[type(node.op)]))
+                else:
+                    pending += [(node, True), (node.operand, False)]
+            else:
+                raise ExpressionError(
+                    "only numbers and the operators + - * / // % ** are allowed"
+                )
+            if len(program) > limits.max_steps:
+                raise LimitExceeded(f"more than {limits.max_steps} operations")
+
+        return CompiledExpression(tuple(program), limits)
+
+    def _check_depth(self, source: str):
+        depth = 0
+        for char in source:
+            if char == "(":
+                depth += 1
+                if depth > self.limits.max_depth:
+                    raise LimitExceeded(
+                        f"parentheses nested deeper than {self.limits.max_depth}"
+                    )
+            elif char == ")":
+                depth -= 1
+
+
+default_engine = ExpressionEngine()
+
+
+def format_number(value: Number) -> Number:
+    """Show integral floats as ints and round the rest to 10 places."""
+    if isinstance(value, float):
+        return int(value) if value == int(value) else round(value, 10)
+    return value
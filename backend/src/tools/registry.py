@@ -0,0 +1,130 @@
+"""Registry of agent tools, imported on first use and selected per request.
+
+Each tool is registered as a ToolSpec: its name, the module defining it, a
+one-line summary for the system prompt, and the keywords (plus an optional
+regex) that make it relevant to a request. Specs are cheap; the module is
+only imported when get() first asks for the tool.
+
+select() binds the whole catalog while it fits within max_selected, so small
+catalogs share one stable prompt. Larger catalogs are pruned to the tools
+worth binding by matching the request's text against the keywords, so the
+model isn't sent schemas it won't use. Tools already used in the
+conversation stay selected for follow-ups.
+"""
+
+import importlib
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from langchain_core.tools import BaseTool
+
+# Most tools bound to one request
+MAX_SELECTED = 8
+
+_WORD = re.compile(r"[a-z0-9_]+")
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """What the registry knows about a tool before importing it."""
+
+    name: str
+    module: str
+    summary: str
+    keywords: frozenset[str] = field(default_factory=frozenset)
+    pattern: Optional[str] = None
+
+    def score(self, words: set[str], text: str) -> int:
+        """How strongly a request's text suggests this tool."""
+        score = len(self.keywords & words)
+        if self.pattern and re.search(self.pattern, text):
+            score += 1
+        return score
+
+
+class ToolRegistry:
+    """Tool specs in registration order, with lazily imported tools."""
+
+    def __init__(self, max_selected: int = MAX_SELECTED):
+        self.max_selected = max_selected
+        self._specs: dict[str, ToolSpec] = {}
+        self._tools: dict[str, BaseTool] = {}
+        self._lock = threading.Lock()
+
+    def register(self, spec: ToolSpec):
+        """Add a tool, replacing any earlier spec with the same name."""
+        with self._lock:
+            self._specs[spec.name] = spec
+            self._tools.pop(spec.name, None)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[ToolSpec]:
+        return iter(list(self._specs.values()))
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def get(self, name: str) -> Optional[BaseTool]:
+        """The tool with this name, importing its module on first use."""
+        tool = self._tools.get(name)
+        if tool is not None:
+            return tool
+        spec = self._specs.get(name)
+        if spec is None:
+            return None
+        tool = getattr(importlib.import_module(spec.module), spec.name)
+        with self._lock:
+            self._tools[name] = tool
+        return tool
+
+    def loaded(self) -> list[str]:
+        """Names of the tools imported so far."""
+        return list(self._tools)
+
+    def select(self, text: str, used: Iterable[str] = ()) -> list[ToolSpec]:
+        """The tools relevant to a request, in registration order.
+
+        A catalog within max_selected is returned whole: keyword matching
+        can miss a tool the request needs, and pruning only pays off when
+        it keeps schemas out of the prompt that wouldn't fit anyway. Larger
+        catalogs are pruned to the best matches, always keeping tools in
+        used (already called in the conversation).
+        """
+        if len(self) <= self.max_selected:
+            return list(self)
+        lowered = text.lower()
+        words = set(_WORD.findall(lowered))
+        used = set(used)
+        candidates = []
+        for index, spec in enumerate(self):
+            score = spec.score(words, lowered)
+            if score or spec.name in used:
+                candidates.append((spec.name in used, score, index, spec))
+        best = sorted(candidates, key=lambda c: (c[0], c[1]), reverse=True)[:self.max_selected]
+        return [spec for *_, spec in sorted(best, key=lambda c: c[2])]
+
+    def tools(self, specs: Iterable[ToolSpec]) -> list[BaseTool]:
+        """Load the tools for a selection."""
+        return [self.get(spec.name) for spec in specs]
+
+    @staticmethod
+    def system_prompt(specs: list[ToolSpec]) -> str:
+        """The agent's system prompt, listing the selected tools."""
+        if not specs:
+            return (
+                "You are a helpful assistant. No tools are needed for this request.\n"
+                "Be concise and direct in your responses."
+            )
+        listing = "\n".join(
+            f"{number}. {spec.name} - {spec.summary}" for number, spec in enumerate(specs, 1)
+        )
+        return f"""You are a helpful assistant with access to the following tools:
+
+{listing}
+
+Analyze the user's request and use the appropriate tool(s) to help them.
+Be concise and direct in your responses."""
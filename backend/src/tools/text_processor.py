@@ -1,7 +1,136 @@
-"""Text processing tool for various string operations."""
+"""Text processing tool for various string operations.
+
+Inputs can be multi-megabyte (pasted logs), so the counting operations walk
+the text in CHUNK_SIZE slices instead of splitting it whole, and the
+transforming operations make exactly one copy: the result. process_many
+applies an operation to a batch of texts, in a process pool once the batch
+is large enough to be worth shipping to other processes.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
 
 from langchain_core.tools import tool
 
+# Characters per slice when counting
+CHUNK_SIZE = 1 << 20
+
+# Total characters in a batch above which process_many uses the pool
+POOL_THRESHOLD = 8 << 20
+
+
+def iter_chunks(text: str, size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield consecutive slices of text, at most size characters each."""
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def count_words(chunks: Iterable[str]) -> int:
+    """Count whitespace-separated words across a stream of chunks.
+
+    Only one chunk's words exist at a time; a word split across a chunk
+    boundary is counted once.
+    """
+    count = 0
+    joined = False  # the previous chunk ended inside a word
+    for chunk in chunks:
+        if not chunk:
+            continue
+        count += len(chunk.split())
+        if joined and not chunk[0].isspace():
+            count -= 1
+        joined = not chunk[-1].isspace()
+    return count
+
+
+def count_chars(chunks: Iterable[str]) -> int:
+    """Count characters across a stream of chunks."""
+    return sum(len(chunk) for chunk in chunks)
+
+
+def _word_count(text: str) -> str:
+    return f"Word count: {count_words(iter_chunks(text))}"
+
+
+def _char_count(text: str) -> str:
+    # len() of a str is O(1); no need to walk it
+    return f"Character count: {len(text)}"
+
+
+# Built once; each entry makes at most one copy of its input
+OPERATIONS: dict[str, Callable[[str], str]] = {
+    "uppercase": str.upper,
+    "lowercase": str.lower,
+    "word_count": _word_count,
+    "char_count": _char_count,
+    "reverse": lambda text: text[::-1],
+    "title_case": str.title,
+}
+
+
+def apply(operation: str, text: str) -> str:
+    """Apply a named operation to text.
+
+    Raises ValueError for an unknown operation.
+    """
+    try:
+        fn = OPERATIONS[operation.lower().strip()]
+    except KeyError:
+        available = ", ".join(OPERATIONS)
+        raise ValueError(
+            f"Unknown operation '{operation.lower().strip()}'. Available operations: {available}"
+        ) from None
+    return fn(text)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Request threads can call process_many concurrently; only one may build the pool
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: the server process has threads running
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown():
+    """Stop the process_many pool's workers; the next pooled batch starts a new pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+# Don't leave spawned workers behind when the server or test run exits
+atexit.register(shutdown)
+
+
+def process_many(
+    texts: list[str], operation: str, pool_threshold: int = POOL_THRESHOLD
+) -> list[str]:
+    """Apply one operation to many texts, in order.
+
+    Batches totalling at least pool_threshold characters are spread over a
+    shared process pool; smaller ones run in-process, where pickling the
+    texts would cost more than it saves. Raises ValueError for an unknown
+    operation before any work is done.
+    """
+    apply(operation, "")
+    if len(texts) < 2 or sum(map(len, texts)) < pool_threshold:
+        return [apply(operation, text) for text in texts]
+    return list(_get_pool().map(apply, [operation] * len(texts), texts))
+
 
 @tool
 def TextProcessorTool(text: str, operation: str) -> str:
@@ -15,19 +144,17 @@ def TextProcessorTool(text: str, operation: str) -> str:
     Returns:
         The processed text or count result as a string
     """
-    operations = {
-        "uppercase": lambda t: t.upper(),
-        "lowercase": lambda t: t.lower(),
-        "word_count": lambda t: f"Word count: {len(t.split())}",
-        "char_count": lambda t: f"Character count: {len(t)}",
-        "reverse": lambda t: t[::-1],
-        "title_case": lambda t: t.title(),
-    }
-
-    operation = operation.lower().strip()
-
-    if operation not in operations:
-        available = ", ".join(operations.keys())
-        return f"Unknown operation '{operation}'. Available operations: {available}"
-
-    return operations[operation](text)
+    try:
+        return apply(operation, text)
+    except ValueError as e:
+        return str(e)
+
+
+# Pure; oversized texts are skipped by the tool cache's size limit. CPU-bound on
+# large inputs, so it runs in a worker process.
+TextProcessorTool.metadata = {
+    "cacheable": True,
+    "executor": "process",
+    "timeout": 10,
+    "memory_limit_mb": 1024,
+}
@@ -1,8 +1,14 @@
 """Mock weather tool that returns simulated weather data."""
 
 import random
+import zlib
+from functools import lru_cache
+from typing import Optional
+
 from langchain_core.tools import tool
 
+from .cities import get_index, normalize
+
 
 # Mock weather data for various cities
 WEATHER_DATA = {
@@ -22,6 +28,38 @@ WEATHER_DATA = {
     "sydney": {"temp_f": 75, "condition": "Sunny", "humidity": 55},
 }
 
+CONDITIONS = ["Sunny", "Cloudy", "Rainy", "Windy", "Clear", "Partly Cloudy"]
+
+
+def simulated_weather(key: str, latitude: Optional[float] = None) -> dict:
+    """Weather for a city without curated data, the same on every call.
+
+    Seeded by the city's key (crc32, since hash() differs between
+    processes); cities nearer the poles run colder.
+    """
+    rng = random.Random(zlib.crc32(key.encode("utf-8")))
+    if latitude is None:
+        temp_f = rng.randint(30, 90)
+    else:
+        typical = round(82 - 0.7 * abs(latitude))
+        temp_f = rng.randint(typical - 10, typical + 10)
+    return {
+        "temp_f": temp_f,
+        "condition": rng.choice(CONDITIONS),
+        "humidity": rng.randint(20, 90),
+    }
+
+
+@lru_cache(maxsize=4096)
+def _resolve(city: str) -> tuple[str, dict]:
+    """Display name and weather data for a query."""
+    match = get_index().lookup(city)
+    if match is None:
+        return city.strip().title(), simulated_weather(normalize(city))
+    found = match.city
+    data = WEATHER_DATA.get(found.key) or simulated_weather(found.key, found.latitude)
+    return found.name, data
+
 
 @tool
 def WeatherMockTool(city: str) -> str:
@@ -33,25 +71,23 @@ def WeatherMockTool(city: str) -> str:
     Returns:
         A formatted weather report string
     """
-    city_lower = city.lower().strip()
-
-    if city_lower in WEATHER_DATA:
-        data = WEATHER_DATA[city_lower]
-    else:
-        # Generate random weather for unknown cities
-        data = {
-            "temp_f": random.randint(30, 90),
-            "condition": random.choice(
-                ["Sunny", "Cloudy", "Rainy", "Windy", "Clear", "Partly Cloudy"]
-            ),
-            "humidity": random.randint(20, 90),
-        }
+    name, data = _resolve(city)
 
     temp_c = round((data["temp_f"] - 32) * 5 / 9, 1)
 
     return (
-        f"Weather in {city.title()}:\n"
+        f"Weather in {name}:\n"
         f"  Temperature: {data['temp_f']}°F ({temp_c}°C)\n"
         f"  Condition: {data['condition']}\n"
         f"  Humidity: {data['humidity']}%"
     )
+
+
+# Deterministic today, but weather changes, so results only live ten minutes.
+# A real weather API would be I/O-bound, so it runs on a thread.
+WeatherMockTool.metadata = {
+    "cacheable": True,
+    "cache_ttl": 600,
+    "executor": "thread",
+    "timeout": 5,
+}
@@ -0,0 +1,254 @@
+"""Trace spans for requests, graph runs, nodes, model calls, tools and storage.
+
+Spans nest through a context variable, so a span started inside another (in
+the same asyncio task, or one created from it) becomes its child:
+
+    with tracer.span("tool.call", tool="CalculatorTool") as span:
+        ...
+        span.set_attribute("status", "ok")
+
+Finished spans are exported in the OTLP/JSON encoding, either to an in-memory
+ring (the default, served by GET /api/traces/{trace_id}) or appended to a
+JSON Lines file, one ExportTraceServiceRequest per line, as the OpenTelemetry
+file exporter writes them. Trace context is carried as a W3C traceparent.
+"""
+
+import asyncio
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+SERVICE_NAME = "bmo-chat-backend"
+
+# OTLP span kinds and status codes
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+def _attribute_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # int64 is a string in OTLP/JSON
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_attribute_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes: dict) -> list[dict]:
+    return [{"key": key, "value": _attribute_value(value)} for key, value in attributes.items()]
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple[str, str]]:
+    """(trace_id, span_id) from a W3C traceparent header, or None if absent or malformed."""
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if match is None or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return match.group(1), match.group(2)
+
+
+@dataclass
+class Span:
+    """One timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    kind: str = "internal"
+    attributes: dict = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    status: int = STATUS_UNSET
+    status_message: str = ""
+
+    @property
+    def traceparent(self) -> str:
+        """This span as a W3C traceparent header value."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return round((self.end_ns - self.start_ns) / 1e6, 3)
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def set_error(self, message: str):
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def to_otlp(self) -> dict:
+        """The span in the OTLP/JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _attributes(self.attributes),
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def export_request(spans: list[Span], service_name: str = SERVICE_NAME) -> dict:
+    """An OTLP ExportTraceServiceRequest body holding spans."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _attributes({"service.name": service_name})},
+                "scopeSpans": [
+                    {"scope": {"name": "src.tracing"}, "spans": [s.to_otlp() for s in spans]}
+                ],
+            }
+        ]
+    }
+
+
+class InMemoryExporter:
+    """Keeps the most recent max_spans finished spans."""
+
+    def __init__(self, max_spans: int = 10_000):
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, trace_id: Optional[str] = None) -> list[Span]:
+        """Finished spans, oldest first, optionally only those of one trace."""
+        with self._lock:
+            return [s for s in self._spans if trace_id is None or s.trace_id == trace_id]
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+class FileExporter:
+    """Appends each finished span to a JSON Lines file as an OTLP export request."""
+
+    def __init__(self, path: str, service_name: str = SERVICE_NAME):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(export_request([span], self.service_name), separators=(",", ":"))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Starts spans and hands finished ones to an exporter (None disables tracing)."""
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+        self._lock = threading.Lock()
+        self.finished = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        """Build a tracer from TRACE_EXPORTER ("memory", "file" or "off") and friends."""
+        kind = os.getenv("TRACE_EXPORTER", "memory")
+        if kind == "off":
+            return cls(None)
+        if kind == "file":
+            return cls(FileExporter(os.getenv("TRACE_FILE", "traces.jsonl")))
+        return cls(InMemoryExporter(int(os.getenv("TRACE_MAX_SPANS", "10000"))))
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        """The innermost span open in this context."""
+        return _current_span.get()
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: str = "internal",
+        parent: Optional[tuple[str, str]] = None,
+        **attributes: Any,
+    ) -> Iterator[Span]:
+        """Open a span as a child of the current one (or of parent, a (trace_id, span_id)).
+
+        An exception escaping the block marks the span as an error, and a
+        cancellation as cancelled; either way it is re-raised.
+        """
+        if parent is None:
+            current = _current_span.get()
+            parent = (current.trace_id, current.span_id) if current else None
+        span = Span(
+            name=name,
+            trace_id=parent[0] if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent[1] if parent else None,
+            kind=kind,
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.set_error("cancelled")
+            raise
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if span.status == STATUS_UNSET:
+                span.status = STATUS_OK
+            self._finish(span)
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self.finished += 1
+            if span.status == STATUS_ERROR:
+                self.errors += 1
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "exporter": type(self.exporter).__name__ if self.exporter else None,
+                "spans": self.finished,
+                "errors": self.errors,
+            }
+
+
+tracer = Tracer.from_env()
@@ -0,0 +1,43 @@
+"""Misbehaving tools for executor tests; worker processes import them by module."""
+
+import time
+
+from langchain_core.tools import tool
+
+
+@tool
+def SleepTool(seconds: float) -> str:
+    """Sleep, then report how long."""
+    time.sleep(seconds)
+    return f"slept {seconds}"
+
+
+SleepTool.metadata = {"executor": "process", "timeout": 1}
+
+
+@tool
+def HogTool(megabytes: int) -> str:
+    """Allocate memory."""
+    return str(len(bytearray(megabytes * 1024 * 1024)))
+
+
+HogTool.metadata = {"executor": "process", "timeout": 5, "memory_limit_mb": 64}
+
+
+@tool
+def FailingTool(message: str) -> str:
+    """Always raises."""
+    raise RuntimeError(message)
+
+
+FailingTool.metadata = {"executor": "process"}
+
+
+@tool
+def BlockingIOTool(seconds: float) -> str:
+    """Block a thread, like a slow HTTP request."""
+    time.sleep(seconds)
+    return "done"
+
+
+BlockingIOTool.metadata = {"executor": "thread", "timeout": 0.2}
@@ -0,0 +1,86 @@
+"""Scriptable stand-in for ChatOpenAI used by graph and API tests."""
+
+import asyncio
+from typing import Optional
+
+from langchain_core.messages import AIMessage
+
+
+def _usage(tokens: int, output: int, cached: int) -> dict:
+    usage = {"input_tokens": tokens, "output_tokens": output, "total_tokens": tokens + output}
+    if cached:
+        usage["input_token_details"] = {"cache_read": cached}
+    return usage
+
+
+def tool_call_message(
+    name: str, args: dict, call_id: str = "call_1", tokens: int = 10, cached: int = 0
+) -> AIMessage:
+    """An AIMessage asking for a single tool call."""
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": name, "args": args, "id": call_id}],
+        usage_metadata=_usage(tokens, 5, cached),
+    )
+
+
+def answer_message(content: str, tokens: int = 20, cached: int = 0) -> AIMessage:
+    """An AIMessage with a final answer."""
+    return AIMessage(content=content, usage_metadata=_usage(tokens, 7, cached))
+
+
+class StubChatModel:
+    """Replays a fixed script of AIMessages, one per invoke() call.
+
+    Install with monkeypatch.setattr(graph, "ChatOpenAI", StubChatModel.factory(script)).
+    With a delay, ainvoke() sleeps first like a slow request would, and
+    records whether it was cancelled while waiting. delays, if given, sets
+    the delay of each ainvoke() call in turn (latency spikes), falling back
+    to delay once used up; a cancelled call doesn't consume the script.
+    """
+
+    def __init__(
+        self, script: list[AIMessage], delay: float = 0.0, delays: Optional[list[float]] = None
+    ):
+        self.script = list(script)
+        self.delay = delay
+        self.delays = list(delays or [])
+        self.calls: list[list] = []
+        self.bound: list[list[str]] = []
+        self.bound_schemas: list[list[dict]] = []
+        self.models: list[str] = []  # model= passed to each construction
+        self.started = asyncio.Event()
+        self.cancelled = False
+
+    @classmethod
+    def factory(
+        cls, script: list[AIMessage], delay: float = 0.0, delays: Optional[list[float]] = None
+    ):
+        """Return a ChatOpenAI-compatible constructor sharing one model."""
+        model = cls(script, delay, delays)
+
+        def constructor(*args, **kwargs):
+            model.models.append(kwargs.get("model"))
+            return model
+
+        constructor.model = model
+        return constructor
+
+    def bind_tools(self, tools, **kwargs):
+        self.bound.append([tool["function"]["name"] for tool in tools])
+        self.bound_schemas.append(list(tools))
+        return self
+
+    def invoke(self, messages, *args, **kwargs) -> AIMessage:
+        self.calls.append(list(messages))
+        return self.script.pop(0)
+
+    async def ainvoke(self, messages, *args, **kwargs) -> AIMessage:
+        self.started.set()
+        delay = self.delays.pop(0) if self.delays else self.delay
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.invoke(messages)
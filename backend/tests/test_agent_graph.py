@@ -0,0 +1,259 @@
+"""Tests for the LangGraph agent, using a scripted stand-in for the LLM."""
+
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.agent import graph
+from src.tools.cache import ToolResultCache
+from tests.stub_model import StubChatModel, tool_call_message, answer_message
+
+
+def run_graph(task: str, config_extra: dict | None = None) -> dict:
+    """Run the agent to completion and return its final state."""
+    agent = graph.create_agent()
+    config = {"configurable": {"thread_id": "test", **(config_extra or {})}}
+    initial_state = {
+        "messages": [HumanMessage(content=task)],
+        "execution_steps": [],
+        "tools_used": [],
+        "final_output": None,
+        "usage": {},
+    }
+
+    async def run():
+        final = {}
+        async for event in agent.astream(initial_state, config, stream_mode="values"):
+            final = event
+        return final
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def calculator_script(monkeypatch):
+    """Script: one CalculatorTool call, then an answer."""
+    monkeypatch.setattr(
+        graph,
+        "ChatOpenAI",
+        StubChatModel.factory(
+            [
+                tool_call_message("CalculatorTool", {"expression": "2 + 2"}),
+                answer_message("2 + 2 = 4"),
+            ]
+        ),
+    )
+
+
+@pytest.fixture(autouse=True)
+def tool_cache(monkeypatch):
+    """Give each test an empty tool result cache."""
+    cache = ToolResultCache()
+    monkeypatch.setattr(graph, "tool_cache", cache)
+    return cache
+
+
+class TestAgentGraph:
+    """Tests for the agent graph."""
+
+    def test_tool_round_trip(self, calculator_script):
+        state = run_graph("What is 2 + 2?")
+
+        assert state["final_output"] == "2 + 2 = 4"
+        assert state["tools_used"] == ["CalculatorTool"]
+        descriptions = [step["description"] for step in state["execution_steps"]]
+        assert any("Tool result from CalculatorTool" in d for d in descriptions)
+
+    def test_usage_accounting(self, calculator_script):
+        state = run_graph("What is 2 + 2?")
+        usage = state["usage"]
+
+        assert usage["llm_calls"] == 2
+        assert usage["prompt_tokens"] == 30
+        assert usage["completion_tokens"] == 12
+        assert usage["cached_tokens"] == 0
+        assert usage["llm_ms"] >= 0
+        assert usage["tool_ms"] >= 0
+        assert "queue_ms" not in usage
+
+    def test_queue_time_recorded_once(self, calculator_script):
+        import time
+
+        state = run_graph("What is 2 + 2?", {"submitted_at": time.time() - 0.5})
+        assert state["usage"]["queue_ms"] >= 500
+        assert state["usage"]["queue_ms"] < 5000
+
+    def test_repeated_tool_call_served_from_cache(self, monkeypatch, tool_cache):
+        weather = tool_call_message("WeatherMockTool", {"city": "Paris"}, call_id="w")
+        both = AIMessage(
+            content="",
+            tool_calls=[
+                {"name": "CalculatorTool", "args": {"expression": "6 * 7"}, "id": "c"},
+                {"name": "WeatherMockTool", "args": {"city": "Paris"}, "id": "w2"},
+            ],
+        )
+        monkeypatch.setattr(
+            graph,
+            "ChatOpenAI",
+            StubChatModel.factory([weather, answer_message("Overcast"), both, answer_message("42")]),
+        )
+
+        first = run_graph("Weather in Paris?")
+        second = run_graph("6 * 7 and the weather in Paris?")
+
+        assert "tool_cache_hits" not in first["usage"]
+        assert second["usage"]["tool_cache_hits"] == 1
+        results = [
+            step["description"]
+            for step in second["execution_steps"]
+            if step["description"].startswith("Tool result")
+        ]
+        assert results[0].startswith("Tool result from CalculatorTool: ")
+        assert results[1].startswith("Tool result from WeatherMockTool (cached): Weather in Paris")
+        tool_messages = [m for m in second["messages"] if m.type == "tool"]
+        assert [m.tool_call_id for m in tool_messages[-2:]] == ["c", "w2"]
+        assert tool_cache.stats()["hits"] == 1
+
+    def test_tool_timeout_reported_to_model(self, monkeypatch, tool_cache):
+        from src.metrics import metrics
+        from src.tools import ToolRegistry, ToolSpec
+
+        registry = ToolRegistry()
+        registry.register(
+            ToolSpec("BlockingIOTool", "tests.slow_tools", "Blocks", frozenset({"slow"}))
+        )
+        monkeypatch.setattr(graph, "tool_registry", registry)
+        model = StubChatModel.factory(
+            [tool_call_message("BlockingIOTool", {"seconds": 2}), answer_message("Too slow")]
+        )
+        monkeypatch.setattr(graph, "ChatOpenAI", model)
+        before = metrics.snapshot()["counters"].get("tool_calls.errors.timeout", 0)
+
+        state = run_graph("Do something slow")
+
+        error = next(m for m in state["messages"] if m.type == "tool")
+        assert error.status == "error"
+        assert json.loads(error.content)["error"] == "timeout"
+        assert state["final_output"] == "Too slow"
+        assert metrics.snapshot()["counters"]["tool_calls.errors.timeout"] == before + 1
+        assert tool_cache.stats()["entries"] == 0
+
+    def test_small_catalog_binds_every_tool(self, calculator_script):
+        state = run_graph("What is 2 + 2?")
+
+        model = graph.ChatOpenAI.model
+        every_tool = [spec.name for spec in graph.tool_registry]
+        assert model.bound == [every_tool]
+        assert state["final_output"] == "2 + 2 = 4"
+
+    def test_binds_only_selected_tools(self, calculator_script, monkeypatch):
+        monkeypatch.setattr(graph.tool_registry, "max_selected", 2)
+        state = run_graph("What is 2 + 2?")
+
+        model = graph.ChatOpenAI.model
+        # Bound once; the second step reuses the bound model
+        assert model.bound == [["CalculatorTool"]]
+        system_prompt = model.calls[0][0].content
+        assert "CalculatorTool" in system_prompt
+        assert "WeatherMockTool" not in system_prompt
+        assert state["final_output"] == "2 + 2 = 4"
+
+    def test_prompt_prefix_reused_across_runs(self, monkeypatch):
+        from src.metrics import metrics
+
+        model = StubChatModel.factory(
+            [
+                tool_call_message("CalculatorTool", {"expression": "2 + 2"}, tokens=1500),
+                answer_message("2 + 2 = 4", tokens=1510, cached=1024),
+                tool_call_message("CalculatorTool", {"expression": "3 * 3"}, tokens=1500, cached=1024),
+                answer_message("3 * 3 = 9", tokens=1510, cached=1024),
+            ]
+        ).model
+        monkeypatch.setattr(graph, "ChatOpenAI", lambda *args, **kwargs: model)
+        agent = graph.create_agent()
+
+        async def run(task: str, thread_id: str) -> dict:
+            state = {}
+            initial = {
+                "messages": [HumanMessage(content=task)],
+                "execution_steps": [],
+                "tools_used": [],
+                "final_output": None,
+                "usage": {},
+            }
+            config = {"configurable": {"thread_id": thread_id}}
+            async for state in agent.astream(initial, config, stream_mode="values"):
+                pass
+            return state
+
+        first = asyncio.run(run("What is 2 + 2?", "a"))
+        second = asyncio.run(run("Calculate 3 * 3", "b"))
+
+        # Every call starts with the very same system message and tool definitions
+        assert len({id(call[0]) for call in model.calls}) == 1
+        assert len(model.bound_schemas) == 1
+        assert first["usage"]["cached_tokens"] == 1024
+        assert second["usage"]["cached_tokens"] == 2048
+        stats = metrics.snapshot()["prompt_cache"]
+        assert stats == {
+            "selections": 1,
+            "bound_models": 1,
+            "prompt_tokens": 6020,
+            "cached_tokens": 3072,
+            "hit_rate": 0.5103,
+        }
+
+    def test_slow_llm_call_is_hedged(self, monkeypatch):
+        from src.agent.hedging import Hedger
+
+        hedger = Hedger(min_samples=1, min_delay=0.05, budget=1.0)
+        monkeypatch.setattr(graph, "llm_hedger", hedger)
+        # The first call answers instantly; the second spikes and is overtaken by its hedge
+        model = StubChatModel.factory(
+            [answer_message("Hello"), answer_message("Hello again")], delays=[0, 5.0, 0]
+        )
+        monkeypatch.setattr(graph, "ChatOpenAI", model)
+
+        first = run_graph("Hi")
+        second = run_graph("Hi again")
+
+        assert first["final_output"] == "Hello"
+        assert second["final_output"] == "Hello again"
+        assert second["usage"]["llm_ms"] < 5000
+        assert model.model.cancelled
+        assert hedger.stats()["hedge_wins"] == 1
+
+    def test_invalid_response_escalates_to_stronger_model(self, monkeypatch):
+        from src.agent.routing import ModelRouter
+
+        router = ModelRouter(["small", "large"])
+        monkeypatch.setattr(graph, "model_router", router)
+        model = StubChatModel.factory(
+            [
+                tool_call_message("CalculatorTool", {}),
+                tool_call_message("CalculatorTool", {"expression": "2 + 2"}),
+                answer_message("2 + 2 = 4"),
+            ]
+        )
+        monkeypatch.setattr(graph, "ChatOpenAI", model)
+
+        state = run_graph("What is 2 + 2?")
+
+        assert state["final_output"] == "2 + 2 = 4"
+        # The third call reuses the small model built for the first
+        assert model.model.models == ["small", "large"]
+        assert state["usage"]["llm_calls"] == 3
+        assert state["usage"]["llm_escalations"] == 1
+        descriptions = [step["description"] for step in state["execution_steps"]]
+        assert descriptions[1] == "Routed to small (simple: short single-tool request)"
+        assert descriptions[2] == (
+            "small response failed validation (CalculatorTool call missing expression); "
+            "escalating to large"
+        )
+        assert descriptions[3].startswith("large responded in ")
+        assert [step["step_number"] for step in state["execution_steps"]] == list(
+            range(1, len(descriptions) + 1)
+        )
+        assert router.stats()["per_model"]["small"]["calls"] == 2
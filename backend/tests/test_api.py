@@ -0,0 +1,611 @@
+"""Tests for the HTTP API."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from src.agent import graph
+from src.api import routes
+from src.api.runs import RunRegistry
+from src.persistence import TaskStorage, CachedTaskStorage, RetentionPolicy, RetentionSweeper
+from tests.stub_model import StubChatModel, answer_message
+from tests.test_persistence import create_sample_task
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """Point the routes at a temporary cached storage."""
+    temp = CachedTaskStorage(TaskStorage(str(tmp_path / "tasks.db")))
+    monkeypatch.setattr(routes, "storage", temp)
+    yield temp
+    temp.close()
+
+
+@pytest.fixture
+def client(storage):
+    """Create a test client for the app."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class TestHistoryEndpoints:
+    """Tests for the task history endpoints."""
+
+    def test_list_tasks(self, client, storage):
+        for i in range(3):
+            storage.save_task(create_sample_task(input_text=f"task {i}"))
+
+        response = client.get("/api/tasks", params={"limit": 2})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        tasks = response.json()
+        assert len(tasks) == 2
+        assert tasks[0]["execution_steps"][0]["description"] == "Test step"
+
+    def test_get_task(self, client, storage):
+        task_id = storage.save_task(create_sample_task())
+
+        response = client.get(f"/api/tasks/{task_id}")
+
+        assert response.status_code == 200
+        assert response.json()["id"] == task_id
+
+    def test_get_missing_task(self, client):
+        assert client.get("/api/tasks/9999").status_code == 404
+
+    def test_get_tasks_by_thread(self, client, storage):
+        storage.save_task(create_sample_task(thread_id="thread-1"))
+        storage.save_task(create_sample_task(thread_id="thread-2"))
+
+        tasks = client.get("/api/tasks/thread/thread-1").json()
+
+        assert [task["thread_id"] for task in tasks] == ["thread-1"]
+
+    def test_delete_task(self, client, storage):
+        task_id = storage.save_task(create_sample_task())
+
+        assert client.delete(f"/api/tasks/{task_id}").status_code == 200
+        assert client.get(f"/api/tasks/{task_id}").status_code == 404
+
+    def test_list_tasks_with_fields_and_total(self, client, storage):
+        for i in range(3):
+            storage.save_task(create_sample_task(input_text=f"task {i}"))
+
+        response = client.get(
+            "/api/tasks",
+            params={"limit": 2, "fields": "id,input_text,created_at", "include_total": "true"},
+        )
+
+        assert response.headers["x-total-count"] == "3"
+        tasks = response.json()
+        assert len(tasks) == 2
+        assert set(tasks[0]) == {"id", "input_text", "created_at"}
+
+    def test_unknown_fields_rejected(self, client):
+        response = client.get("/api/tasks", params={"fields": "id,secret"})
+
+        assert response.status_code == 400
+        assert "secret" in response.json()["detail"]
+
+    def test_stats(self, client, storage):
+        storage.save_task(create_sample_task())
+        assert client.get("/api/stats").json()["totals"]["task_count"] == 1
+
+
+class TestArchivedTasks:
+    """Tests for reading tasks the retention sweeper moved to the archive."""
+
+    @pytest.fixture
+    def sweeper(self, storage, monkeypatch):
+        sweeper = RetentionSweeper(
+            storage.storage, RetentionPolicy(max_tasks_per_thread=1), batch_pause=0
+        )
+        monkeypatch.setattr(routes, "sweepers", [sweeper])
+        return sweeper
+
+    def test_get_archived_task(self, client, storage, sweeper):
+        archived_id = storage.save_task(create_sample_task(input_text="old"))
+        storage.save_task(create_sample_task(input_text="new"))
+
+        assert sweeper.sweep().archived_tasks == 1
+        response = client.get(f"/api/tasks/{archived_id}")
+
+        assert response.status_code == 200
+        assert response.json()["input_text"] == "old"
+        assert client.get("/api/tasks/9999").status_code == 404
+
+    def test_thread_includes_archived_tasks(self, client, storage, sweeper):
+        for i in range(3):
+            record = create_sample_task(input_text=f"task {i}", thread_id="thread-1")
+            record.created_at = f"2024-01-0{i + 1}T00:00:00"
+            storage.save_task(record)
+
+        assert sweeper.sweep().archived_tasks == 2
+        tasks = client.get("/api/tasks/thread/thread-1", params={"fields": "id,input_text"}).json()
+
+        assert [task["input_text"] for task in tasks] == ["task 2", "task 1", "task 0"]
+        assert set(tasks[-1]) == {"id", "input_text"}
+
+    def test_storage_reports_policy(self, client, sweeper, monkeypatch):
+        monkeypatch.setattr(routes, "retention_policy", sweeper.policy)
+
+        retention = client.get("/api/storage").json()["retention"]
+
+        assert retention["policy"]["max_tasks_per_thread"] == 1
+
+
+class TestConditionalRequests:
+    """Tests for ETags on the read endpoints."""
+
+    @pytest.mark.parametrize(
+        "path", ["/api/tasks", "/api/tasks/thread/test-thread", "/api/stats", "/api/tasks/top"]
+    )
+    def test_not_modified_until_a_write(self, client, storage, path):
+        storage.save_task(create_sample_task())
+        first = client.get(path)
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+
+        cached = client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+        storage.save_task(create_sample_task())
+        changed = client.get(path, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+
+    def test_single_task(self, client, storage):
+        task_id = storage.save_task(create_sample_task())
+        etag = client.get(f"/api/tasks/{task_id}").headers["etag"]
+
+        assert client.get(f"/api/tasks/{task_id}", headers={"If-None-Match": etag}).status_code == 304
+        storage.delete_task(task_id)
+        assert client.get(f"/api/tasks/{task_id}", headers={"If-None-Match": etag}).status_code == 404
+
+    def test_large_bodies_compressed(self, client, storage):
+        for i in range(20):
+            storage.save_task(create_sample_task(input_text=f"task {i}"))
+
+        response = client.get("/api/tasks", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()) == 20
+
+    def test_event_streams_not_compressed(self, client, monkeypatch):
+        monkeypatch.setattr(
+            graph, "ChatOpenAI", StubChatModel.factory([answer_message("x" * 4096)])
+        )
+
+        response = client.post(
+            "/api/tasks/stream", json={"task": "Hi"}, headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert "content-encoding" not in response.headers
+        assert "x" * 4096 in response.text
+
+
+class TestTaskSubmission:
+    """Tests for submitting tasks, with a scripted LLM."""
+
+    @pytest.fixture(autouse=True)
+    def script(self, monkeypatch):
+        from src.agent import graph
+        from tests.stub_model import StubChatModel, tool_call_message, answer_message
+
+        monkeypatch.setattr(
+            graph,
+            "ChatOpenAI",
+            StubChatModel.factory(
+                [
+                    tool_call_message("WeatherMockTool", {"city": "Paris"}),
+                    answer_message("It is overcast in Paris."),
+                ]
+            ),
+        )
+
+    def test_create_task_records_metrics(self, client, storage):
+        response = client.post("/api/tasks", json={"task": "Weather in Paris?"})
+
+        assert response.status_code == 200
+        task = response.json()
+        assert task["output_text"] == "It is overcast in Paris."
+        assert task["llm_calls"] == 2
+        assert task["prompt_tokens"] == 30
+        assert task["cached_tokens"] == 0
+        assert task["total_ms"] >= task["llm_ms"]
+
+        stored = client.get(f"/api/tasks/{task['id']}").json()
+        assert stored["completion_tokens"] == 12
+
+    def test_top_tasks(self, client, storage):
+        client.post("/api/tasks", json={"task": "Weather in Paris?"})
+
+        top = client.get("/api/tasks/top", params={"by": "total_tokens"}).json()
+        assert top[0]["prompt_tokens"] == 30
+        assert client.get("/api/tasks/top", params={"by": "bogus"}).status_code == 400
+
+    def test_metrics_count_tool_cache_hits(self, client, storage, monkeypatch):
+        from tests.stub_model import tool_call_message
+
+        weather = tool_call_message("WeatherMockTool", {"city": "Paris"})
+        answer = answer_message("It is overcast in Paris.")
+        monkeypatch.setattr(
+            graph, "ChatOpenAI", StubChatModel.factory([weather, answer, weather, answer])
+        )
+        graph.tool_cache.clear()
+        before = client.get("/api/metrics").json()
+
+        client.post("/api/tasks", json={"task": "Weather in Paris?"})
+        task = client.post("/api/tasks", json={"task": "Weather in Paris again?"}).json()
+
+        after = client.get("/api/metrics").json()
+        assert any("(cached)" in step["description"] for step in task["execution_steps"])
+        for counter, delta in (("tool_calls.cached", 1), ("tool_calls.executed", 1)):
+            assert after["counters"][counter] - before["counters"].get(counter, 0) == delta
+        assert after["tool_cache"]["hits"] == before["tool_cache"]["hits"] + 1
+
+
+class TestStreaming:
+    """Tests for SSE streaming and resuming runs."""
+
+    @pytest.fixture(autouse=True)
+    def script(self, monkeypatch):
+        from src.agent import graph
+        from tests.stub_model import StubChatModel, tool_call_message, answer_message
+
+        monkeypatch.setattr(
+            graph,
+            "ChatOpenAI",
+            StubChatModel.factory(
+                [
+                    tool_call_message("CalculatorTool", {"expression": "6 * 7"}),
+                    answer_message("6 * 7 = 42"),
+                ]
+            ),
+        )
+
+    @staticmethod
+    def read_events(response) -> list[tuple[int, dict]]:
+        import json
+
+        events = []
+        for message in response.text.split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in message.splitlines() if ": " in line)
+            if "data" in lines:
+                events.append((int(lines["id"]), json.loads(lines["data"])))
+        return events
+
+    def test_stream_events_carry_ids(self, client, storage):
+        response = client.post("/api/tasks/stream", json={"task": "6 * 7?"})
+
+        events = self.read_events(response)
+        assert [event_id for event_id, _ in events] == list(range(1, len(events) + 1))
+        types = [event["event_type"] for _, event in events]
+        assert types[0] == "run_started"
+        assert types[-1] == "complete"
+        assert "final_output" in types
+        assert events[0][1]["data"]["run_id"] == response.headers["x-run-id"]
+
+        task_id = events[-1][1]["data"]["task_id"]
+        assert storage.get_task(task_id).output_text == "6 * 7 = 42"
+
+    def test_resume_with_last_event_id(self, client):
+        response = client.post("/api/tasks/stream", json={"task": "6 * 7?"})
+        run_id = response.headers["x-run-id"]
+        events = self.read_events(response)
+
+        resumed = client.get(f"/api/tasks/stream/{run_id}", headers={"Last-Event-ID": "2"})
+
+        assert resumed.status_code == 200
+        assert self.read_events(resumed) == events[2:]
+
+    def test_resume_unknown_run(self, client):
+        assert client.get("/api/tasks/stream/nope").status_code == 404
+
+    def test_cancel_finished_run(self, client):
+        run_id = client.post("/api/tasks/stream", json={"task": "6 * 7?"}).headers["x-run-id"]
+
+        assert client.delete(f"/api/runs/{run_id}").status_code == 409
+        assert client.delete("/api/runs/nope").status_code == 404
+
+
+class TestTracing:
+    """Tests for request traces and their propagation into events."""
+
+    @pytest.fixture(autouse=True)
+    def script(self, monkeypatch):
+        from src.tools.cache import ToolResultCache
+        from tests.stub_model import tool_call_message
+
+        # An empty tool cache, so the tool call really runs
+        monkeypatch.setattr(graph, "tool_cache", ToolResultCache())
+        monkeypatch.setattr(
+            graph,
+            "ChatOpenAI",
+            StubChatModel.factory(
+                [
+                    tool_call_message("WeatherMockTool", {"city": "Paris"}),
+                    answer_message("It is overcast in Paris."),
+                ]
+            ),
+        )
+
+    @staticmethod
+    def span_tree(body: dict) -> dict[str, str]:
+        """Map each span name to its parent's name."""
+        spans = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        names = {span["spanId"]: span["name"] for span in spans}
+        return {span["name"]: names.get(span.get("parentSpanId")) for span in spans}
+
+    def test_task_trace(self, client, storage):
+        response = client.post("/api/tasks", json={"task": "Weather in Paris?"})
+        trace_id = response.headers["x-trace-id"]
+
+        body = client.get(f"/api/traces/{trace_id}").json()
+
+        assert self.span_tree(body) == {
+            "POST /api/tasks": None,
+            "agent.run": "POST /api/tasks",
+            "agent_node": "agent.run",
+            "llm.call": "agent_node",
+            "tool_node": "agent.run",
+            "tool.call": "tool_node",
+            "final_node": "agent.run",
+            "storage.save_task": "agent.run",
+        }
+
+    def test_incoming_traceparent_continues_trace(self, client, storage):
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        response = client.post(
+            "/api/tasks",
+            json={"task": "Weather in Paris?"},
+            headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+        )
+
+        assert response.headers["x-trace-id"] == trace_id
+        spans = client.get(f"/api/traces/{trace_id}").json()["resourceSpans"][0]
+        request_span = spans["scopeSpans"][0]["spans"][-1]
+        assert request_span["parentSpanId"] == "00f067aa0ba902b7"
+
+    def test_stream_events_carry_trace_context(self, client, storage):
+        response = client.post("/api/tasks/stream", json={"task": "Weather in Paris?"})
+
+        events = [event for _, event in TestStreaming.read_events(response)]
+        trace_id = response.headers["x-trace-id"]
+        assert events[0]["data"]["trace_id"] == trace_id
+        assert all(event["traceparent"].split("-")[1] == trace_id for event in events)
+        # Steps are published from inside the run's span, not the request's
+        assert events[1]["traceparent"] != events[0]["traceparent"]
+
+    def test_unknown_trace(self, client):
+        assert client.get("/api/traces/" + "f" * 32).status_code == 404
+
+
+class TestCancellation:
+    """Tests for cancelling runs while the model request is in flight."""
+
+    @pytest.fixture
+    def slow_model(self, monkeypatch):
+        constructor = StubChatModel.factory([answer_message("Too late")], delay=30)
+        monkeypatch.setattr(graph, "ChatOpenAI", constructor)
+        return constructor.model
+
+    @pytest.fixture
+    def runs(self, monkeypatch):
+        registry = RunRegistry(disconnect_grace=0)
+        monkeypatch.setattr(routes, "runs", registry)
+        return registry
+
+    def start_run(self, runs):
+        return runs.start(
+            "thread-1", lambda run: routes._execute_run(run, "Hi", "thread-1", time.time())
+        )
+
+    @pytest.mark.asyncio
+    async def test_cancel_frees_run_within_milliseconds(self, storage, slow_model, runs):
+        run = self.start_run(runs)
+        await asyncio.wait_for(slow_model.started.wait(), 1)
+
+        start = time.perf_counter()
+        assert run.cancel()
+        await asyncio.wait({run.task})
+
+        assert time.perf_counter() - start < 0.05
+        assert slow_model.cancelled
+        assert run.done
+        assert run.events[-1].event_type == "cancelled"
+        task = storage.get_task(run.events[-1].data["task_id"])
+        assert task.status == "cancelled"
+        assert task.execution_steps[-1].description == "Run cancelled"
+
+    @pytest.mark.asyncio
+    async def test_disconnect_cancels_run(self, storage, slow_model, runs):
+        run = self.start_run(runs)
+        stream = runs.subscribe(run)
+        await stream.__anext__()
+        await asyncio.wait_for(slow_model.started.wait(), 1)
+
+        # What Starlette does when the client goes away mid-stream
+        await stream.aclose()
+        await asyncio.wait_for(asyncio.wait({run.task}), 0.05)
+
+        assert slow_model.cancelled
+        assert run.events[-1].event_type == "cancelled"
+
+    @pytest.mark.asyncio
+    async def test_sse_response_notices_disconnect_without_writing(
+        self, storage, slow_model, runs
+    ):
+        client_gone = asyncio.Event()
+
+        class Request:
+            async def receive(self):
+                await client_gone.wait()
+                return {"type": "http.disconnect"}
+
+        run = self.start_run(runs)
+        stream = routes._until_client_leaves(Request(), runs.subscribe(run))
+        await stream.__anext__()
+        await asyncio.wait_for(slow_model.started.wait(), 1)
+        pending = asyncio.ensure_future(stream.__anext__())
+
+        client_gone.set()
+        await asyncio.wait_for(asyncio.wait({run.task}), 0.05)
+
+        assert slow_model.cancelled
+        with pytest.raises(StopAsyncIteration):
+            await pending
+
+    @pytest.mark.asyncio
+    async def test_reattach_within_grace_keeps_run(self, storage, slow_model):
+        runs = RunRegistry(disconnect_grace=0.05)
+        run = self.start_run(runs)
+        first = runs.subscribe(run)
+        await first.__anext__()
+        await first.aclose()
+
+        # The resumed connection waits for the next event
+        second = asyncio.create_task(runs.subscribe(run, last_event_id=1).__anext__())
+        await asyncio.sleep(0.1)
+
+        assert not run.task.done()
+        assert run.subscribers == 1
+        run.cancel()
+        assert "cancelled" in await second
+
+    @pytest.mark.asyncio
+    async def test_non_streaming_task_cancelled_on_disconnect(self, storage, slow_model):
+        class DisconnectedRequest:
+            async def is_disconnected(self):
+                return True
+
+        work = routes._run_agent("Hi", "thread-1", time.time())
+
+        assert await routes._until_disconnected(DisconnectedRequest(), work) is None
+        assert slow_model.cancelled
+        assert storage.get_all_tasks()[0].status == "cancelled"
+
+
+class TestWebSocket:
+    """Tests for multiplexing runs over one WebSocket."""
+
+    @pytest.fixture(autouse=True)
+    def script(self, monkeypatch):
+        monkeypatch.setattr(
+            graph,
+            "ChatOpenAI",
+            StubChatModel.factory([answer_message("First"), answer_message("Second")]),
+        )
+
+    @staticmethod
+    def receive_until_done(ws, run_ids: set) -> list:
+        """Receive event frames until every run in run_ids has ended."""
+        frames = []
+        pending = set(run_ids)
+        while pending:
+            frame = ws.receive_json()
+            frames.append(frame)
+            run_id, event_type = (
+                (frame[0], frame[2]) if isinstance(frame, list) else (frame["run_id"], frame["event_type"])
+            )
+            if event_type in ("complete", "cancelled", "error"):
+                pending.discard(run_id)
+        return frames
+
+    def test_submit_multiple_runs_on_one_socket(self, client, storage):
+        with client.websocket_connect("/api/ws") as ws:
+            ws.send_json({"op": "submit", "task": "one", "ref": "a"})
+            ws.send_json({"op": "submit", "task": "two", "ref": "b"})
+            submitted = {}
+            frames = []
+            while len(submitted) < 2:
+                frame = ws.receive_json()
+                if frame["op"] == "submitted":
+                    submitted[frame["ref"]] = frame["run_id"]
+                else:
+                    frames.append(frame)
+
+            frames += self.receive_until_done(ws, set(submitted.values()))
+
+        for run_id in submitted.values():
+            events = [frame for frame in frames if frame["run_id"] == run_id]
+            assert [event["id"] for event in events] == list(range(1, len(events) + 1))
+            assert events[0]["event_type"] == "run_started"
+            assert events[-1]["event_type"] == "complete"
+        assert len(storage.get_all_tasks()) == 2
+
+    def test_compact_framing(self, client):
+        with client.websocket_connect("/api/ws?framing=compact") as ws:
+            ws.send_json({"op": "submit", "task": "one"})
+            run_id = ws.receive_json()["run_id"]
+            frames = self.receive_until_done(ws, {run_id})
+
+        assert frames[0][:3] == [run_id, 1, "run_started"]
+        assert frames[-1][2] == "complete"
+
+    def test_per_run_credit(self, client):
+        with client.websocket_connect("/api/ws?credit=1") as ws:
+            ws.send_json({"op": "submit", "task": "one"})
+            run_id = ws.receive_json()["run_id"]
+            assert ws.receive_json()["id"] == 1
+
+            # The run finishes, but nothing more is sent without credit
+            run = routes.runs.get(run_id)
+            deadline = time.monotonic() + 2
+            while not run.done and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert run.done
+
+            ws.send_json({"op": "credit", "run_id": run_id, "n": 100})
+            frames = self.receive_until_done(ws, {run_id})
+
+        assert frames[0]["id"] == 2
+        assert frames[-1]["id"] == len(run.events)
+
+    def test_resubscribe_after_last_event_id(self, client):
+        with client.websocket_connect("/api/ws") as ws:
+            ws.send_json({"op": "submit", "task": "one"})
+            run_id = ws.receive_json()["run_id"]
+            frames = self.receive_until_done(ws, {run_id})
+
+            ws.send_json({"op": "subscribe", "run_id": run_id, "last_event_id": 2})
+            assert self.receive_until_done(ws, {run_id}) == frames[2:]
+
+    def test_cancel(self, client, storage, monkeypatch):
+        monkeypatch.setattr(
+            graph, "ChatOpenAI", StubChatModel.factory([answer_message("Too late")], delay=30)
+        )
+        with client.websocket_connect("/api/ws") as ws:
+            ws.send_json({"op": "submit", "task": "one"})
+            run_id = ws.receive_json()["run_id"]
+            assert ws.receive_json()["event_type"] == "run_started"
+
+            ws.send_json({"op": "cancel", "run_id": run_id})
+            frames = self.receive_until_done(ws, {run_id})
+
+        assert frames[-1]["event_type"] == "cancelled"
+        assert storage.get_task(frames[-1]["data"]["task_id"]).status == "cancelled"
+
+    def test_errors_keep_socket_open(self, client):
+        with client.websocket_connect("/api/ws") as ws:
+            ws.send_json({"op": "subscribe", "run_id": "nope", "ref": "x"})
+            assert ws.receive_json() == {"op": "error", "ref": "x", "error": "Run not found"}
+
+            ws.send_json({"op": "bogus"})
+            assert ws.receive_json()["error"] == "Unknown op: bogus"
+
+            ws.send_text("not json")
+            assert ws.receive_json()["op"] == "error"
+
+    def test_rejects_unknown_framing(self, client):
+        from starlette.websockets import WebSocketDisconnect
+
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/api/ws?framing=xml") as ws:
+                ws.receive_json()
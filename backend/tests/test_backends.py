@@ -0,0 +1,201 @@
+"""Contract tests shared by every storage backend, plus sharding specifics."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.persistence import (
+    TaskStorage,
+    InMemoryTaskStorage,
+    ShardedTaskStorage,
+    create_storage,
+)
+from src.persistence.records import validate_fields
+from tests.test_persistence import create_sample_task
+
+
+@pytest.fixture(params=["memory", "sqlite", "sharded"])
+def backend(request, tmp_path):
+    """Create each storage backend on a temporary path."""
+    storage = create_storage(request.param, str(tmp_path / "tasks.db"), shard_count=3)
+    yield storage
+    storage.close()
+
+
+def save_at(storage, minutes_ago: int, thread_id: str) -> int:
+    record = create_sample_task(input_text=f"{minutes_ago} minutes ago", thread_id=thread_id)
+    record.created_at = (datetime.now() - timedelta(minutes=minutes_ago)).isoformat()
+    return storage.save_task(record)
+
+
+class TestBackendContract:
+    """Behaviour every backend must share."""
+
+    def test_save_get_delete(self, backend):
+        task_id = backend.save_task(create_sample_task())
+
+        assert backend.get_task(task_id).input_text == "test input"
+        assert json.loads(backend.get_task_json(task_id))["id"] == task_id
+        assert backend.delete_task(task_id) is True
+        assert backend.get_task(task_id) is None
+        assert backend.delete_task(task_id) is False
+
+    def test_content_version_changes_on_every_write(self, backend):
+        versions = [backend.content_version()]
+        task_id = backend.save_task(create_sample_task())
+        versions.append(backend.content_version())
+        assert backend.content_version() == versions[-1]
+
+        backend.delete_task(task_id)
+        versions.append(backend.content_version())
+        backend.save_task(create_sample_task())
+        backend.clear_all()
+        versions.append(backend.content_version())
+
+        assert len(set(versions)) == len(versions)
+
+    def test_field_projection(self, backend):
+        save_at(backend, 1, thread_id="thread-1")
+        save_at(backend, 0, thread_id="thread-1")
+        full = json.loads(backend.get_all_tasks_json())
+        fields = validate_fields(["execution_steps", "id", "total_ms", "input_text"])
+
+        projected = json.loads(backend.get_all_tasks_json(fields=fields))
+        by_thread = json.loads(backend.get_tasks_by_thread_json("thread-1", fields))
+
+        expected = [{field: task[field] for field in fields} for task in full]
+        assert projected == expected
+        assert by_thread == expected
+        assert list(projected[0]) == ["id", "input_text", "execution_steps", "total_ms"]
+
+    def test_count_tasks(self, backend):
+        assert backend.count_tasks() == 0
+        task_ids = [save_at(backend, m, thread_id=f"thread-{m}") for m in range(5)]
+        backend.delete_task(task_ids[0])
+        assert backend.count_tasks() == 4
+        backend.clear_all()
+        assert backend.count_tasks() == 0
+
+    def test_global_ordering_and_pagination(self, backend):
+        for minutes_ago in range(10):
+            save_at(backend, minutes_ago, thread_id=f"thread-{minutes_ago % 4}")
+
+        first = backend.get_all_tasks(limit=4)
+        second = backend.get_all_tasks(limit=4, offset=4)
+        assert [t.input_text for t in first + second] == [
+            f"{m} minutes ago" for m in range(8)
+        ]
+        assert [t["input_text"] for t in json.loads(backend.get_all_tasks_json(limit=3, offset=2))] == [
+            f"{m} minutes ago" for m in range(2, 5)
+        ]
+
+    def test_equal_timestamps_page_by_id(self, backend):
+        ids = []
+        for i in range(9):
+            record = create_sample_task(thread_id=f"thread-{i % 3}")
+            record.created_at = "2024-01-01T00:00:00"
+            ids.append(backend.save_task(record))
+
+        pages = [backend.get_all_tasks(limit=2, offset=offset) for offset in range(0, 9, 2)]
+        json_pages = [
+            json.loads(backend.get_all_tasks_json(limit=2, offset=offset, fields=("id",)))
+            for offset in range(0, 9, 2)
+        ]
+
+        expected = sorted(ids, reverse=True)
+        assert [t.id for page in pages for t in page] == expected
+        assert [t["id"] for page in json_pages for t in page] == expected
+
+    def test_get_tasks_by_thread(self, backend):
+        for minutes_ago in range(6):
+            save_at(backend, minutes_ago, thread_id=f"thread-{minutes_ago % 2}")
+
+        tasks = backend.get_tasks_by_thread("thread-1")
+        assert [t.input_text for t in tasks] == ["1 minutes ago", "3 minutes ago", "5 minutes ago"]
+        assert len(json.loads(backend.get_tasks_by_thread_json("thread-1"))) == 3
+
+    def test_stats(self, backend):
+        for i in range(6):
+            backend.save_task(create_sample_task(thread_id=f"thread-{i % 3}"))
+
+        stats = backend.get_stats(top_threads=2)
+        assert stats["totals"]["task_count"] == 6
+        assert stats["tools"] == [{"tool": "TextProcessorTool", "use_count": 6}]
+        assert len(stats["top_threads"]) == 2
+        assert sum(row["task_count"] for row in stats["hourly"]) == 6
+
+    def test_top_tasks(self, backend):
+        for i, total_ms in enumerate([120.0, 950.5, 40.0, 300.0]):
+            record = create_sample_task(thread_id=f"thread-{i}")
+            record.total_ms = total_ms
+            record.prompt_tokens = i * 100
+            backend.save_task(record)
+
+        assert [t.total_ms for t in backend.get_top_tasks("total_ms", limit=2)] == [950.5, 300.0]
+        assert backend.get_top_tasks("total_tokens", limit=1)[0].prompt_tokens == 300
+        assert json.loads(backend.get_task_json(backend.get_top_tasks()[0].id))["total_ms"] == 950.5
+        with pytest.raises(ValueError):
+            backend.get_top_tasks("bogus")
+
+    def test_clear_all(self, backend):
+        backend.save_task(create_sample_task())
+        backend.clear_all()
+        assert backend.get_all_tasks() == []
+
+
+class TestShardedTaskStorage:
+    """Tests specific to ShardedTaskStorage."""
+
+    def test_ids_identify_their_shard(self, tmp_path):
+        storage = ShardedTaskStorage.from_base_path(str(tmp_path / "tasks.db"), 3)
+        ids = [storage.save_task(create_sample_task(thread_id=f"t{i}")) for i in range(20)]
+
+        assert len(set(ids)) == 20
+        for task_id in ids:
+            shard = storage.shard_for_task(task_id)
+            assert shard.get_task(task_id) is not None
+        storage.close()
+
+    def test_threads_stay_on_one_shard(self, tmp_path):
+        storage = ShardedTaskStorage.from_base_path(str(tmp_path / "tasks.db"), 4)
+        for _ in range(5):
+            storage.save_task(create_sample_task(thread_id="thread-1"))
+
+        populated = [s for s in storage.shards if s.get_all_tasks()]
+        assert populated == [storage.shard_for_thread("thread-1")]
+        assert (tmp_path / "tasks.0.db").exists()
+        storage.close()
+
+    def test_strided_ids_survive_reopen(self, tmp_path):
+        path = str(tmp_path / "tasks.1.db")
+        first = TaskStorage(path, id_stride=4, id_offset=1)
+        ids = [first.save_task(create_sample_task()) for _ in range(3)]
+        reopened = TaskStorage(path, id_stride=4, id_offset=1)
+        ids.append(reopened.save_task(create_sample_task()))
+
+        assert ids == [1, 5, 9, 13]
+
+    def test_deleted_ids_are_not_reissued(self, tmp_path):
+        storage = ShardedTaskStorage.from_base_path(str(tmp_path / "tasks.db"), 2)
+        ids = [storage.save_task(create_sample_task(thread_id="thread-1")) for _ in range(2)]
+        assert storage.delete_task(ids[-1])
+
+        next_id = storage.save_task(create_sample_task(thread_id="thread-1"))
+
+        assert next_id not in ids
+        assert next_id > ids[-1]
+        storage.close()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_storage("postgres")
+
+
+def test_memory_backend_copies_records():
+    storage = InMemoryTaskStorage()
+    record = create_sample_task()
+    task_id = storage.save_task(record)
+    assert record.id is None
+    assert storage.get_task(task_id).id == task_id
@@ -0,0 +1,123 @@
+"""Tests for the read-through task cache."""
+
+import pytest
+
+from src.persistence import TaskStorage, CachedTaskStorage
+from src.persistence.cache import LRUCache
+from tests.test_persistence import create_sample_task
+
+
+@pytest.fixture
+def cached_storage(tmp_path):
+    """Create a cached temporary storage for testing."""
+    storage = CachedTaskStorage(TaskStorage(str(tmp_path / "tasks.db")), max_entries=8)
+    yield storage
+    storage.close()
+
+
+class TestLRUCache:
+    """Tests for LRUCache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_stats(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", "value")
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        assert stats["hit_ratio"] == 0.5
+        assert stats["approx_bytes"] > 0
+
+
+class TestCachedTaskStorage:
+    """Tests for CachedTaskStorage."""
+
+    def test_repeated_reads_hit_cache(self, cached_storage):
+        task_id = cached_storage.save_task(create_sample_task())
+
+        first = cached_storage.get_task(task_id)
+        second = cached_storage.get_task(task_id)
+
+        assert first is second
+        assert cached_storage.get_cache_stats()["hits"] == 1
+
+    def test_save_invalidates_lists(self, cached_storage):
+        cached_storage.save_task(create_sample_task(thread_id="thread-1"))
+        assert len(cached_storage.get_all_tasks()) == 1
+        assert len(cached_storage.get_tasks_by_thread("thread-1")) == 1
+
+        cached_storage.save_task(create_sample_task(thread_id="thread-1"))
+
+        assert len(cached_storage.get_all_tasks()) == 2
+        assert len(cached_storage.get_tasks_by_thread("thread-1")) == 2
+
+    def test_delete_and_clear_invalidate(self, cached_storage):
+        task_id = cached_storage.save_task(create_sample_task())
+        assert cached_storage.get_task(task_id) is not None
+
+        cached_storage.delete_task(task_id)
+        assert cached_storage.get_task(task_id) is None
+
+        cached_storage.save_task(create_sample_task())
+        assert len(cached_storage.get_all_tasks()) == 1
+        cached_storage.clear_all()
+        assert cached_storage.get_all_tasks() == []
+
+    def test_detects_writes_from_other_connections(self, cached_storage):
+        assert cached_storage.get_all_tasks() == []
+
+        # A second storage on the same file stands in for another worker
+        other_worker = TaskStorage(str(cached_storage.db_path))
+        other_worker.save_task(create_sample_task())
+
+        assert len(cached_storage.get_all_tasks()) == 1
+
+    def test_content_version_tracks_external_writes(self, cached_storage):
+        before = cached_storage.content_version()
+        assert cached_storage.content_version() == before
+
+        # Bypasses the Python API entirely, like a manual cleanup would
+        other_worker = TaskStorage(str(cached_storage.db_path))
+        with other_worker._get_connection() as conn:
+            conn.execute(
+                "INSERT INTO tasks (input_text, output_text, tools_used, execution_steps, "
+                "created_at, thread_id) VALUES ('x', 'y', '[]', '[]', '2024-01-01', 't')"
+            )
+
+        assert cached_storage.content_version() != before
+
+    def test_value_loaded_across_a_write_is_not_cached(self, cached_storage):
+        def load_then_write():
+            value = cached_storage.storage.get_all_tasks()
+            cached_storage.save_task(create_sample_task())
+            return value
+
+        assert cached_storage._read_through(("all", 100, 0), load_then_write) == []
+        assert len(cached_storage.get_all_tasks()) == 1
+
+    def test_counters_bypass_cache(self, cached_storage):
+        cached_storage.save_task(create_sample_task())
+
+        assert cached_storage.count_tasks() == 1
+        assert cached_storage.content_version() == cached_storage.content_version()
+        stats = cached_storage.get_cache_stats()
+        assert stats["hits"] == stats["misses"] == stats["entries"] == 0
+
+    def test_deep_pages_bypass_cache(self, cached_storage):
+        cached_storage.get_all_tasks(limit=10, offset=1000)
+        assert cached_storage.get_cache_stats()["entries"] == 0
+
+    def test_passes_through_other_methods(self, cached_storage):
+        cached_storage.save_task(create_sample_task())
+        assert cached_storage.get_stats()["totals"]["task_count"] == 1
@@ -0,0 +1,95 @@
+"""Tests for the WeatherMockTool city index."""
+
+import os
+
+import pytest
+
+from src.tools.cities import CityIndex, build_index, normalize, open_index
+
+ROWS = [
+    ("Springfield", "US", 39.80, -89.64, 114394),
+    ("Springfield", "US", 42.10, -72.59, 155929),
+    ("Portland", "US", 45.52, -122.68, 654741),
+    ("Portsmouth", "GB", 50.80, -1.09, 238800),
+    ("Port Louis", "MU", -20.16, 57.50, 149194),
+    ("San Francisco", "US", 37.77, -122.42, 881549),
+    ("New York", "US", 40.71, -74.01, 8336817),
+    ("Zürich", "CH", 47.38, 8.54, 415367),
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "cities.tsv"
+    lines = ["# name\tcountry\tlatitude\tlongitude\tpopulation"]
+    lines += ["\t".join(map(str, row)) for row in ROWS]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def index(source):
+    return open_index(source)
+
+
+class TestCityIndex:
+    """Tests for building and querying CityIndex."""
+
+    def test_normalize(self):
+        assert normalize("  São   Paulo ") == "sao paulo"
+        assert normalize("St. Louis") == "st louis"
+
+    def test_exact_prefers_most_populous(self, index):
+        assert len(index) == len(ROWS)
+        assert index.exact("springfield").population == 155929
+        assert index.exact("springfiel") is None
+
+    def test_prefix(self, index):
+        assert index.prefix("portl").name == "Portland"
+        # Three keys start with "port"; the most populous wins
+        assert index.prefix("port").name == "Portland"
+        assert index.prefix("zzz") is None
+
+    @pytest.mark.parametrize(
+        "query, name, how",
+        [
+            ("Zurich", "Zürich", "exact"),
+            ("NYC", "New York", "alias"),
+            ("San Fran", "San Francisco", "alias"),
+            ("Portsm", "Portsmouth", "prefix"),
+            ("Sprngfield", "Springfield", "fuzzy"),
+            ("San Fransisco", "San Francisco", "fuzzy"),
+        ],
+    )
+    def test_lookup(self, index, query, name, how):
+        match = index.lookup(query)
+        assert (match.city.name, match.how) == (name, how)
+
+    def test_lookup_miss(self, index):
+        assert index.lookup("Atlantis") is None
+        assert index.lookup("!!") is None
+
+    def test_geonames_source(self, tmp_path):
+        path = tmp_path / "cities500.txt"
+        cols = ["5391959", "San Francisco", "San Francisco", "SF,Frisco", "37.77493",
+                "-122.41942", "P", "PPLA2", "US", "", "CA", "075", "", "", "864816",
+                "16", "28", "America/Los_Angeles", "2022-01-01"]
+        path.write_text("\t".join(cols) + "\n", encoding="utf-8")
+
+        build_index(path, tmp_path / "cities.idx")
+        city = CityIndex(tmp_path / "cities.idx").exact("san francisco")
+        assert (city.country, city.population) == ("US", 864816)
+
+    def test_index_rebuilt_when_source_changes(self, source, index):
+        assert index.exact("atlantis") is None
+
+        with open(source, "a", encoding="utf-8") as f:
+            f.write("Atlantis\tXX\t0\t0\t1\n")
+        mtime = os.stat(source).st_mtime + 10
+        os.utime(source, (mtime, mtime))
+
+        assert open_index(source).exact("atlantis").country == "XX"
+
+    def test_rejects_other_files(self, source):
+        with pytest.raises(ValueError):
+            CityIndex(source)
@@ -0,0 +1,112 @@
+"""Tests for response compression."""
+
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.api.compression import CompressionMiddleware, choose_encoding
+
+BIG = {"items": ["value"] * 500}
+
+
+async def big_json(request):
+    return JSONResponse(BIG)
+
+
+async def small_json(request):
+    return JSONResponse({"ok": True})
+
+
+async def streamed_text(request):
+    async def chunks():
+        for i in range(100):
+            yield f"line {i}\n"
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+async def events(request):
+    async def chunks():
+        yield "data: " + "x" * 2048 + "\n\n"
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+async def pre_encoded(request):
+    return PlainTextResponse("x" * 2048, headers={"Content-Encoding": "identity"})
+
+
+@pytest.fixture
+def client():
+    app = Starlette(
+        routes=[
+            Route("/big", big_json),
+            Route("/small", small_json),
+            Route("/streamed", streamed_text),
+            Route("/events", events),
+            Route("/pre-encoded", pre_encoded),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return TestClient(app)
+
+
+class TestChooseEncoding:
+    """Tests for Accept-Encoding negotiation."""
+
+    def test_prefers_server_order_on_ties(self):
+        assert choose_encoding("gzip, br", ("br", "gzip")) == "br"
+
+    def test_respects_q_values(self):
+        assert choose_encoding("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+        assert choose_encoding("gzip;q=0", ("gzip",)) is None
+        assert choose_encoding("*", ("gzip",)) == "gzip"
+        assert choose_encoding("", ("gzip",)) is None
+
+
+class TestCompressionMiddleware:
+    """Tests for CompressionMiddleware."""
+
+    def test_compresses_large_json(self, client):
+        response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(str(BIG))
+        assert response.json() == BIG
+
+    def test_small_bodies_pass_through(self, client):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_no_compression_without_accept_encoding(self, client):
+        response = client.get("/big", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+    def test_compresses_streams_incrementally(self, client):
+        response = client.get("/streamed", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text.splitlines()[-1] == "line 99"
+
+    def test_event_streams_pass_through(self, client):
+        response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert "vary" not in response.headers
+
+    def test_already_encoded_pass_through(self, client):
+        response = client.get("/pre-encoded", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "identity"
+
+    def test_gzip_output_is_standard(self, client):
+        with client.stream("GET", "/big", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert gzip.decompress(raw) == JSONResponse(BIG).body
@@ -0,0 +1,83 @@
+"""Tests for isolated tool execution."""
+
+import asyncio
+import json
+import sys
+import time
+
+import pytest
+
+from src.tools import CalculatorTool
+from src.tools.executor import ToolExecutor
+from tests.slow_tools import BlockingIOTool, FailingTool, HogTool, SleepTool
+
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = ToolExecutor(process_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+def run(executor, tool, args, call_id="call_1"):
+    return asyncio.run(
+        executor.run(tool, {"name": getattr(tool, "name", "Nope"), "args": args, "id": call_id})
+    )
+
+
+def error_of(message) -> dict:
+    assert message.status == "error"
+    return json.loads(message.content)
+
+
+class TestToolExecutor:
+    """Tests for ToolExecutor."""
+
+    def test_process_tool(self, executor):
+        message = run(executor, CalculatorTool, {"expression": "6 * 7"}, "c1")
+        assert message.content == "6 * 7 = 42"
+        assert (message.name, message.tool_call_id, message.status) == (
+            "CalculatorTool",
+            "c1",
+            "success",
+        )
+
+    def test_timeout_kills_and_replaces_worker(self, executor):
+        replaced = executor.processes.stats()["replaced"]
+
+        start = time.perf_counter()
+        error = error_of(run(executor, SleepTool, {"seconds": 30}))
+        assert time.perf_counter() - start < 5
+        assert error == {
+            "error": "timeout",
+            "tool": "SleepTool",
+            "message": "did not finish within 1s and was stopped",
+        }
+
+        assert executor.processes.stats()["replaced"] == replaced + 1
+        assert run(executor, SleepTool, {"seconds": 0}).content == "slept 0.0"
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="uses /proc and RLIMIT_AS")
+    def test_memory_limit(self, executor):
+        assert run(executor, HogTool, {"megabytes": 8}).content == str(8 * 1024 * 1024)
+        assert error_of(run(executor, HogTool, {"megabytes": 512}))["error"] == "memory_limit"
+        assert run(executor, HogTool, {"megabytes": 8}).status == "success"
+
+    def test_exception(self, executor):
+        error = error_of(run(executor, FailingTool, {"message": "boom"}))
+        assert error["error"] == "exception"
+        assert error["message"] == "RuntimeError: boom"
+
+    def test_thread_tool_timeout(self, executor):
+        assert error_of(run(executor, BlockingIOTool, {"seconds": 1}))["error"] == "timeout"
+        assert run(executor, BlockingIOTool, {"seconds": 0}).content == "done"
+
+    def test_unknown_tool(self, executor):
+        assert error_of(run(executor, None, {}))["error"] == "unknown_tool"
+
+    def test_without_process_workers(self):
+        executor = ToolExecutor(process_workers=0)
+        try:
+            assert run(executor, CalculatorTool, {"expression": "1 + 1"}).content == "1 + 1 = 2"
+        finally:
+            executor.shutdown()
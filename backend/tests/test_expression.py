@@ -0,0 +1,79 @@
+"""Tests for the calculator's expression engine."""
+
+import time
+
+import pytest
+
+from src.tools.expression import (
+    ExpressionEngine,
+    ExpressionError,
+    LimitExceeded,
+    Limits,
+)
+
+
+@pytest.fixture
+def engine():
+    return ExpressionEngine()
+
+
+class TestExpressionEngine:
+    """Tests for ExpressionEngine."""
+
+    @pytest.mark.parametrize(
+        "expression",
+        ["3 + 5", "10 - 3 * 2", "15 / 4", "7 // 2", "-7 % 3", "2 ** 10", "2 ** -1",
+         "-(3 + 4) * +2", "1.5e3 / 3", "(((1 + 2) * 3) - 4) ** 2", "2 ** 3 ** 2"],
+    )
+    def test_matches_python_arithmetic(self, engine, expression):
+        assert engine.evaluate(expression) == eval(expression)
+
+    @pytest.mark.parametrize(
+        "expression",
+        ["abc + def", "__import__('os')", "(1).real", "[1, 2]", "'a' * 3", "True + 1",
+         "abs(-1)", "2 << 3", "1 +", "1j * 2"],
+    )
+    def test_rejects_anything_but_arithmetic(self, engine, expression):
+        with pytest.raises(ExpressionError):
+            engine.evaluate(expression)
+
+    @pytest.mark.parametrize(
+        "expression",
+        ["9**9**9**9", "(2**4000) * (2**4000)", "10.0 ** 400", "1e308 * 10",
+         "(" * 40 + "1" + ")" * 40, "+".join(["1"] * 600), "1" * 2000],
+    )
+    def test_limits_are_enforced_quickly(self, engine, expression):
+        start = time.perf_counter()
+        with pytest.raises(LimitExceeded):
+            engine.evaluate(expression)
+        assert time.perf_counter() - start < 0.1
+
+    def test_custom_limits(self):
+        engine = ExpressionEngine(Limits(max_int_bits=64))
+        assert engine.evaluate("2 ** 63") == 2**63
+        with pytest.raises(LimitExceeded):
+            engine.evaluate("2 ** 64")
+
+    def test_complex_results_rejected(self, engine):
+        with pytest.raises(ExpressionError, match="real number"):
+            engine.evaluate("(-8) ** 0.5")
+
+    def test_division_by_zero(self, engine):
+        for _ in range(2):
+            with pytest.raises(ZeroDivisionError):
+                engine.evaluate("1 / (2 - 2)")
+
+    def test_compiled_expressions_cached_ignoring_whitespace(self, engine):
+        engine.evaluate("6 * 7")
+        engine.evaluate(" 6*7 ")
+
+        info = engine.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_evaluate_many(self, engine):
+        results = engine.evaluate_many(["1 + 1", "1 / 0", "x", "2 ** 8"])
+
+        assert results[0] == 2
+        assert isinstance(results[1], ZeroDivisionError)
+        assert isinstance(results[2], ExpressionError)
+        assert results[3] == 256
@@ -0,0 +1,144 @@
+"""Tests for hedged LLM requests."""
+
+import asyncio
+
+import pytest
+
+from src.agent.hedging import Hedger
+
+
+class Upstream:
+    """A fake upstream whose calls take the given delays in turn (then 0s)."""
+
+    def __init__(self, delays: list[float], failures: tuple[int, ...] = ()):
+        self.delays = list(delays)
+        self.failures = failures
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self) -> str:
+        number = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delays[number] if number < len(self.delays) else 0)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if number in self.failures:
+            raise RuntimeError(f"attempt {number} failed")
+        return f"attempt {number}"
+
+
+def warmed(**kwargs) -> Hedger:
+    """A hedger with one fast call recorded, so it hedges after min_delay."""
+    hedger = Hedger(min_samples=1, min_delay=0.05, budget=1.0, **kwargs)
+    asyncio.run(hedger.call(Upstream([0])))
+    return hedger
+
+
+class TestHedger:
+    """Tests for Hedger."""
+
+    def test_disabled_never_hedges(self):
+        hedger = Hedger(percentile=None, min_samples=1)
+        upstream = Upstream([0, 0.1])
+
+        async def run():
+            return [await hedger.call(upstream), await hedger.call(upstream)]
+
+        assert asyncio.run(run()) == ["attempt 0", "attempt 1"]
+        assert upstream.started == 2
+        assert hedger.stats()["hedged"] == 0
+        assert hedger.stats()["calls"] == 2
+
+    def test_no_hedge_before_min_samples(self):
+        hedger = Hedger(min_samples=5, budget=1.0)
+        upstream = Upstream([0.1])
+
+        assert asyncio.run(hedger.call(upstream)) == "attempt 0"
+        assert upstream.started == 1
+        assert hedger.delay() is None
+
+    def test_slow_call_is_hedged_and_loser_cancelled(self):
+        hedger = warmed()
+        upstream = Upstream([5.0, 0.0])
+
+        assert asyncio.run(hedger.call(upstream)) == "attempt 1"
+        assert upstream.cancelled == 1
+        stats = hedger.stats()
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+        assert stats["hedge_rate"] == 0.5
+        assert stats["win_rate"] == 1.0
+
+    def test_fast_call_is_not_hedged(self):
+        hedger = warmed()
+        upstream = Upstream([0.0])
+
+        assert asyncio.run(hedger.call(upstream)) == "attempt 0"
+        assert upstream.started == 1
+
+    def test_primary_can_still_win(self):
+        hedger = warmed()
+        upstream = Upstream([0.1, 5.0])
+
+        assert asyncio.run(hedger.call(upstream)) == "attempt 0"
+        assert upstream.cancelled == 1
+        assert hedger.stats()["hedged"] == 1
+        assert hedger.stats()["hedge_wins"] == 0
+
+    def test_budget_caps_hedges(self):
+        # p1 stays at the first, instant call, so every slow call wants a hedge
+        hedger = Hedger(percentile=1, min_samples=1, min_delay=0.01, budget=0.5, burst=1.0)
+        upstream = Upstream([0] + [0.05] * 8)
+
+        async def run():
+            for _ in range(5):
+                await hedger.call(upstream)
+
+        asyncio.run(run())
+
+        # Half a hedge of credit per call: at most 2 hedges over 4 slow calls
+        stats = hedger.stats()
+        assert stats["hedged"] == 2
+        assert stats["budget_exhausted"] == 2
+
+    def test_failed_attempt_falls_back_to_the_other(self):
+        hedger = warmed()
+        upstream = Upstream([0.2, 0.0], failures=(1,))
+
+        assert asyncio.run(hedger.call(upstream)) == "attempt 0"
+
+    def test_both_failing_raises_first_error(self):
+        hedger = warmed()
+        upstream = Upstream([0.2, 0.0], failures=(0, 1))
+
+        with pytest.raises(RuntimeError, match="attempt 0 failed"):
+            asyncio.run(hedger.call(upstream))
+
+    def test_cancelling_caller_cancels_both_attempts(self):
+        hedger = warmed()
+        upstream = Upstream([5.0, 5.0])
+
+        async def run():
+            call = asyncio.ensure_future(hedger.call(upstream))
+            await asyncio.sleep(0.1)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+
+        asyncio.run(run())
+
+        assert upstream.started == 2
+        assert upstream.cancelled == 2
+
+    def test_delay_tracks_percentile(self):
+        hedger = Hedger(percentile=50, min_samples=3, min_delay=0.0)
+
+        async def run():
+            for delay in (0.01, 0.02, 0.2):
+                await hedger.call(Upstream([delay]))
+
+        asyncio.run(run())
+
+        assert 0.02 <= hedger.delay() < 0.2
@@ -145,3 +145,52 @@ class TestTaskStorage:
         assert "tools_used" in task_dict
         assert "execution_steps" in task_dict
         assert isinstance(task_dict["execution_steps"], list)
+
+    def test_status_persisted(self, temp_storage):
+        """Test run status round-trips and defaults to completed."""
+        cancelled = create_sample_task()
+        cancelled.status = "cancelled"
+
+        assert temp_storage.get_task(temp_storage.save_task(cancelled)).status == "cancelled"
+        assert temp_storage.get_task(temp_storage.save_task(create_sample_task())).status == "completed"
+
+    def test_pre_serialized_json_matches_response_model(self, temp_storage):
+        """Test stored response bodies match TaskResponse serialization."""
+        import json
+        from src.api.models import TaskResponse
+
+        task_id = temp_storage.save_task(create_sample_task(input_text="héllo \"quoted\""))
+        record = temp_storage.get_task(task_id)
+        expected = TaskResponse(**record.to_dict()).model_dump()
+
+        assert json.loads(temp_storage.get_task_json(task_id)) == expected
+        assert json.loads(temp_storage.get_all_tasks_json()) == [expected]
+        assert json.loads(temp_storage.get_tasks_by_thread_json("test-thread")) == [expected]
+        assert temp_storage.get_task_json(9999) is None
+
+    def test_projection_rejects_unknown_fields(self, temp_storage):
+        """Test projections can't name anything but response fields."""
+        with pytest.raises(ValueError, match="Unknown field"):
+            temp_storage.get_all_tasks_json(fields=("id", "1); DROP TABLE tasks; --"))
+
+    def test_counts_tasks_in_databases_from_before_the_counter(self, temp_storage):
+        """Test the task counter is backfilled on upgrade."""
+        for _ in range(3):
+            temp_storage.save_task(create_sample_task())
+        with temp_storage._get_connection() as conn:
+            for event in ("insert", "update", "delete"):
+                conn.execute(f"DROP TRIGGER tasks_version_{event}")
+            conn.execute("ALTER TABLE storage_version DROP COLUMN task_count")
+
+        assert TaskStorage(str(temp_storage.db_path)).count_tasks() == 3
+
+    def test_backfills_response_json_for_legacy_rows(self, temp_storage):
+        """Test databases created before response_json get it backfilled."""
+        import json
+
+        task_id = temp_storage.save_task(create_sample_task())
+        with temp_storage._get_connection() as conn:
+            conn.execute("ALTER TABLE tasks DROP COLUMN response_json")
+
+        reopened = TaskStorage(str(temp_storage.db_path))
+        assert json.loads(reopened.get_task_json(task_id))["id"] == task_id
@@ -0,0 +1,78 @@
+"""Tests for the per-selection prompt prefix cache."""
+
+from unittest.mock import patch
+
+from src.agent import prompts
+from src.agent.prompts import PromptCache
+from src.tools import registry
+
+
+class TestPromptCache:
+    """Tests for PromptCache."""
+
+    def test_same_selection_same_prefix(self):
+        cache = PromptCache(registry)
+        specs = registry.select("What is 2 + 2 in Paris?")
+
+        first_system, first_schemas = cache.get(specs)
+        second_system, second_schemas = cache.get(list(specs))
+
+        assert first_system is second_system
+        assert first_schemas is second_schemas
+        assert [s["function"]["name"] for s in first_schemas] == [spec.name for spec in specs]
+        assert first_system.content == registry.system_prompt(specs)
+
+    def test_schemas_converted_once_per_tool(self):
+        cache = PromptCache(registry)
+        calculator = [spec for spec in registry if spec.name == "CalculatorTool"]
+
+        with patch.object(
+            prompts, "convert_to_openai_tool", wraps=prompts.convert_to_openai_tool
+        ) as convert:
+            cache.get(calculator)
+            cache.get(list(registry))
+            cache.get(list(registry))
+
+        assert convert.call_count == len(registry)
+        assert cache.stats()["selections"] == 2
+
+    def test_empty_selection(self):
+        system, schemas = PromptCache(registry).get([])
+
+        assert schemas == []
+        assert "No tools are needed" in system.content
+
+    def test_bound_model_built_once_per_model_and_selection(self):
+        cache = PromptCache(registry)
+        built = []
+
+        class ChatModel:
+            def __init__(self, model, temperature):
+                built.append(model)
+                self.tools = None
+
+            def bind_tools(self, tools):
+                self.tools = tools
+                return self
+
+        calculator = [spec for spec in registry if spec.name == "CalculatorTool"]
+        first = cache.model(ChatModel, "small", calculator)
+
+        assert cache.model(ChatModel, "small", list(calculator)) is first
+        assert first.tools is cache.get(calculator)[1]
+        assert cache.model(ChatModel, "large", calculator) is not first
+        assert cache.model(ChatModel, "small", []).tools is None
+        assert built == ["small", "large", "small"]
+        assert cache.stats()["bound_models"] == 3
+
+    def test_hit_rate(self):
+        cache = PromptCache(registry)
+        assert cache.stats()["hit_rate"] == 0.0
+
+        cache.record(2000, 0)
+        cache.record(2000, 1536)
+
+        stats = cache.stats()
+        assert stats["prompt_tokens"] == 4000
+        assert stats["cached_tokens"] == 1536
+        assert stats["hit_rate"] == 0.384
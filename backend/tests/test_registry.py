@@ -0,0 +1,84 @@
+"""Tests for the tool registry."""
+
+import sys
+
+import pytest
+
+from src.tools import ToolRegistry, ToolSpec, registry
+
+
+@pytest.fixture
+def catalog():
+    catalog = ToolRegistry(max_selected=2)
+    catalog.register(ToolSpec("SleepTool", "tests.slow_tools", "Sleeps", frozenset({"sleep", "wait"})))
+    catalog.register(ToolSpec("FailingTool", "tests.slow_tools", "Fails", frozenset({"fail"})))
+    catalog.register(
+        ToolSpec("HogTool", "tests.slow_tools", "Hogs memory", frozenset({"memory"}), r"\d+\s*mb")
+    )
+    return catalog
+
+
+@pytest.fixture
+def pruned():
+    """The built-in tools in a registry small enough that selection prunes them."""
+    pruned = ToolRegistry(max_selected=2)
+    for spec in registry:
+        pruned.register(spec)
+    return pruned
+
+
+class TestToolRegistry:
+    """Tests for ToolRegistry."""
+
+    def test_tools_load_on_first_use(self, catalog, monkeypatch):
+        monkeypatch.delitem(sys.modules, "tests.slow_tools", raising=False)
+        assert catalog.loaded() == []
+        assert "tests.slow_tools" not in sys.modules
+
+        tool = catalog.get("SleepTool")
+
+        assert tool.name == "SleepTool"
+        assert "tests.slow_tools" in sys.modules
+        assert catalog.loaded() == ["SleepTool"]
+        assert catalog.get("Missing") is None
+
+    def test_select_by_keyword_and_pattern(self, catalog):
+        assert [s.name for s in catalog.select("Please wait a moment")] == ["SleepTool"]
+        assert [s.name for s in catalog.select("Grab 512 MB")] == ["HogTool"]
+
+    def test_select_keeps_used_tools_and_limit(self, catalog):
+        selected = catalog.select("sleep, then use 5 mb of memory", used=["FailingTool"])
+        # FailingTool was used earlier; HogTool outscores SleepTool for the second slot
+        assert [s.name for s in selected] == ["FailingTool", "HogTool"]
+
+    def test_select_nothing_matched(self, catalog):
+        assert catalog.select("hello") == []
+
+    def test_small_catalog_is_never_pruned(self):
+        # Keyword matching would miss the weather tool here
+        selected = registry.select("How warm is Tokyo? Also reverse 'abc'")
+        assert [s.name for s in selected] == [s.name for s in registry]
+
+        small = ToolRegistry(max_selected=8)
+        small.register(ToolSpec("SleepTool", "tests.slow_tools", "Sleeps"))
+        assert [s.name for s in small.select("hello")] == ["SleepTool"]
+
+    def test_system_prompt_lists_selection(self, pruned):
+        selected = pruned.select("What is 12 * 4?")
+        prompt = ToolRegistry.system_prompt(selected)
+
+        assert "1. CalculatorTool - For mathematical calculations" in prompt
+        assert "WeatherMockTool" not in prompt
+        assert "No tools" in ToolRegistry.system_prompt([])
+
+    @pytest.mark.parametrize(
+        "request_text, expected",
+        [
+            ("What is 2+2?", ["CalculatorTool"]),
+            ("What's the weather in Tokyo?", ["WeatherMockTool"]),
+            ("Reverse the text 'hello'", ["TextProcessorTool"]),
+            ("Count the words in this and compute 3 * 7", ["TextProcessorTool", "CalculatorTool"]),
+        ],
+    )
+    def test_builtin_selection(self, pruned, request_text, expected):
+        assert [s.name for s in pruned.select(request_text)] == expected
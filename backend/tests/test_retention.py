@@ -0,0 +1,129 @@
+"""Tests for retention, archival and incremental vacuum."""
+
+import sqlite3
+import time
+
+import pytest
+from datetime import datetime, timedelta
+
+from src.persistence import TaskStorage, RetentionPolicy, RetentionSweeper, TaskArchive
+from tests.test_persistence import create_sample_task
+
+
+@pytest.fixture
+def temp_storage(tmp_path):
+    """Create a temporary storage for testing."""
+    return TaskStorage(str(tmp_path / "tasks.db"))
+
+
+def make_sweeper(storage, **policy):
+    return RetentionSweeper(storage, RetentionPolicy(**policy), batch_size=3, batch_pause=0)
+
+
+def save_aged_task(storage, days_old: float, thread_id: str = "test-thread") -> int:
+    record = create_sample_task(thread_id=thread_id)
+    record.created_at = (datetime.now() - timedelta(days=days_old)).isoformat()
+    return storage.save_task(record)
+
+
+class TestRetentionSweeper:
+    """Tests for RetentionSweeper."""
+
+    def test_incremental_auto_vacuum_enabled(self, temp_storage):
+        with temp_storage._get_connection() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    def test_disabled_policy(self):
+        assert not RetentionPolicy().enabled
+        assert RetentionPolicy(max_age_days=1).enabled
+
+    def test_archives_by_age(self, temp_storage):
+        old_ids = [save_aged_task(temp_storage, days_old=10) for _ in range(5)]
+        fresh_id = save_aged_task(temp_storage, days_old=0)
+
+        report = make_sweeper(temp_storage, max_age_days=7).sweep()
+
+        assert report.archived_tasks == 5
+        assert report.segments_written == 2  # batches of 3
+        assert [t.id for t in temp_storage.get_all_tasks()] == [fresh_id]
+
+        archive = TaskArchive(str(temp_storage.db_path.with_suffix(".archive.db")))
+        archived = archive.get_task(old_ids[0])
+        assert archived is not None
+        assert archived.input_text == "test input"
+        assert archived.execution_steps[0].description == "Test step"
+
+    def test_archives_by_thread_count(self, temp_storage):
+        for days in range(5):
+            save_aged_task(temp_storage, days_old=days, thread_id="thread-1")
+        save_aged_task(temp_storage, days_old=30, thread_id="thread-2")
+
+        sweeper = make_sweeper(temp_storage, max_tasks_per_thread=2)
+        report = sweeper.sweep()
+
+        assert report.archived_tasks == 3
+        assert len(temp_storage.get_tasks_by_thread("thread-1")) == 2
+        assert len(temp_storage.get_tasks_by_thread("thread-2")) == 1
+        assert len(sweeper.archive.get_tasks_by_thread("thread-1")) == 3
+
+    def test_archives_by_size_and_reclaims_pages(self, temp_storage):
+        for _ in range(50):
+            record = create_sample_task()
+            record.output_text = "x" * 4000
+            temp_storage.save_task(record)
+
+        size_before = temp_storage.get_db_stats()["size_bytes"]
+        report = make_sweeper(temp_storage, max_db_bytes=size_before // 4).sweep()
+
+        assert report.archived_tasks > 0
+        assert report.pages_reclaimed > 0
+        assert report.db_size_after < report.db_size_before
+        assert temp_storage.get_db_stats()["free_pages"] == 0
+
+    def test_size_limit_ignores_non_task_pages(self, temp_storage):
+        for i in range(5):
+            temp_storage.save_task(create_sample_task(thread_id=f"thread-{i}"))
+        with temp_storage._get_connection() as conn:
+            tasks_bytes = RetentionSweeper._tasks_bytes(conn)
+        # Rollups, counters and the schema alone take more than the limit
+        assert temp_storage.get_db_stats()["used_bytes"] > 2 * tasks_bytes
+
+        report = make_sweeper(temp_storage, max_db_bytes=tasks_bytes).sweep()
+
+        assert report.archived_tasks == 0
+        assert temp_storage.get_db_stats()["task_count"] == 5
+
+    def test_iter_archived_tasks(self, temp_storage):
+        for _ in range(4):
+            save_aged_task(temp_storage, days_old=10)
+
+        sweeper = make_sweeper(temp_storage, max_age_days=1)
+        sweeper.sweep()
+
+        assert len(list(sweeper.archive.iter_tasks())) == 4
+        assert sweeper.archive.get_stats()["task_count"] == 4
+
+    def test_report_serializes(self, temp_storage):
+        report = make_sweeper(temp_storage, max_age_days=1).sweep()
+        data = report.to_dict()
+        assert data["archived_tasks"] == 0
+        assert data["duration_ms"] >= 0
+
+    def test_background_sweeper_survives_a_failed_sweep(self, temp_storage, monkeypatch, caplog):
+        sweeper = make_sweeper(temp_storage, max_age_days=1)
+        calls = []
+
+        def sweep():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(sweeper, "sweep", sweep)
+        sweeper.start(interval=0.01)
+        deadline = time.monotonic() + 5
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sweeper.stop()
+
+        assert len(calls) >= 2
+        assert "database is locked" in caplog.text
@@ -0,0 +1,104 @@
+"""Tests for incrementally maintained usage rollups."""
+
+import pytest
+
+from src.persistence import TaskStorage
+from src.persistence.rollups import rebuild_rollups, main as rollups_main
+from tests.test_persistence import create_sample_task
+
+
+@pytest.fixture
+def temp_storage(tmp_path):
+    """Create a temporary storage for testing."""
+    return TaskStorage(str(tmp_path / "tasks.db"))
+
+
+class TestRollups:
+    """Tests for the rollup tables behind TaskStorage.get_stats."""
+
+    def test_empty_stats(self, temp_storage):
+        stats = temp_storage.get_stats()
+        assert stats["totals"]["task_count"] == 0
+        assert stats["hourly"] == []
+        assert stats["tools"] == []
+
+    def test_save_updates_rollups(self, temp_storage):
+        for i in range(3):
+            temp_storage.save_task(create_sample_task(thread_id="thread-1"))
+        failed = create_sample_task(thread_id="thread-2")
+        failed.output_text = ""
+        failed.tools_used = ["CalculatorTool", "TextProcessorTool"]
+        temp_storage.save_task(failed)
+
+        stats = temp_storage.get_stats()
+        assert stats["totals"]["task_count"] == 4
+        assert stats["totals"]["avg_steps"] == 1.0
+        assert stats["totals"]["error_rate"] == 0.25
+        assert len(stats["hourly"]) == 1
+        assert stats["hourly"][0]["task_count"] == 4
+        assert stats["daily"][0]["task_count"] == 4
+        assert stats["tools"][0] == {"tool": "TextProcessorTool", "use_count": 4}
+        assert stats["tools"][1] == {"tool": "CalculatorTool", "use_count": 1}
+        assert stats["top_threads"][0]["thread_id"] == "thread-1"
+        assert stats["top_threads"][1]["error_count"] == 1
+
+    def test_error_status_counts_but_cancelled_does_not(self, temp_storage):
+        failed = create_sample_task()
+        failed.status = "error"
+        cancelled = create_sample_task()
+        cancelled.status = "cancelled"
+        cancelled.output_text = ""
+        temp_storage.save_task(failed)
+        temp_storage.save_task(cancelled)
+
+        assert temp_storage.get_stats()["totals"]["error_count"] == 1
+
+    def test_delete_updates_rollups(self, temp_storage):
+        keep_id = temp_storage.save_task(create_sample_task(thread_id="thread-1"))
+        drop_id = temp_storage.save_task(create_sample_task(thread_id="thread-2"))
+
+        temp_storage.delete_task(drop_id)
+
+        stats = temp_storage.get_stats()
+        assert stats["totals"]["task_count"] == 1
+        assert [t["thread_id"] for t in stats["top_threads"]] == ["thread-1"]
+        assert keep_id is not None
+
+    def test_delete_removes_only_emptied_rows(self, temp_storage):
+        older = create_sample_task()
+        older.created_at = "2024-01-01T09:30:00"
+        older.tools_used = ["CalculatorTool"]
+        temp_storage.save_task(older)
+        drop = create_sample_task()
+        drop.created_at = "2024-01-02T10:30:00"
+        drop.tools_used = ["WeatherMockTool"]
+        drop_id = temp_storage.save_task(drop)
+
+        temp_storage.delete_task(drop_id)
+
+        with temp_storage._get_connection() as conn:
+            tools = [row[0] for row in conn.execute("SELECT tool FROM stats_tools")]
+            buckets = [row[0] for row in conn.execute("SELECT bucket FROM stats_time")]
+        assert tools == ["CalculatorTool"]
+        assert sorted(buckets) == ["", "2024-01-01", "2024-01-01T09:00"]
+
+    def test_clear_all_resets_rollups(self, temp_storage):
+        temp_storage.save_task(create_sample_task())
+        temp_storage.clear_all()
+        assert temp_storage.get_stats()["totals"]["task_count"] == 0
+
+    def test_rebuild_matches_incremental(self, temp_storage):
+        for i in range(5):
+            temp_storage.save_task(create_sample_task(thread_id=f"thread-{i % 2}"))
+        incremental = temp_storage.get_stats()
+
+        with temp_storage._get_connection() as conn:
+            conn.execute("DELETE FROM stats_time")
+        assert rebuild_rollups(temp_storage) == 5
+
+        assert temp_storage.get_stats() == incremental
+
+    def test_rebuild_command(self, temp_storage, capsys):
+        temp_storage.save_task(create_sample_task())
+        rollups_main(["rebuild", "--db", str(temp_storage.db_path)])
+        assert "1 tasks" in capsys.readouterr().out
@@ -0,0 +1,117 @@
+"""Tests for cheap-first model routing."""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.agent.routing import ModelRouter, validate
+from src.tools import registry
+from tests.stub_model import answer_message, tool_call_message
+
+CALCULATOR_SCHEMA = {
+    "type": "function",
+    "function": {
+        "name": "CalculatorTool",
+        "parameters": {
+            "type": "object",
+            "properties": {"expression": {"type": "string"}},
+            "required": ["expression"],
+        },
+    },
+}
+
+
+def route(text: str, *history):
+    messages = [HumanMessage(content=text), *history]
+    return ModelRouter(["small", "large"]).route(messages, registry.select(text))
+
+
+class TestModelRouter:
+    """Tests for ModelRouter."""
+
+    @pytest.mark.parametrize("text", ["uppercase hello", "What is 2 + 2?", "Hi there"])
+    def test_simple_requests_start_cheap(self, text):
+        result = route(text)
+
+        assert result.complexity == "simple"
+        assert result.start == 0
+
+    @pytest.mark.parametrize(
+        "text, reason",
+        [
+            ("What is 6 * 7 and the weather in Paris?", "needs 2 tools"),
+            ("Calculate 2 + 2, then tell me a joke", "multi-step request"),
+            ("word " * 41, "41 words"),
+        ],
+    )
+    def test_complex_requests_start_strong(self, text, reason):
+        result = route(text)
+
+        assert result.complexity == "complex"
+        assert result.reason == reason
+        assert result.start == 1
+
+    def test_long_tool_chains_become_complex(self):
+        calls = [
+            ToolMessage(content="4", name="CalculatorTool", tool_call_id=str(i)) for i in range(2)
+        ]
+
+        assert route("What is 2 + 2?", *calls).reason == "2 tool calls so far"
+
+    def test_single_model(self):
+        router = ModelRouter(["only"])
+        text = "What is 6 * 7 and the weather in Paris?"
+
+        assert router.route([HumanMessage(content=text)], registry.select(text)).start == 0
+        with pytest.raises(ValueError):
+            ModelRouter([])
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("LLM_MODELS", "a, b ,c")
+        assert ModelRouter.from_env().models == ("a", "b", "c")
+        monkeypatch.delenv("LLM_MODELS")
+        assert ModelRouter.from_env().models == ("gpt-4o-mini", "gpt-4o")
+
+    def test_stats(self):
+        router = ModelRouter(["small", "large"])
+        router.route([HumanMessage(content="hi")], [])
+        router.record("small", 10.0, "empty response")
+        router.record("large", 30.0, None)
+        router.record("large", 50.0, None)
+
+        stats = router.stats()
+        assert stats["routes"] == {"simple": 1, "complex": 0}
+        assert stats["escalations"] == 1
+        assert stats["per_model"]["small"] == {"calls": 1, "failed_validation": 1, "avg_ms": 10.0}
+        assert stats["per_model"]["large"]["avg_ms"] == 40.0
+
+
+class TestValidate:
+    """Tests for response validation."""
+
+    def test_valid_responses(self):
+        assert validate(answer_message("4"), [CALCULATOR_SCHEMA]) is None
+        call = tool_call_message("CalculatorTool", {"expression": "2 + 2"})
+        assert validate(call, [CALCULATOR_SCHEMA]) is None
+
+    def test_malformed_tool_call(self):
+        response = AIMessage(
+            content="",
+            invalid_tool_calls=[
+                {"name": "CalculatorTool", "args": "{bad", "id": "1", "error": "bad JSON"}
+            ],
+        )
+
+        assert validate(response, [CALCULATOR_SCHEMA]) == "malformed tool call to CalculatorTool"
+
+    def test_unavailable_tool(self):
+        call = tool_call_message("WeatherMockTool", {"city": "Paris"})
+
+        assert validate(call, [CALCULATOR_SCHEMA]) == "call to unavailable tool WeatherMockTool"
+
+    def test_missing_argument(self):
+        call = tool_call_message("CalculatorTool", {})
+
+        assert validate(call, [CALCULATOR_SCHEMA]) == "CalculatorTool call missing expression"
+
+    def test_empty_response(self):
+        assert validate(answer_message("  "), []) == "empty response"
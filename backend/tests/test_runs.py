@@ -0,0 +1,99 @@
+"""Tests for resumable runs and their event logs."""
+
+import asyncio
+import json
+
+import pytest
+
+from src.api.runs import Run, RunRegistry
+
+
+async def collect(stream) -> list[str]:
+    return [message async for message in stream]
+
+
+def parse(messages: list[str]) -> list[tuple[int, str]]:
+    """(id, event_type) for each SSE event message."""
+    parsed = []
+    for message in messages:
+        if message.startswith(":"):
+            continue
+        id_line, data_line = message.strip().split("\n")
+        parsed.append((int(id_line[4:]), json.loads(data_line[6:])["event_type"]))
+    return parsed
+
+
+class TestRun:
+    """Tests for Run."""
+
+    @pytest.mark.asyncio
+    async def test_replays_after_last_event_id(self):
+        run = Run("run-1", "thread")
+        for event_type in ("step", "step", "tool_used", "complete"):
+            await run.publish(event_type, {})
+
+        assert parse(await collect(run.subscribe())) == [
+            (1, "step"), (2, "step"), (3, "tool_used"), (4, "complete")
+        ]
+        assert parse(await collect(run.subscribe(last_event_id=2))) == [
+            (3, "tool_used"), (4, "complete")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_follows_live_events(self):
+        run = Run("run-1", "thread")
+        subscriber = asyncio.create_task(collect(run.subscribe()))
+
+        await run.publish("step", {})
+        await asyncio.sleep(0)
+        await run.publish("complete", {})
+
+        assert [event_type for _, event_type in parse(await subscriber)] == ["step", "complete"]
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_while_idle(self):
+        run = Run("run-1", "thread")
+        stream = run.subscribe(heartbeat_interval=0.01)
+
+        assert await stream.__anext__() == ": heartbeat\n\n"
+        await run.publish("complete", {})
+        assert parse([await stream.__anext__()]) == [(1, "complete")]
+
+    @pytest.mark.asyncio
+    async def test_bounded_log_replays_from_oldest_held(self):
+        run = Run("run-1", "thread", max_events=3)
+        for _ in range(5):
+            await run.publish("step", {})
+        await run.close()
+
+        assert [event_id for event_id, _ in parse(await collect(run.subscribe()))] == [3, 4, 5]
+
+
+class TestRunRegistry:
+    """Tests for RunRegistry."""
+
+    @pytest.mark.asyncio
+    async def test_runs_in_background(self):
+        registry = RunRegistry()
+
+        async def work(run):
+            await run.publish("complete", {"task_id": 1})
+
+        run = registry.start("thread", work)
+        await run.task
+
+        assert registry.get(run.run_id) is run
+        assert run.done
+
+    @pytest.mark.asyncio
+    async def test_evicts_expired_finished_runs(self):
+        registry = RunRegistry(finished_ttl=0)
+
+        async def work(run):
+            pass
+
+        first = registry.start("thread", work)
+        await first.task
+        registry.start("thread", work)
+
+        assert registry.get(first.run_id) is None
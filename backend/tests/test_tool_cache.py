@@ -0,0 +1,68 @@
+"""Tests for the tool result cache."""
+
+from src.tools import CalculatorTool, TextProcessorTool, WeatherMockTool
+from src.tools.cache import ToolResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestToolResultCache:
+    """Tests for ToolResultCache."""
+
+    def test_keys_canonicalize_argument_order(self):
+        cache = ToolResultCache()
+        a = cache.key(TextProcessorTool, {"text": "hi", "operation": "reverse"})
+        b = cache.key(TextProcessorTool, {"operation": "reverse", "text": "hi"})
+        assert a == b
+        assert a != cache.key(TextProcessorTool, {"text": "hi", "operation": "uppercase"})
+
+    def test_round_trip_and_stats(self):
+        cache = ToolResultCache()
+        key = cache.key(CalculatorTool, {"expression": "2 + 2"})
+
+        assert cache.get(key) is None
+        cache.put(key, CalculatorTool, "2 + 2 = 4")
+        assert cache.get(key) == "2 + 2 = 4"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_uncacheable_calls(self):
+        cache = ToolResultCache(max_chars=10)
+        assert cache.key(None, {}) is None
+        assert cache.key(TextProcessorTool, {"text": "x" * 11, "operation": "reverse"}) is None
+        assert ToolResultCache(max_entries=0).key(CalculatorTool, {"expression": "1"}) is None
+
+        key = cache.key(CalculatorTool, {"expression": "1"})
+        cache.put(key, CalculatorTool, "a very long result")
+        assert cache.get(key) is None
+
+    def test_ttl_from_tool_metadata(self):
+        clock = FakeClock()
+        cache = ToolResultCache(clock=clock)
+        weather = cache.key(WeatherMockTool, {"city": "Paris"})
+        calc = cache.key(CalculatorTool, {"expression": "1"})
+        cache.put(weather, WeatherMockTool, "Overcast")
+        cache.put(calc, CalculatorTool, "1 = 1")
+
+        clock.now = WeatherMockTool.metadata["cache_ttl"] + 1
+        assert cache.get(weather) is None
+        assert cache.get(calc) == "1 = 1"
+        assert cache.stats()["expirations"] == 1
+
+    def test_lru_eviction(self):
+        cache = ToolResultCache(max_entries=2)
+        keys = [cache.key(CalculatorTool, {"expression": str(i)}) for i in range(3)]
+        cache.put(keys[0], CalculatorTool, "0")
+        cache.put(keys[1], CalculatorTool, "1")
+        cache.get(keys[0])
+        cache.put(keys[2], CalculatorTool, "2")
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == "0"
+        assert cache.stats()["evictions"] == 1
@@ -2,6 +2,9 @@
 
 import pytest
 from src.tools import TextProcessorTool, CalculatorTool, WeatherMockTool
+from src.tools import text_processor
+from src.tools.text_processor import count_words, iter_chunks, process_many
+from src.tools.weather_mock import simulated_weather
 
 
 class TestTextProcessorTool:
@@ -36,6 +39,53 @@ class TestTextProcessorTool:
         assert "Unknown operation" in result
 
 
+class TestTextProcessing:
+    """Tests for chunked counting and batch processing."""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64])
+    def test_word_count_across_chunk_boundaries(self, size):
+        text = "  the quick\tbrown  fox\n\njumps over the lazy dog "
+        assert count_words(iter_chunks(text, size)) == len(text.split())
+
+    def test_word_count_large_input(self):
+        text = "lorem ipsum dolor " * 200_000
+        result = TextProcessorTool.invoke({"text": text, "operation": "word_count"})
+        assert result == "Word count: 600000"
+
+    def test_process_many_in_process(self):
+        assert process_many(["ab", "cd"], " Reverse ") == ["ba", "dc"]
+
+    def test_process_many_pool(self):
+        texts = ["one two", "three", "four five six"]
+        try:
+            results = process_many(texts, "word_count", pool_threshold=0)
+            assert results == ["Word count: 2", "Word count: 1", "Word count: 3"]
+        finally:
+            text_processor.shutdown()
+        assert text_processor._pool is None
+
+    def test_concurrent_callers_share_one_pool(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        created = []
+
+        class Pool:
+            def __init__(self, **kwargs):
+                created.append(self)
+
+        monkeypatch.setattr(text_processor, "ProcessPoolExecutor", Pool)
+        monkeypatch.setattr(text_processor, "_pool", None)
+        with ThreadPoolExecutor(max_workers=8) as threads:
+            pools = list(threads.map(lambda _: text_processor._get_pool(), range(32)))
+
+        assert len(created) == 1
+        assert all(pool is created[0] for pool in pools)
+
+    def test_process_many_unknown_operation(self):
+        with pytest.raises(ValueError, match="Unknown operation"):
+            process_many(["text"], "shout")
+
+
 class TestCalculatorTool:
     """Tests for CalculatorTool."""
 
@@ -67,6 +117,10 @@ class TestCalculatorTool:
         result = CalculatorTool.invoke({"expression": "abc + def"})
         assert "Invalid" in result
 
+    def test_oversized_expression(self):
+        result = CalculatorTool.invoke({"expression": "9**9**9**9"})
+        assert "too large" in result
+
 
 class TestWeatherMockTool:
     """Tests for WeatherMockTool."""
@@ -86,3 +140,14 @@ class TestWeatherMockTool:
     def test_case_insensitive(self):
         result = WeatherMockTool.invoke({"city": "NEW YORK"})
         assert "Weather in New York" in result
+
+    def test_alias_and_misspelling(self):
+        paris = WeatherMockTool.invoke({"city": "Paris"})
+        assert WeatherMockTool.invoke({"city": "Pariss"}) == paris
+        assert "Weather in San Francisco" in WeatherMockTool.invoke({"city": "San Fran"})
+
+    def test_unknown_city_is_deterministic(self):
+        result = WeatherMockTool.invoke({"city": "Xyzzyville"})
+        assert "Weather in Xyzzyville" in result
+        assert simulated_weather("xyzzyville") == simulated_weather("xyzzyville")
+        assert f"{simulated_weather('xyzzyville')['temp_f']}°F" in result
@@ -0,0 +1,160 @@
+"""Tests for trace spans and their OTLP export."""
+
+import asyncio
+import json
+
+import pytest
+
+from src.tracing import (
+    STATUS_ERROR,
+    STATUS_OK,
+    FileExporter,
+    InMemoryExporter,
+    Tracer,
+    export_request,
+    parse_traceparent,
+)
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(InMemoryExporter())
+
+
+class TestTracer:
+    """Tests for Tracer spans."""
+
+    def test_nested_spans_share_trace(self, tracer):
+        with tracer.span("outer") as outer:
+            with tracer.span("inner", answer=42) as inner:
+                assert Tracer.current() is inner
+            assert Tracer.current() is outer
+        assert Tracer.current() is None
+
+        spans = tracer.exporter.spans()
+        assert [span.name for span in spans] == ["inner", "outer"]
+        assert inner.trace_id == outer.trace_id
+        assert inner.parent_id == outer.span_id
+        assert outer.parent_id is None
+        assert inner.attributes == {"answer": 42}
+        assert outer.status == STATUS_OK
+        assert outer.duration_ms >= inner.duration_ms >= 0
+
+    def test_tasks_inherit_the_current_span(self, tracer):
+        async def child():
+            with tracer.span("child") as span:
+                return span
+
+        async def run():
+            with tracer.span("parent") as parent:
+                spans = await asyncio.gather(child(), child())
+            return parent, spans
+
+        parent, children = asyncio.run(run())
+
+        assert {span.parent_id for span in children} == {parent.span_id}
+
+    def test_errors_and_cancellation(self, tracer):
+        with pytest.raises(ValueError):
+            with tracer.span("failing"):
+                raise ValueError("bad input")
+
+        async def cancelled():
+            with tracer.span("cancelled"):
+                await asyncio.sleep(10)
+
+        async def run():
+            task = asyncio.ensure_future(cancelled())
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+        failing, cancelled_span = tracer.exporter.spans()
+        assert failing.status == STATUS_ERROR
+        assert failing.status_message == "ValueError: bad input"
+        assert cancelled_span.status_message == "cancelled"
+        assert tracer.stats() == {"exporter": "InMemoryExporter", "spans": 2, "errors": 2}
+
+    def test_explicit_parent(self, tracer):
+        with tracer.span("remote child", parent=("a" * 32, "b" * 16)) as span:
+            pass
+
+        assert span.trace_id == "a" * 32
+        assert span.parent_id == "b" * 16
+        assert span.traceparent == f"00-{'a' * 32}-{span.span_id}-01"
+
+    def test_parse_traceparent(self):
+        trace_id, span_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+        assert parse_traceparent(f"00-{trace_id}-{span_id}-01") == (trace_id, span_id)
+        assert parse_traceparent(f"00-{trace_id.upper()}-{span_id}-00") == (trace_id, span_id)
+        assert parse_traceparent(None) is None
+        assert parse_traceparent("garbage") is None
+        assert parse_traceparent(f"00-{'0' * 32}-{span_id}-01") is None
+
+
+class TestExport:
+    """Tests for the OTLP/JSON encoding and exporters."""
+
+    def test_otlp_encoding(self, tracer):
+        with tracer.span("root", kind="server", flag=True, count=3, ratio=0.5, names=["a"]):
+            with tracer.span("child"):
+                pass
+
+        body = export_request(tracer.exporter.spans())
+        resource = body["resourceSpans"][0]
+        assert resource["resource"]["attributes"][0] == {
+            "key": "service.name",
+            "value": {"stringValue": "bmo-chat-backend"},
+        }
+        child, root = resource["scopeSpans"][0]["spans"]
+        assert root["kind"] == 2
+        assert child["parentSpanId"] == root["spanId"]
+        assert "parentSpanId" not in root
+        assert int(root["endTimeUnixNano"]) >= int(root["startTimeUnixNano"])
+        assert root["status"] == {"code": 1}
+        assert root["attributes"] == [
+            {"key": "flag", "value": {"boolValue": True}},
+            {"key": "count", "value": {"intValue": "3"}},
+            {"key": "ratio", "value": {"doubleValue": 0.5}},
+            {"key": "names", "value": {"arrayValue": {"values": [{"stringValue": "a"}]}}},
+        ]
+
+    def test_in_memory_exporter_is_bounded(self):
+        tracer = Tracer(InMemoryExporter(max_spans=2))
+        for name in ("a", "b", "c"):
+            with tracer.span(name):
+                pass
+
+        assert [span.name for span in tracer.exporter.spans()] == ["b", "c"]
+
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(FileExporter(str(path)))
+        with tracer.span("outer"):
+            with tracer.span("inner"):
+                pass
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        names = [line["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] for line in lines]
+        assert names == ["inner", "outer"]
+
+    def test_disabled_tracer_still_tracks_context(self):
+        tracer = Tracer(None)
+        with tracer.span("unexported") as span:
+            assert Tracer.current() is span
+
+        assert not tracer.enabled
+        assert tracer.stats()["spans"] == 1
+
+    def test_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("TRACE_EXPORTER", "off")
+        assert Tracer.from_env().exporter is None
+        monkeypatch.setenv("TRACE_EXPORTER", "file")
+        monkeypatch.setenv("TRACE_FILE", str(tmp_path / "t.jsonl"))
+        assert isinstance(Tracer.from_env().exporter, FileExporter)
+        monkeypatch.delenv("TRACE_EXPORTER")
+        assert isinstance(Tracer.from_env().exporter, InMemoryExporter)
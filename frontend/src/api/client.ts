@@ -1,10 +1,11 @@
-import type { Task, ExecutionStep, StreamCallbacks } from '../types';
+import type { Task, TaskSummary, TaskPage, ExecutionStep, StreamCallbacks } from '../types';
 
 const API_BASE = '/api';
 
 interface SSEEvent {
-  event_type: 'step' | 'tool_used' | 'final_output' | 'complete' | 'error';
+  event_type: 'run_started' | 'step' | 'tool_used' | 'final_output' | 'complete' | 'cancelled' | 'error';
   data: {
+    run_id?: string;
     step_number?: number;
     description?: string;
     timestamp?: string;
@@ -12,9 +13,16 @@ interface SSEEvent {
     output?: string;
     task_id?: string;
     error?: string;
+    trace_id?: string;
   };
+  // W3C traceparent of the server span that published the event
+  traceparent?: string;
 }
 
+// How often to try reattaching to a run after the stream connection drops
+const MAX_RESUME_ATTEMPTS = 5;
+const RESUME_DELAY_MS = 1000;
+
 /**
  * Submit a task for processing (non-streaming)
  */
@@ -34,7 +42,13 @@ export async function submitTask(task: string, threadId: string = 'default'): Pr
 }
 
 /**
- * Submit a task with SSE streaming
+ * Submit a task with SSE streaming.
+ *
+ * If the connection drops mid-run, reattaches to the run with the id of the
+ * last event received so the server replays only what was missed.
+ *
+ * The returned function cancels the run on the server as well as closing
+ * the stream.
  */
 export function submitTaskStream(
   task: string,
@@ -42,6 +56,82 @@ export function submitTaskStream(
   callbacks: StreamCallbacks = {}
 ): () => void {
   const controller = new AbortController();
+  let runId: string | null = null;
+  let lastEventId: string | null = null;
+  let finished = false;
+
+  const handleEvent = (data: SSEEvent) => {
+    switch (data.event_type) {
+      case 'run_started':
+        runId = data.data.run_id!;
+        break;
+      case 'step':
+        callbacks.onStep?.(data.data as ExecutionStep);
+        break;
+      case 'tool_used':
+        callbacks.onToolUsed?.(data.data.tool!);
+        break;
+      case 'final_output':
+        callbacks.onOutput?.(data.data.output!);
+        break;
+      case 'complete':
+        finished = true;
+        callbacks.onComplete?.(data.data.task_id!);
+        break;
+      case 'cancelled':
+        finished = true;
+        callbacks.onCancelled?.(data.data.task_id!);
+        break;
+      case 'error':
+        finished = true;
+        callbacks.onError?.(new Error(data.data.error));
+        break;
+    }
+  };
+
+  const readStream = async (response: Response) => {
+    const reader = response.body!.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+
+      // Parse SSE events from buffer
+      const lines = buffer.split('\n');
+      buffer = lines.pop() || ''; // Keep incomplete line in buffer
+
+      for (const line of lines) {
+        if (line.startsWith('id: ')) {
+          lastEventId = line.slice(4);
+        } else if (line.startsWith('data: ')) {
+          try {
+            handleEvent(JSON.parse(line.slice(6)));
+          } catch (e) {
+            console.error('Failed to parse SSE data:', e);
+          }
+        }
+      }
+    }
+  };
+
+  const resume = async (): Promise<Response> => {
+    const headers: Record<string, string> = {};
+    if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+
+    const response = await fetch(`${API_BASE}/tasks/stream/${runId}`, {
+      headers,
+      signal: controller.signal,
+    });
+    if (!response.ok) {
+      throw new Error('Failed to resume task stream');
+    }
+    return response;
+  };
 
   (async () => {
     try {
@@ -58,48 +148,23 @@ export function submitTaskStream(
         return;
       }
 
-      const reader = response.body!.getReader();
-      const decoder = new TextDecoder();
-      let buffer = '';
-
-      while (true) {
-        const { done, value } = await reader.read();
-
-        if (done) break;
-
-        buffer += decoder.decode(value, { stream: true });
-
-        // Parse SSE events from buffer
-        const lines = buffer.split('\n');
-        buffer = lines.pop() || ''; // Keep incomplete line in buffer
-
-        for (const line of lines) {
-          if (line.startsWith('data: ')) {
-            try {
-              const data: SSEEvent = JSON.parse(line.slice(6));
-
-              switch (data.event_type) {
-                case 'step':
-                  callbacks.onStep?.(data.data as ExecutionStep);
-                  break;
-                case 'tool_used':
-                  callbacks.onToolUsed?.(data.data.tool!);
-                  break;
-                case 'final_output':
-                  callbacks.onOutput?.(data.data.output!);
-                  break;
-                case 'complete':
-                  callbacks.onComplete?.(data.data.task_id!);
-                  break;
-                case 'error':
-                  callbacks.onError?.(new Error(data.data.error));
-                  break;
-              }
-            } catch (e) {
-              console.error('Failed to parse SSE data:', e);
-            }
-          }
+      runId = response.headers.get('X-Run-Id');
+      let current: Response | null = response;
+
+      for (let attempt = 0; ; attempt++) {
+        try {
+          if (!current) current = await resume();
+          await readStream(current);
+        } catch (error) {
+          if ((error as Error).name === 'AbortError') throw error;
         }
+        if (finished) return;
+        if (!runId || attempt >= MAX_RESUME_ATTEMPTS) {
+          callbacks.onError?.(new Error('Lost connection to the task stream'));
+          return;
+        }
+        current = null;
+        await new Promise((resolve) => setTimeout(resolve, RESUME_DELAY_MS));
       }
     } catch (error) {
       if ((error as Error).name !== 'AbortError') {
@@ -108,7 +173,25 @@ export function submitTaskStream(
     }
   })();
 
-  return () => controller.abort();
+  return () => {
+    if (runId && !finished) {
+      finished = true;
+      cancelRun(runId).catch(() => {});
+    }
+    controller.abort();
+  };
+}
+
+/**
+ * Cancel a running task. The partial run is saved with status "cancelled".
+ */
+export async function cancelRun(runId: string): Promise<void> {
+  const response = await fetch(`${API_BASE}/runs/${runId}`, { method: 'DELETE' });
+
+  // 409 means the run finished before the request arrived
+  if (!response.ok && response.status !== 409) {
+    throw new Error('Failed to cancel run');
+  }
 }
 
 /**
@@ -126,6 +209,31 @@ export async function getTasks(limit: number = 100, offset: number = 0): Promise
   return response.json();
 }
 
+/**
+ * Get a page of task summaries and the total number of tasks.
+ *
+ * Only the fields the history list renders are fetched; load the full task
+ * with getTask() when one is selected.
+ */
+export async function getTaskSummaries(
+  limit: number = 50,
+  offset: number = 0
+): Promise<TaskPage<TaskSummary>> {
+  const fields = 'id,input_text,tools_used,created_at';
+  const response = await fetch(
+    `${API_BASE}/tasks?limit=${limit}&offset=${offset}&fields=${fields}&include_total=true`
+  );
+
+  if (!response.ok) {
+    throw new Error('Failed to fetch tasks');
+  }
+
+  return {
+    tasks: await response.json(),
+    total: Number(response.headers.get('X-Total-Count') ?? 0),
+  };
+}
+
 /**
  * Get a specific task by ID
  */
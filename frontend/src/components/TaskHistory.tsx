@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react';
-import { getTasks } from '../api/client';
-import type { Task } from '../types';
+import { getTask, getTaskSummaries } from '../api/client';
+import type { Task, TaskSummary } from '../types';
 import './TaskHistory.css';
 
 const TOOL_COLORS: Record<string, string> = {
@@ -16,7 +16,8 @@ interface TaskHistoryProps {
 }
 
 export default function TaskHistory({ onSelectTask, selectedTaskId, refreshTrigger }: TaskHistoryProps) {
-  const [tasks, setTasks] = useState<Task[]>([]);
+  const [tasks, setTasks] = useState<TaskSummary[]>([]);
+  const [total, setTotal] = useState(0);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -27,8 +28,9 @@ export default function TaskHistory({ onSelectTask, selectedTaskId, refreshTrigg
   const loadTasks = async () => {
     try {
       setIsLoading(true);
-      const data = await getTasks(50, 0);
-      setTasks(data);
+      const page = await getTaskSummaries(50, 0);
+      setTasks(page.tasks);
+      setTotal(page.total);
       setError(null);
     } catch (err) {
       setError('Failed to load history');
@@ -38,6 +40,16 @@ export default function TaskHistory({ onSelectTask, selectedTaskId, refreshTrigg
     }
   };
 
+  const selectTask = async (summary: TaskSummary) => {
+    try {
+      const task = await getTask(summary.id!);
+      if (task) onSelectTask(task);
+    } catch (err) {
+      setError('Failed to load task');
+      console.error(err);
+    }
+  };
+
   if (isLoading && tasks.length === 0) {
     return (
       <div className="task-history">
@@ -50,7 +62,9 @@ export default function TaskHistory({ onSelectTask, selectedTaskId, refreshTrigg
   return (
     <div className="task-history">
       <div className="task-history__header">
-        <h2 className="task-history__title">Task History</h2>
+        <h2 className="task-history__title">
+          Task History{total > tasks.length ? ` (${tasks.length} of ${total})` : ''}
+        </h2>
         <button
           className="task-history__refresh"
           onClick={loadTasks}
@@ -74,7 +88,7 @@ export default function TaskHistory({ onSelectTask, selectedTaskId, refreshTrigg
                 className={`task-history__item ${
                   selectedTaskId === task.id ? 'task-history__item--selected' : ''
                 }`}
-                onClick={() => onSelectTask(task)}
+                onClick={() => selectTask(task)}
               >
                 <span className="task-history__item-input">
                   {truncate(task.input_text, 50)}
@@ -72,6 +72,16 @@ export default function useStreamingTask(): UseStreamingTaskReturn {
         abortRef.current = null;
       },
 
+      onCancelled: (taskId: string) => {
+        setCurrentTask((prev) => prev ? {
+          ...prev,
+          id: taskId,
+          status: 'cancelled',
+        } : null);
+        setIsStreaming(false);
+        abortRef.current = null;
+      },
+
       onError: (err: Error) => {
         setError(err.message);
         setIsStreaming(false);
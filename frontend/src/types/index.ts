@@ -12,6 +12,23 @@ export interface Task {
   execution_steps: ExecutionStep[];
   created_at: string;
   thread_id: string;
+  status?: 'completed' | 'cancelled' | 'error';
+  total_ms?: number;
+  queue_ms?: number;
+  llm_ms?: number;
+  tool_ms?: number;
+  llm_calls?: number;
+  prompt_tokens?: number;
+  completion_tokens?: number;
+  cached_tokens?: number;
+}
+
+/** The fields of a Task the history sidebar renders. */
+export type TaskSummary = Pick<Task, 'id' | 'input_text' | 'tools_used' | 'created_at'>;
+
+export interface TaskPage<T> {
+  tasks: T[];
+  total: number;
 }
 
 export interface StreamCallbacks {
@@ -19,5 +36,6 @@ export interface StreamCallbacks {
   onToolUsed?: (tool: string) => void;
   onOutput?: (output: string) => void;
   onComplete?: (taskId: string) => void;
+  onCancelled?: (taskId: string) => void;
   onError?: (error: Error) => void;
 }